@@ -1,201 +1,202 @@
 #!/usr/bin/env python3
 """
 This script uses a plugin architecture to parse rules and generate documentation.
+
+Startup is kept minimal: when no staged change touches a rule source directory
+the hook exits before argparse, logging, YAML or any plugin is imported.
 """
 
-import logging
 import os
-import subprocess
-from pathlib import Path
-from typing import Dict, List
-
-logger = logging.getLogger(__name__)
-
-from sync_ai_rules.core.plugin_manager import PluginManager
-from sync_ai_rules.core.rule_metadata import RuleMetadata
-from sync_ai_rules.file_updater import update_documentation_file
-
-
-def get_category(file_path: str, source_dir: str) -> str:
-    """Extract category from file path relative to source directory."""
-    rel_path = os.path.relpath(file_path, source_dir)
-    folder = os.path.dirname(rel_path)
-    return folder if folder and folder != "." else "root"
-
-
-def group_by_category(rules: List[RuleMetadata]) -> Dict[str, List[RuleMetadata]]:
-    """Group rules by category."""
-    groups: Dict[str, List[RuleMetadata]] = {}
-    for rule in rules:
-        groups.setdefault(rule.category, []).append(rule)
-    return groups
-
-
-def scan_and_parse(parser, source_dir: str, project_root: str) -> List[RuleMetadata]:
-    """Scan directory and parse files with given parser."""
-    rules = []
-
-    if not os.path.exists(source_dir):
-        return rules
-
-    for root, _, files in os.walk(source_dir):
-        # Skip generated/personal directories
-        if "generated" in Path(root).parts or "personal" in Path(root).parts:
-            continue
-
-        for file in files:
-            file_path = os.path.join(root, file)
-
-            if not parser.can_parse(file_path):
-                continue
-
-            context = {
-                "project_root": project_root,
-                "relative_path": os.path.relpath(file_path, project_root),
-                "category": get_category(file_path, source_dir),
-            }
-
-            rule = parser.parse(file_path, context)
-            if rule:
-                rules.append(rule)
-
-    return rules
-
-
-def _write_gitattributes(directory: str, filenames: List[str]) -> None:
-    """Write .gitattributes to hide generated files from GitHub PR diffs."""
-    os.makedirs(directory, exist_ok=True)
-    path = os.path.join(directory, ".gitattributes")
-    with open(path, "w", encoding="utf-8") as f:
-        f.write("# Auto-generated by sync-ai-rules hook. Do not edit.\n")
-        for name in filenames:
-            f.write(f"{name} linguist-generated\n")
-
-
-def _ensure_agents_skills_symlinks(project_root: str) -> None:
-    """Create .claude/skills -> .agents/skills wherever .agents/skills/ exists."""
-    # Directories that should be completely ignored during traversal
-    IGNORE_DIRS = {
-        ".build",
-        ".git",
-        ".hg",
-        ".idea",
-        ".svn",
-        ".tox",
-        ".venv",
-        "__pycache__",
-        "build",
-        "node_modules",
-        "venv",
-    }
-
-    for dirpath, dirnames, _ in os.walk(project_root):
-        # Modify dirnames in-place to prevent os.walk from descending into them
-        dirnames[:] = [d for d in dirnames if d not in IGNORE_DIRS]
-
-        agents_dir = os.path.join(dirpath, ".agents", "skills")
-        if not os.path.isdir(agents_dir):
-            continue
-
-        claude_dir = os.path.join(dirpath, ".claude")
-        symlink_path = os.path.join(claude_dir, "skills")
-        # Relative target: .claude/skills -> ../.agents/skills
-        target = os.path.join("..", ".agents", "skills")
-
-        if os.path.islink(symlink_path) or os.path.exists(symlink_path):
-            continue
-
-        try:
-            os.makedirs(claude_dir, exist_ok=True)
-            os.symlink(target, symlink_path)
-            rel = os.path.relpath(symlink_path, project_root)
-            print(f"  ✓ Created symlink: {rel} -> .agents/skills")
-        except OSError as e:
-            rel = os.path.relpath(dirpath, project_root)
-            logger.warning("Failed to create agents skills symlink at %s: %s", rel, e)
-
-
-_SOURCE_PREFIXES = (".cursor/", ".code_review/", ".agents/")
-
-
-def _has_relevant_staged_changes() -> bool:
-    """Check if any staged files (including deletions) touch source directories."""
-    try:
-        result = subprocess.run(
-            ["git", "diff", "--cached", "--name-only"],
-            capture_output=True,
-            text=True,
-            check=True,
-        )
-    except (subprocess.CalledProcessError, FileNotFoundError):
+import sys
+import time
+from typing import Dict, List, Optional
+
+from sync_ai_rules.core.change_gate import (
+    PipelineLayout,
+    load_layout,
+    touches,
+    touches_nested,
+    touches_skills,
+)
+from sync_ai_rules.core.git_utils import find_cache_dir, get_staged_changes
+
+_PLUGIN_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Opt-in instrumentation, also settable from the command line with --trace/--profile
+_TRACE_ENV = "SYNC_AI_RULES_TRACE"
+_PROFILE_ENV = "SYNC_AI_RULES_PROFILE"
+
+
+def _has_relevant_staged_changes(
+    staged: Optional[List[str]], nested: bool = False, save: bool = True
+) -> bool:
+    """
+    Check if any staged files (including deletions) touch a pipeline's sources or skills.
+
+    With nested set, sources of project roots at any depth count too. If the
+    layout isn't cached, plugins are loaded to build it, and it's cached
+    unless save is False.
+    """
+    if staged is None:
         return True
 
-    return any(line.startswith(_SOURCE_PREFIXES) for line in result.stdout.splitlines())
+    cache_dir = find_cache_dir(os.getcwd())
+    layout = load_layout(cache_dir, _PLUGIN_DIR)
+    if layout is None:
+        layout = _build_layout(cache_dir if save else None)
+
+    gate = touches_nested if nested else touches
+    return touches_skills(staged) or any(gate(staged, p.sources) for p in layout.values())
+
 
+def _build_layout(cache_dir: Optional[str]) -> Dict[str, PipelineLayout]:
+    """Load the plugins, without listing them, to build (and cache) every pipeline's layout."""
+    from sync_ai_rules.core.change_gate import pipeline_layout, save_layout
+    from sync_ai_rules.core.plugin_manager import PluginManager
 
-def main():
+    plugin_manager = PluginManager()
+    plugin_manager.load_plugins(_PLUGIN_DIR, verbose=False)
+    layout = {pipeline.name: pipeline_layout(pipeline) for pipeline in plugin_manager.pipelines}
+    save_layout(cache_dir, _PLUGIN_DIR, layout)
+    return layout
+
+
+def _parse_args(argv: List[str]):
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        prog="sync_ai_rules", description="Sync AI rules into assistant configuration files."
+    )
+    parser.add_argument(
+        "--full",
+        action="store_true",
+        help="regenerate every output from a scan of every rule file, whatever is staged",
+    )
+    parser.add_argument(
+        "--staged",
+        action="store_true",
+        help="read rule files as staged in the git index, ignoring unstaged edits (implies --full)",
+    )
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        default=None,
+        help="number of threads used to read and parse rule files (default: CPUs + 4, max 32)",
+    )
+    parser.add_argument(
+        "--trace",
+        nargs="?",
+        const="",
+        metavar="PATH",
+        help="write per-stage timings, file counts and bytes read/written as JSON "
+        f"(default: .git/sync-ai-rules/sync-ai-rules-trace.json; or set {_TRACE_ENV})",
+    )
+    parser.add_argument(
+        "--profile",
+        metavar="PATH",
+        help=f"run under cProfile and write the stats to PATH (or set {_PROFILE_ENV})",
+    )
+    parser.add_argument(
+        "--check",
+        action="store_true",
+        help="write nothing; exit nonzero and list generated outputs that are out of date",
+    )
+    parser.add_argument(
+        "--watch",
+        action="store_true",
+        help="keep running and regenerate outputs whenever rule files change",
+    )
+    parser.add_argument(
+        "--poll",
+        action="store_true",
+        help="with --watch, poll for changes instead of using inotify",
+    )
+    parser.add_argument(
+        "--debounce",
+        type=int,
+        default=50,
+        metavar="MS",
+        help="with --watch, wait for this many quiet milliseconds before syncing (default: 50)",
+    )
+    parser.add_argument(
+        "--root",
+        action="append",
+        metavar="DIR",
+        help="also sync the nested project root DIR (repeatable; relative to the repository root)",
+    )
+    parser.add_argument(
+        "--discover-roots",
+        action="store_true",
+        help="also sync every nested directory holding rule sources, in parallel",
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None):
     """Main orchestration: load pipelines → parse → generate → update files."""
-    if not _has_relevant_staged_changes():
+    if argv is None:
+        argv = sys.argv[1:]
+    if argv[:1] == ["which-rules"]:
+        from sync_ai_rules.which_rules import main as which_rules
+
+        sys.exit(which_rules(argv[1:]))
+
+    start = time.perf_counter()
+    staged = get_staged_changes()
+    git_seconds = time.perf_counter() - start
+
+    # Staged changes in nested project roots matter only in multi-root mode
+    nested = any(arg in ("--root", "--discover-roots") or arg.startswith("--root=") for arg in argv)
+    # --check writes nothing, not even the layout cache
+    relevant = _has_relevant_staged_changes(staged, nested, save="--check" not in argv)
+    instrumented = os.environ.get(_TRACE_ENV) or os.environ.get(_PROFILE_ENV)
+    # Common case on commits that don't touch rules: nothing to parse or import
+    if not relevant and not argv and not instrumented:
         return
 
-    # Setup
-    project_root = str(Path.cwd())
-    script_dir = os.path.dirname(os.path.abspath(__file__))
+    args = _parse_args(argv)
+    # Regenerating everything, or from the index, doesn't depend on what's staged
+    relevant = relevant or args.full or args.staged
+    multi_root = bool(args.root or args.discover_roots)
+    if args.check:
+        if multi_root:
+            from sync_ai_rules.monorepo import check_roots
 
-    plugin_manager = PluginManager()
-    plugin_manager.load_plugins(script_dir)
-
-    # Process each pipeline
-    print()
-    for pipeline in plugin_manager.pipelines:
-        print(f"Processing pipeline: {pipeline.name}")
-
-        # Scan and parse using pipeline's parser
-        all_rules = []
-        for rel_dir in pipeline.parser.source_directories:
-            source_dir = os.path.join(project_root, rel_dir)
-            print(f"  Scanning {rel_dir}...")
-            rules = scan_and_parse(pipeline.parser, source_dir, project_root)
-            all_rules.extend(rules)
-
-        if not all_rules:
-            print("  No rules found, skipping")
-            continue
-
-        # Group rules by category
-        grouped_rules = group_by_category(all_rules)
-        print(f"  Found {len(all_rules)} rules in {len(grouped_rules)} categories")
-
-        # Generate output
-        if pipeline.generator.is_multi_file:
-            pipeline.generator.generate_files(grouped_rules, project_root)
-        else:
-            content = pipeline.generator.generate(grouped_rules, {})
-            for filename in pipeline.generator.default_filenames:
-                file_path = os.path.join(project_root, filename)
-                success, message = update_documentation_file(
-                    file_path, content, pipeline.generator.get_section_markers()
-                )
-                status = "✓" if success else "✗"
-                print(f"  {status} {message}")
-
-    # Write .gitattributes in non-root output directories
-    output_dirs: Dict[str, List[str]] = {}
-    for pipeline in plugin_manager.pipelines:
-        if pipeline.generator.is_multi_file:
-            continue
-        for filename in pipeline.generator.default_filenames:
-            parent = os.path.dirname(filename)
-            if parent:
-                output_dirs.setdefault(parent, []).append(os.path.basename(filename))
-
-    for dir_path, filenames in output_dirs.items():
-        _write_gitattributes(os.path.join(project_root, dir_path), sorted(set(filenames)))
-
-    # Create symlinks so Claude Code can discover skills from .agents/skills/
-    _ensure_agents_skills_symlinks(project_root)
-
-    print("\n✓ Rules synchronization completed!")
+            sys.exit(check_roots(args))
+        from sync_ai_rules.sync import run_check
+
+        sys.exit(run_check(args))
+    if args.watch:
+        from sync_ai_rules.watch import watch
+
+        watch(args)
+        return
+    if multi_root:
+        if relevant:
+            from sync_ai_rules.monorepo import run_roots
+
+            run_roots(args, staged)
+        return
+
+    trace_path = args.trace
+    if trace_path is None and os.environ.get(_TRACE_ENV):
+        # "1" asks for the default location, anything else is a path
+        trace_path = "" if os.environ[_TRACE_ENV] == "1" else os.environ[_TRACE_ENV]
+    profile_path = args.profile or os.environ.get(_PROFILE_ENV)
+
+    if trace_path is not None or profile_path:
+        from sync_ai_rules.sync import run_instrumented
+
+        run_instrumented(args, staged, relevant, git_seconds, trace_path, profile_path)
+        return
+
+    if not relevant:
+        return
+
+    from sync_ai_rules.sync import run
+
+    run(args, staged)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+"""
+Synthetic rule corpus - generates repositories for benchmarking sync-ai-rules at scale.
+
+    python3 -m sync_ai_rules.benchmarks.corpus DIR [--rules 1000] [--reviews 200] ...
+
+The generated repository is committed to git with one rule, one code review
+file and one skill left staged, so every pipeline and post-processing step runs.
+"""
+
+import argparse
+import os
+import random
+import subprocess
+import sys
+from typing import List, NamedTuple
+
+_WORDS = (
+    "always never prefer avoid use keep ensure document test review module service "
+    "client request response cache error handler config build deploy schema query "
+    "component state effect hook render layout style token session user account"
+).split()
+
+
+class CorpusScale(NamedTuple):
+    """Size of a synthetic corpus."""
+
+    rules: int = 1000
+    reviews: int = 200
+    depth: int = 3
+    agents_kb: int = 1024
+    skills: int = 50
+
+
+def generate_corpus(root: str, scale: CorpusScale, seed: int = 0) -> None:
+    """Write a synthetic repository to root (which must not exist yet) and stage a change."""
+    rng = random.Random(seed)
+    os.makedirs(root)
+
+    rule_paths = [_write_rule(root, i, scale.depth, rng) for i in range(scale.rules)]
+    review_paths = [_write_review(root, i, scale.depth, rng) for i in range(scale.reviews)]
+    skill_paths = [_write_skill(root, i, scale.depth, rng) for i in range(scale.skills)]
+    _write_agents_md(root, scale.agents_kb, rng)
+
+    _git(root, "init", "-q")
+    _git(root, "add", "-A")
+    _git(
+        root,
+        "-c",
+        "user.name=bench",
+        "-c",
+        "user.email=bench@localhost",
+        "commit",
+        "-q",
+        "-m",
+        "corpus",
+    )
+
+    # Stage one edit per kind of source so the hook has work to do
+    staged = [paths[len(paths) // 2] for paths in (rule_paths, review_paths, skill_paths) if paths]
+    for path in staged:
+        with open(os.path.join(root, path), "a", encoding="utf-8") as f:
+            f.write(f"\n{_sentence(rng)}\n")
+    if staged:
+        _git(root, "add", "--", *staged)
+
+
+def _write_rule(root: str, index: int, depth: int, rng: random.Random) -> str:
+    path = os.path.join(".cursor", "rules", _category(index, depth, rng), f"rule-{index}.mdc")
+    header = [f"description: {_sentence(rng).rstrip('.')}"]
+    kind = index % 3
+    if kind == 0:
+        header.append(f"globs: src/**/*.{rng.choice(['ts', 'py', 'kt', 'swift'])}")
+    elif kind == 1:
+        header.append("globs:")
+        header.extend(f'  - "**/*{rng.choice(_WORDS)}*"' for _ in range(rng.randint(1, 3)))
+    header.append(f"alwaysApply: {'true' if index % 7 == 0 else 'false'}")
+    _write(root, path, "---\n" + "\n".join(header) + "\n---\n\n" + _body(rng))
+    return path
+
+
+def _write_review(root: str, index: int, depth: int, rng: random.Random) -> str:
+    path = os.path.join(".code_review", _category(index, depth, rng), f"review-{index}.md")
+    header = f"<!--\nname: Review {index}\ndescription: {_sentence(rng)}\n-->\n\n"
+    _write(root, path, header + _body(rng))
+    return path
+
+
+def _write_skill(root: str, index: int, depth: int, rng: random.Random) -> str:
+    package = os.path.join(*(f"pkg{rng.randrange(level + 3)}" for level in range(depth)))
+    path = os.path.join(package, f"app{index}", ".agents", "skills", f"skill-{index}", "SKILL.md")
+    _write(root, path, f"---\nname: skill-{index}\n---\n\n{_body(rng)}")
+    return path
+
+
+def _write_agents_md(root: str, size_kb: int, rng: random.Random) -> None:
+    """A large hand-maintained AGENTS.md with stale generated sections in the middle."""
+    filler: List[str] = []
+    size = 0
+    while size < size_kb * 1024:
+        paragraph = f"## {_sentence(rng)}\n\n{_body(rng)}"
+        filler.append(paragraph)
+        size += len(paragraph)
+    middle = len(filler) // 2
+    sections = [
+        "<auto-generated-rules>\nstale\n</auto-generated-rules>",
+        "<code-review-guidelines>\nstale\n</code-review-guidelines>",
+    ]
+    _write(root, "AGENTS.md", "\n\n".join(filler[:middle] + sections + filler[middle:]))
+
+
+def _category(index: int, depth: int, rng: random.Random) -> str:
+    """A category path up to depth levels deep; a few rules stay at the root."""
+    if index % 10 == 0:
+        return ""
+    levels = rng.randint(1, max(depth, 1))
+    return os.path.join(*(f"area{rng.randrange(4 + level)}" for level in range(levels)))
+
+
+def _sentence(rng: random.Random) -> str:
+    return " ".join(rng.choice(_WORDS) for _ in range(rng.randint(5, 12))).capitalize() + "."
+
+
+def _body(rng: random.Random) -> str:
+    paragraphs = [
+        " ".join(_sentence(rng) for _ in range(rng.randint(2, 6))) for _ in range(rng.randint(1, 4))
+    ]
+    return "\n\n".join(paragraphs) + "\n"
+
+
+def _write(root: str, path: str, content: str) -> None:
+    full_path = os.path.join(root, path)
+    os.makedirs(os.path.dirname(full_path), exist_ok=True)
+    with open(full_path, "w", encoding="utf-8") as f:
+        f.write(content)
+
+
+def _git(root: str, *args: str) -> None:
+    subprocess.run(["git", *args], cwd=root, check=True)
+
+
+def add_scale_arguments(parser: argparse.ArgumentParser) -> None:
+    """Add --rules, --reviews, --depth, --agents-kb, --skills and --seed options."""
+    defaults = CorpusScale()
+    parser.add_argument("--rules", type=int, default=defaults.rules, help=".mdc rule files")
+    parser.add_argument("--reviews", type=int, default=defaults.reviews, help=".code_review files")
+    parser.add_argument("--depth", type=int, default=defaults.depth, help="category tree depth")
+    parser.add_argument(
+        "--agents-kb", type=int, default=defaults.agents_kb, help="size of AGENTS.md in KiB"
+    )
+    parser.add_argument("--skills", type=int, default=defaults.skills, help=".agents/skills dirs")
+    parser.add_argument("--seed", type=int, default=0, help="random seed")
+
+
+def scale_from_args(args: argparse.Namespace) -> CorpusScale:
+    return CorpusScale(args.rules, args.reviews, args.depth, args.agents_kb, args.skills)
+
+
+def main(argv: List[str]) -> int:
+    """Generate a corpus into the given directory."""
+    parser = argparse.ArgumentParser(description="Generate a synthetic sync-ai-rules corpus.")
+    parser.add_argument("directory", help="directory to create")
+    add_scale_arguments(parser)
+    args = parser.parse_args(argv)
+
+    generate_corpus(args.directory, scale_from_args(args), args.seed)
+    print(f"✓ Generated corpus in {args.directory}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""
+Startup benchmark - guards the hook's no-op path against import creep.
+
+Runs the hook in a scratch git repo whose staged changes don't touch any rule
+source directory, and checks that it stays within a time budget on top of a
+bare interpreter start and never imports YAML, the orchestrator or a plugin:
+
+    python3 -m sync_ai_rules.benchmarks.startup [--budget-ms 50] [--runs 15]
+
+Also reports how long each plugin module takes to import when a sync does run.
+Timings depend on the machine, so this isn't part of ``make test``. Without git
+the hook has no staged changes to gate on, so the check is skipped.
+"""
+
+import argparse
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Dict, List
+
+# Modules the no-op path must never import
+_FORBIDDEN_PREFIXES = (
+    "yaml",
+    "argparse",
+    "logging",
+    "sync_ai_rules.sync",
+    "sync_ai_rules.core.plugin_manager",
+    "sync_ai_rules.core.parse_cache",
+    "parsers.",
+    "generators.",
+)
+
+_PACKAGE_PARENT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def _environment() -> Dict[str, str]:
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [_PACKAGE_PARENT, env.get("PYTHONPATH")]))
+    return env
+
+
+def _make_repo(directory: str) -> None:
+    """Create a git repo with a staged change outside every rule source directory."""
+    with open(os.path.join(directory, "README"), "w", encoding="utf-8") as f:
+        f.write("readme\n")
+    subprocess.run(["git", "init", "-q"], cwd=directory, check=True)
+    subprocess.run(["git", "add", "README"], cwd=directory, check=True)
+    # The first run caches the plugin layout the no-op gate relies on
+    subprocess.run(
+        [sys.executable, "-m", "sync_ai_rules"],
+        cwd=directory,
+        env=_environment(),
+        check=True,
+        stdout=subprocess.DEVNULL,
+    )
+
+
+def _best_ms(command: List[str], cwd: str, runs: int) -> float:
+    """Fastest of several runs; slower runs measure machine noise, not startup cost."""
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run(command, cwd=cwd, env=_environment(), check=True, stdout=subprocess.DEVNULL)
+        timings.append((time.perf_counter() - start) * 1000)
+    return min(timings)
+
+
+def _imported_modules(cwd: str) -> List[str]:
+    """Names of every module the hook imports, from -X importtime output."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-m", "sync_ai_rules"],
+        cwd=cwd,
+        env=_environment(),
+        check=True,
+        capture_output=True,
+        text=True,
+    )
+    modules = []
+    for line in result.stderr.splitlines():
+        if line.startswith("import time:") and "|" in line:
+            name = line.rsplit("|", 1)[1].strip()
+            if name != "imported package":
+                modules.append(name)
+    return modules
+
+
+def _plugin_import_times() -> Dict[str, float]:
+    from sync_ai_rules.core.plugin_manager import PluginManager
+
+    plugin_manager = PluginManager()
+    plugin_manager.load_plugins(os.path.join(_PACKAGE_PARENT, "sync_ai_rules"), verbose=False)
+    plugin_manager.load_all()
+    return plugin_manager.import_times
+
+
+def main(argv: List[str]) -> int:
+    """Run the benchmark and return nonzero if the no-op path is over budget."""
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument(
+        "--budget-ms", type=float, default=50.0, help="allowed overhead over bare Python"
+    )
+    parser.add_argument("--runs", type=int, default=15, help="runs per measurement")
+    args = parser.parse_args(argv)
+
+    if shutil.which("git") is None:
+        print("Skipping startup benchmark: git not found")
+        return 0
+
+    ok = True
+    with tempfile.TemporaryDirectory() as repo:
+        _make_repo(repo)
+
+        bare = _best_ms([sys.executable, "-c", "pass"], repo, args.runs)
+        hook = _best_ms([sys.executable, "-m", "sync_ai_rules"], repo, args.runs)
+        overhead = hook - bare
+        within = overhead <= args.budget_ms
+        ok = ok and within
+        print(
+            f"{'✓' if within else '✗'} No-op run: {hook:.1f}ms "
+            f"({overhead:.1f}ms over bare Python, budget {args.budget_ms:.0f}ms)"
+        )
+
+        forbidden = [m for m in _imported_modules(repo) if m.startswith(_FORBIDDEN_PREFIXES)]
+        ok = ok and not forbidden
+        if forbidden:
+            print(f"✗ No-op run imported: {', '.join(sorted(set(forbidden)))}")
+        else:
+            print("✓ No-op run imported no YAML, orchestrator or plugin modules")
+
+    import_times = _plugin_import_times()
+    print("Plugin import times:")
+    for module, seconds in sorted(import_times.items()):
+        print(f"  {module}: {seconds * 1000:.1f}ms")
+
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
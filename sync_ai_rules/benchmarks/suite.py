@@ -0,0 +1,203 @@
+#!/usr/bin/env python3
+"""
+Benchmark suite - times each stage of a sync over a synthetic corpus.
+
+Generates a repository at the requested scale (see benchmarks.corpus), then for
+each run copies it, syncs it cold (no caches) and syncs it again warm, recording
+wall time per stage and peak memory. Results are written as JSON and can be
+compared with a previous result to catch regressions:
+
+    python3 -m sync_ai_rules.benchmarks.suite --output results.json
+    python3 -m sync_ai_rules.benchmarks.suite --baseline results.json
+
+Exits nonzero if any stage or the peak memory regressed beyond the tolerance.
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import resource
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Any, Dict, List
+
+from sync_ai_rules.benchmarks.corpus import add_scale_arguments, generate_corpus, scale_from_args
+
+_RESULTS_VERSION = 1
+_RUN_KINDS = ("cold", "warm")
+
+# Stages faster than this in both results are too noisy to compare
+_NOISE_FLOOR_SECONDS = 0.005
+
+_PACKAGE_PARENT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def measure(directory: str) -> Dict[str, Any]:
+    """Sync directory in this process and return stage timings and peak memory."""
+    start = time.perf_counter()
+    os.chdir(directory)
+
+    from sync_ai_rules.core.git_utils import get_staged_changes
+
+    git_start = time.perf_counter()
+    staged = get_staged_changes()
+    git_seconds = time.perf_counter() - git_start
+
+    import_start = time.perf_counter()
+    from sync_ai_rules.core.trace import Trace
+    from sync_ai_rules.sync import run
+
+    import_seconds = time.perf_counter() - import_start
+
+    trace = Trace()
+    with contextlib.redirect_stdout(io.StringIO()):
+        run(argparse.Namespace(full=False, jobs=None, check=False, staged=False), staged, trace)
+
+    return {
+        "stages": {"git": git_seconds, "imports": import_seconds, **trace.stages},
+        "total": time.perf_counter() - start,
+        "peak_rss_kb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+    }
+
+
+def _measure_in_subprocess(directory: str) -> Dict[str, Any]:
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [_PACKAGE_PARENT, env.get("PYTHONPATH")]))
+    result = subprocess.run(
+        [sys.executable, "-m", "sync_ai_rules.benchmarks.suite", "--measure", directory],
+        env=env,
+        check=True,
+        capture_output=True,
+        text=True,
+    )
+    return json.loads(result.stdout)
+
+
+def _median_run(samples: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Median of each stage, the total and peak memory across runs."""
+    stages = {name: None for sample in samples for name in sample["stages"]}
+    return {
+        "stages": {
+            name: statistics.median(sample["stages"].get(name, 0.0) for sample in samples)
+            for name in stages
+        },
+        "total": statistics.median(sample["total"] for sample in samples),
+        "peak_rss_kb": statistics.median(sample["peak_rss_kb"] for sample in samples),
+    }
+
+
+def run_suite(args: argparse.Namespace) -> Dict[str, Any]:
+    """Generate a corpus and run cold and warm syncs on fresh copies of it."""
+    scale = scale_from_args(args)
+    samples: Dict[str, List[Dict[str, Any]]] = {kind: [] for kind in _RUN_KINDS}
+
+    with tempfile.TemporaryDirectory() as workdir:
+        template = os.path.join(workdir, "template")
+        print(f"Generating corpus: {dict(scale._asdict())}")
+        generate_corpus(template, scale, args.seed)
+
+        for index in range(args.runs):
+            copy = os.path.join(workdir, f"run{index}")
+            shutil.copytree(template, copy, symlinks=True)
+            for kind in _RUN_KINDS:
+                samples[kind].append(_measure_in_subprocess(copy))
+            shutil.rmtree(copy)
+
+    return {
+        "version": _RESULTS_VERSION,
+        "python": platform.python_version(),
+        "scale": {**scale._asdict(), "seed": args.seed},
+        "runs": {kind: _median_run(kind_samples) for kind, kind_samples in samples.items()},
+    }
+
+
+def compare(results: Dict[str, Any], baseline: Dict[str, Any], tolerance: float) -> List[str]:
+    """Return a description of every stage or peak memory that regressed beyond tolerance."""
+    regressions = []
+    for kind in _RUN_KINDS:
+        current = results["runs"][kind]
+        previous = baseline.get("runs", {}).get(kind)
+        if previous is None:
+            continue
+
+        timings = [*current["stages"].items(), ("total", current["total"])]
+        for name, seconds in timings:
+            base = previous["total"] if name == "total" else previous["stages"].get(name)
+            if base is None or seconds - base < _NOISE_FLOOR_SECONDS:
+                continue
+            if seconds > base * (1 + tolerance):
+                regressions.append(
+                    f"{kind} {name}: {seconds * 1000:.1f}ms (baseline {base * 1000:.1f}ms)"
+                )
+
+        rss, base_rss = current["peak_rss_kb"], previous["peak_rss_kb"]
+        if rss > base_rss * (1 + tolerance):
+            regressions.append(
+                f"{kind} peak memory: {rss / 1024:.1f}MiB (baseline {base_rss / 1024:.1f}MiB)"
+            )
+    return regressions
+
+
+def _print_results(results: Dict[str, Any]) -> None:
+    for kind, run in results["runs"].items():
+        print(f"{kind}: {run['total'] * 1000:.1f}ms, peak {run['peak_rss_kb'] / 1024:.1f}MiB")
+        for name, seconds in run["stages"].items():
+            print(f"  {name}: {seconds * 1000:.1f}ms")
+
+
+def main(argv: List[str]) -> int:
+    """Run the benchmark suite, optionally saving and comparing results."""
+    parser = argparse.ArgumentParser(description="Benchmark sync-ai-rules on a synthetic corpus.")
+    add_scale_arguments(parser)
+    parser.add_argument(
+        "--runs", type=int, default=3, help="cold and warm runs to take the median of"
+    )
+    parser.add_argument("--output", help="write results as JSON to this file")
+    parser.add_argument("--baseline", help="compare with results previously written by --output")
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=0.25,
+        help="allowed slowdown over the baseline (0.25 = 25%%)",
+    )
+    parser.add_argument("--measure", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.measure:
+        # Internal: one sync in a fresh process, reported as JSON on stdout
+        json.dump(measure(args.measure), sys.stdout)
+        return 0
+
+    results = run_suite(args)
+    _print_results(results)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+        print(f"✓ Results written to {args.output}")
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+        if baseline.get("scale") != results["scale"]:
+            print(f"✗ Baseline was recorded at a different scale: {baseline.get('scale')}")
+            return 1
+        regressions = compare(results, baseline, args.tolerance)
+        for regression in regressions:
+            print(f"✗ Regression: {regression}")
+        if regressions:
+            return 1
+        print(f"✓ No regressions over {args.baseline}")
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Change gate - decides which pipelines and post-processing steps staged paths affect.
+
+Each pipeline is gated on the source directories its parser declares. These
+directories are cached in a layout file, so the hook's no-op path can gate
+without importing any plugin. The layout also records the files each pipeline
+writes, the markers of its sections in them and whether it reads rule bodies,
+and is rebuilt whenever plugins.yaml or a plugin module changes.
+"""
+
+import json
+import os
+from typing import Dict, List, NamedTuple, Optional
+
+_LAYOUT_VERSION = 3
+_LAYOUT_FILENAME = "plugin-layout.json"
+_PLUGIN_SUBDIRS = ("core", "parsers", "generators")
+
+
+class PipelineLayout(NamedTuple):
+    """Where a pipeline reads rules from, the single-file outputs it writes, and what it reads."""
+
+    sources: List[str]
+    outputs: List[str]
+    needs_body: bool = True
+    # Start and end markers of its sections in outputs
+    markers: Optional[List[str]] = None
+
+
+def touches(paths: List[str], directories: List[str]) -> bool:
+    """Check if any path is inside one of directories (no directories means anywhere)."""
+    if not directories:
+        return bool(paths)
+    prefixes = tuple(os.path.normpath(directory) + "/" for directory in directories)
+    return any(path.startswith(prefixes) for path in paths)
+
+
+def touches_nested(paths: List[str], directories: List[str]) -> bool:
+    """Like touches, but also matches directories nested at any depth (e.g. a/b/.cursor/rules)."""
+    if not directories:
+        return bool(paths)
+    needles = [f"/{os.path.normpath(directory)}/" for directory in directories]
+    return any(needle in f"/{path}" for path in paths for needle in needles)
+
+
+def touches_skills(paths: List[str]) -> bool:
+    """Check if any path is inside an .agents/skills/ directory, at any depth."""
+    return any("/.agents/skills/" in f"/{path}" for path in paths)
+
+
+def pipeline_layout(pipeline) -> PipelineLayout:
+    """Build a pipeline's layout by asking its (loaded) parser and generator."""
+    generator = pipeline.generator
+    return PipelineLayout(
+        sources=sorted(os.path.normpath(d) for d in pipeline.parser.source_directories),
+        outputs=[] if generator.is_multi_file else list(generator.default_filenames),
+        needs_body=generator.needs_body,
+        markers=None if generator.is_multi_file else list(generator.get_section_markers()),
+    )
+
+
+def load_layout(cache_dir: Optional[str], plugin_dir: str) -> Optional[Dict[str, PipelineLayout]]:
+    """Return the cached layout of every pipeline, or None if it's missing or stale."""
+    if not cache_dir:
+        return None
+    try:
+        with open(os.path.join(cache_dir, _LAYOUT_FILENAME), encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if not isinstance(data, dict) or data.get("version") != _LAYOUT_VERSION:
+        return None
+    if data.get("signature") != _plugin_signature(plugin_dir):
+        return None
+    return {name: PipelineLayout(*layout) for name, layout in data["pipelines"].items()}
+
+
+def save_layout(
+    cache_dir: Optional[str], plugin_dir: str, layout: Dict[str, PipelineLayout]
+) -> None:
+    """Cache the layout of every pipeline for the next run's gate."""
+    if not cache_dir:
+        return
+    # Imported lazily: the no-op path only ever reads the layout
+    from sync_ai_rules.core.parse_cache import write_json_atomic
+
+    write_json_atomic(
+        os.path.join(cache_dir, _LAYOUT_FILENAME),
+        {
+            "version": _LAYOUT_VERSION,
+            "signature": _plugin_signature(plugin_dir),
+            "pipelines": {name: list(entry) for name, entry in layout.items()},
+        },
+    )
+
+
+def _plugin_signature(plugin_dir: str) -> List[List]:
+    """Size and mtime of plugins.yaml and every plugin and interface module."""
+    paths = [os.path.join(plugin_dir, "plugins.yaml")]
+    for subdir in _PLUGIN_SUBDIRS:
+        try:
+            entries = os.scandir(os.path.join(plugin_dir, subdir))
+        except OSError:
+            continue
+        with entries:
+            paths.extend(entry.path for entry in entries if entry.name.endswith(".py"))
+
+    signature = []
+    for path in sorted(paths):
+        try:
+            stat = os.stat(path)
+        except OSError:
+            continue
+        signature.append([os.path.relpath(path, plugin_dir), stat.st_size, stat.st_mtime_ns])
+    return signature
@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""
+Rule documents - a rule file read once and split into header and body.
+
+Parsers locate a rule's header and body while its text is in memory and record
+both on RuleMetadata as byte ranges of the file, so generators read just the
+part they need instead of scanning the rule text again.
+
+When no generator needs the bodies, a parser can read just the start of each
+file: it grows the read until its header has closed, up to a byte cap, and
+the body is never read at all.
+"""
+
+import os
+import re
+from typing import Callable, Optional, Tuple
+
+Span = Tuple[int, int]
+
+# A "---" fenced header at the very start, as in Cursor's .mdc files
+_YAML_FRONTMATTER = re.compile(r"---\s*\n(.*?)\n---\s*\n", re.DOTALL)
+_LINE_BREAK = re.compile(r"\r\n?|\n")
+
+# Bytes read first for a header; each further read doubles
+_FIRST_READ = 4096
+
+
+class Document:
+    """
+    A file's text as text mode reads it (UTF-8, universal newlines), mappable back to bytes.
+
+    The text may be just the start of the file (see read_document); size is the
+    file's full length, which the end of the text maps to either way.
+    """
+
+    __slots__ = ("_data", "size", "text")
+
+    def __init__(self, data: bytes, size: Optional[int] = None):
+        self._data = data
+        self.size = len(data) if size is None else size
+        self.text = data.decode("utf-8")
+        if "\r" in self.text:
+            self.text = self.text.replace("\r\n", "\n").replace("\r", "\n")
+
+    def byte_span(self, start: int, end: int) -> Span:
+        """Byte range in the file of the text between two character offsets."""
+        return self._byte_offset(start), self._byte_offset(end)
+
+    def _byte_offset(self, index: int) -> int:
+        if index >= len(self.text):
+            return self.size
+        if b"\r" not in self._data:
+            return index if self._data.isascii() else len(self.text[:index].encode("utf-8"))
+
+        # Line breaks were normalized: find the same line and column in the raw text
+        raw = self._data.decode("utf-8")
+        line = self.text.count("\n", 0, index)
+        column = index - (self.text.rfind("\n", 0, index) + 1)
+        line_start = 0
+        if line:
+            for count, match in enumerate(_LINE_BREAK.finditer(raw), 1):
+                if count == line:
+                    line_start = match.end()
+                    break
+        return len(raw[: line_start + column].encode("utf-8"))
+
+
+def read_document(
+    file_path: str,
+    header_read: Optional[Callable[[str], bool]] = None,
+    limit: Optional[int] = None,
+) -> Document:
+    """
+    Read a rule file, or with header_read and limit given, just enough of its start.
+
+    Args:
+        file_path: File to read
+        header_read: Whether the text read so far holds everything the parser needs
+        limit: Bytes to read at most while header_read doesn't hold; past that
+            the whole file is read
+
+    Raises:
+        OSError: If the file can't be read
+        UnicodeDecodeError: If the file (or the part read) isn't valid UTF-8
+    """
+    with open(file_path, "rb") as f:
+        if header_read is None or not limit:
+            return Document(f.read())
+
+        size = os.fstat(f.fileno()).st_size
+        data = b""
+        chunk = _FIRST_READ
+        while len(data) < limit:
+            part = f.read(min(chunk, limit - len(data)))
+            if not part:
+                return Document(data)
+            data += part
+            document = Document(_whole_characters(data), size)
+            if header_read(document.text):
+                return document
+            chunk *= 2
+        return Document(data + f.read())
+
+
+def split_yaml_frontmatter(text: str) -> Tuple[Optional[Span], int]:
+    """
+    Locate a "---" fenced header at the start of text.
+
+    Returns the character range of the header between the fences (None if there's
+    no header) and the offset the body starts at.
+    """
+    match = _YAML_FRONTMATTER.match(text)
+    if not match:
+        return None, 0
+    return match.span(1), match.end()
+
+
+def yaml_header_read(text: str) -> bool:
+    """Whether text, the start of a file, settles split_yaml_frontmatter's result for all of it."""
+    if not "---".startswith(text[:3]):
+        # No opening fence: there's no header
+        return True
+    match = _YAML_FRONTMATTER.match(text)
+    # The closing fence's trailing whitespace may continue past what was read
+    return match is not None and bool(text[match.end() :].strip())
+
+
+def _whole_characters(data: bytes) -> bytes:
+    """Data without a trailing partial UTF-8 sequence or a "\r" that may start a "\r\n"."""
+    end = len(data)
+    for back in range(1, min(4, end) + 1):
+        byte = data[end - back]
+        if byte < 0x80:
+            break
+        if byte >= 0xC0:
+            # A lead byte: drop it and its continuation bytes if the sequence is cut short
+            length = 2 if byte < 0xE0 else 3 if byte < 0xF0 else 4
+            if back < length:
+                end -= back
+            break
+    if data[end - 1 : end] == b"\r":
+        end -= 1
+    return data[:end]
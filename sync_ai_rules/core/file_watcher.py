@@ -0,0 +1,225 @@
+#!/usr/bin/env python3
+"""
+File watchers - report which files under a set of directories changed.
+
+InotifyWatcher uses Linux inotify through libc, so it needs no third-party
+package; PollingWatcher compares directory snapshots and works everywhere.
+Watched directories that don't exist yet are picked up once they appear.
+"""
+
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import time
+from typing import Dict, List, Optional, Set, Tuple
+
+# inotify event masks, from <sys/inotify.h>
+_IN_MODIFY = 0x00000002
+_IN_ATTRIB = 0x00000004
+_IN_CLOSE_WRITE = 0x00000008
+_IN_MOVED_FROM = 0x00000040
+_IN_MOVED_TO = 0x00000080
+_IN_CREATE = 0x00000100
+_IN_DELETE = 0x00000200
+_IN_DELETE_SELF = 0x00000400
+_IN_MOVE_SELF = 0x00000800
+_IN_Q_OVERFLOW = 0x00004000
+_IN_IGNORED = 0x00008000
+_IN_ONLYDIR = 0x01000000
+_IN_ISDIR = 0x40000000
+_IN_NONBLOCK = 0o4000
+_IN_CLOEXEC = 0o2000000
+
+_WATCH_MASK = (
+    _IN_MODIFY
+    | _IN_ATTRIB
+    | _IN_CLOSE_WRITE
+    | _IN_MOVED_FROM
+    | _IN_MOVED_TO
+    | _IN_CREATE
+    | _IN_DELETE
+    | _IN_DELETE_SELF
+    | _IN_MOVE_SELF
+    | _IN_ONLYDIR
+)
+_EVENT_HEADER = struct.Struct("iIII")
+_READ_SIZE = 64 * 1024
+
+# Directories never worth watching (VCS metadata, dependency and build trees)
+_IGNORE_DIRS = {".git", ".hg", ".svn", "node_modules", "__pycache__", ".venv", "venv"}
+
+# Returned by wait() when events were lost and every watched file may have changed
+OVERFLOW = None
+
+
+class FileWatcher:
+    """Base class: watches directory trees and reports changed paths."""
+
+    def __init__(self, roots: List[str]):
+        self.roots = sorted(set(roots))
+
+    def wait(self, timeout: Optional[float]) -> Optional[Set[str]]:
+        """
+        Wait up to timeout seconds (forever if None) for changes.
+
+        Returns the absolute paths of changed files and directories (empty on a
+        timeout), or OVERFLOW if changes were lost and everything should be rescanned.
+        """
+        raise NotImplementedError
+
+    def close(self) -> None:
+        """Release any resources held by the watcher."""
+
+
+class InotifyWatcher(FileWatcher):
+    """Watches directory trees with inotify, adding watches for new subdirectories."""
+
+    def __init__(self, roots: List[str]):
+        super().__init__(roots)
+        self._libc = _load_libc()
+        if self._libc is None:
+            raise OSError("inotify is not available")
+        self._fd = self._libc.inotify_init1(_IN_NONBLOCK | _IN_CLOEXEC)
+        if self._fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self._paths: Dict[int, str] = {}
+        self._missing: List[str] = []
+        for root in self.roots:
+            if not self._watch_tree(root):
+                self._missing.append(root)
+
+    def wait(self, timeout: Optional[float]) -> Optional[Set[str]]:
+        changed = self._check_missing()
+        if changed:
+            return changed
+
+        ready, _, _ = select.select([self._fd], [], [], timeout)
+        if not ready:
+            return self._check_missing()
+        try:
+            data = os.read(self._fd, _READ_SIZE)
+        except BlockingIOError:
+            return set()
+
+        offset = 0
+        while offset < len(data):
+            wd, mask, _, length = _EVENT_HEADER.unpack_from(data, offset)
+            offset += _EVENT_HEADER.size
+            name = data[offset : offset + length].rstrip(b"\0").decode("utf-8", "surrogateescape")
+            offset += length
+
+            if mask & _IN_Q_OVERFLOW:
+                return OVERFLOW
+            if mask & _IN_IGNORED:
+                self._paths.pop(wd, None)
+                continue
+            directory = self._paths.get(wd)
+            if directory is None:
+                continue
+
+            path = os.path.join(directory, name) if name else directory
+            changed.add(path)
+            if mask & (_IN_CREATE | _IN_MOVED_TO) and mask & _IN_ISDIR:
+                # Files may have been written into the new directory before it was watched
+                self._watch_tree(path)
+                changed.update(_files_under(path))
+            root_gone = mask & (_IN_DELETE_SELF | _IN_MOVE_SELF) and directory in self.roots
+            if root_gone and directory not in self._missing:
+                self._missing.append(directory)
+        return changed
+
+    def close(self) -> None:
+        os.close(self._fd)
+
+    def _watch_tree(self, root: str) -> bool:
+        """Watch root and every directory under it; returns False if root doesn't exist."""
+        if not os.path.isdir(root):
+            return False
+        for dirpath, dirnames, _ in os.walk(root):
+            dirnames[:] = [d for d in dirnames if d not in _IGNORE_DIRS]
+            wd = self._libc.inotify_add_watch(self._fd, os.fsencode(dirpath), _WATCH_MASK)
+            if wd >= 0:
+                self._paths[wd] = dirpath
+        return True
+
+    def _check_missing(self) -> Set[str]:
+        """Start watching missing roots that now exist; returns the files found in them."""
+        changed: Set[str] = set()
+        still_missing = []
+        for root in self._missing:
+            if self._watch_tree(root):
+                changed.add(root)
+                changed.update(_files_under(root))
+            else:
+                still_missing.append(root)
+        self._missing = still_missing
+        return changed
+
+
+class PollingWatcher(FileWatcher):
+    """Detects changes by comparing snapshots of file stat info every interval."""
+
+    def __init__(self, roots: List[str], interval: float = 0.5):
+        super().__init__(roots)
+        self.interval = interval
+        self._snapshot = self._scan()
+
+    def wait(self, timeout: Optional[float]) -> Optional[Set[str]]:
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            snapshot = self._scan()
+            changed = {
+                path
+                for path in snapshot.keys() | self._snapshot.keys()
+                if snapshot.get(path) != self._snapshot.get(path)
+            }
+            self._snapshot = snapshot
+            if changed:
+                return changed
+
+            remaining = None if deadline is None else deadline - time.monotonic()
+            if remaining is not None and remaining <= 0:
+                return set()
+            time.sleep(self.interval if remaining is None else min(self.interval, remaining))
+
+    def _scan(self) -> Dict[str, Tuple[int, int, int]]:
+        snapshot = {}
+        for root in self.roots:
+            for path in _files_under(root):
+                try:
+                    st = os.stat(path)
+                except OSError:
+                    continue
+                snapshot[path] = (st.st_mtime_ns, st.st_size, st.st_ino)
+        return snapshot
+
+
+def create_watcher(roots: List[str], poll: bool = False) -> FileWatcher:
+    """Return an inotify watcher where available (unless poll is set), else a polling one."""
+    if not poll:
+        try:
+            return InotifyWatcher(roots)
+        except OSError:
+            pass
+    return PollingWatcher(roots)
+
+
+def _files_under(root: str) -> List[str]:
+    files = []
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames[:] = [d for d in dirnames if d not in _IGNORE_DIRS]
+        files.extend(os.path.join(dirpath, name) for name in filenames)
+    return files
+
+
+def _load_libc() -> Optional[ctypes.CDLL]:
+    """Libc with the inotify functions, or None on platforms without them."""
+    try:
+        libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+        libc.inotify_init1.argtypes = [ctypes.c_int]
+        libc.inotify_add_watch.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+    except (OSError, AttributeError):
+        return None
+    return libc
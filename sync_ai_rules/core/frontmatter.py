@@ -0,0 +1,180 @@
+#!/usr/bin/env python3
+"""
+Frontmatter engine - fast paths for the simple headers nearly all rule files use.
+
+Flat ``key: value`` YAML headers are parsed by a hand-written scanner that only
+accepts scalars it can resolve exactly like yaml.safe_load; anything else falls
+back to libyaml's CSafeLoader when installed, or PyYAML's pure-Python loader.
+Conformance with safe_load is checked by test/frontmatter_conformance.py.
+"""
+
+import re
+from typing import Any, Dict, Optional, Tuple
+
+# Values (and keys) YAML 1.1 resolves to booleans or null rather than strings
+_BOOLEANS = {
+    **dict.fromkeys(("yes", "Yes", "YES", "true", "True", "TRUE", "on", "On", "ON"), True),
+    **dict.fromkeys(("no", "No", "NO", "false", "False", "FALSE", "off", "Off", "OFF"), False),
+}
+_NULLS = {"", "~", "null", "Null", "NULL"}
+
+_KEY = re.compile(r"[A-Za-z_][A-Za-z0-9_-]*")
+
+# A plain scalar starting with any of these is an indicator, number, timestamp,
+# special float or merge/value key, so it's left to the full YAML loader
+_UNSAFE_FIRST_CHARS = set("-?:,[]{}#&*!|>'\"%@`=<+.0123456789")
+
+# Characters PyYAML refuses to load
+_NON_PRINTABLE = re.compile(
+    "[^\x09\x0a\x0d\x20-\x7e\x85\xa0-\ud7ff\ue000-\ufffd\U00010000-\U0010ffff]"
+)
+
+# Constructs whose handling differs between libyaml's CSafeLoader and safe_load:
+# tabs, tags, byte order marks, NEL line breaks, complex keys, flow mappings and
+# block scalar headers directly followed by a comment
+_LIBYAML_DIVERGENT = "\t!\ufeff\x85?{"
+_LIBYAML_DIVERGENT_BLOCK_HEADER = re.compile(r"[|>][-+0-9]*#")
+
+
+class FrontmatterError(ValueError):
+    """Raised when frontmatter isn't valid YAML."""
+
+
+class _NotSimple(Exception):
+    """Raised by the fast path when a header needs the full YAML loader."""
+
+
+def load_yaml(text: str) -> Any:
+    """
+    Load a YAML frontmatter block with the same result as yaml.safe_load.
+
+    Raises:
+        FrontmatterError: If the frontmatter isn't valid YAML
+    """
+    try:
+        return _load_flat_mapping(text)
+    except _NotSimple:
+        return _load_full_yaml(text)
+
+
+def find_html_comment(content: str) -> Optional[str]:
+    """
+    Return the body of the first line-initial ``<!--`` ... ``-->`` block, or None.
+
+    Equivalent to re.search(r"^<!--\\s*\\n(.*?)\\n-->", content, re.MULTILINE | re.DOTALL)
+    but built on str.find, so the scan stops as soon as the block closes.
+    """
+    span = find_html_comment_span(content)
+    return content[span[0] : span[1]] if span is not None else None
+
+
+def find_html_comment_span(content: str) -> Optional[Tuple[int, int]]:
+    """Like find_html_comment, but return the character range of the block's body."""
+    pos = 0
+    while True:
+        start = content.find("<!--", pos)
+        if start == -1:
+            return None
+        pos = start + 1
+        if start != 0 and content[start - 1] != "\n":
+            continue
+
+        # \s*\n: the whitespace run after "<!--" must contain a newline; the regex
+        # backtracks from the last newline in the run
+        ws_start = start + 4
+        ws_end = ws_start
+        while ws_end < len(content) and content[ws_end].isspace():
+            ws_end += 1
+        last_newline = content.rfind("\n", ws_start, ws_end)
+        if last_newline == -1:
+            continue
+
+        close = content.find("\n-->", last_newline + 1)
+        if close != -1:
+            return last_newline + 1, close
+
+        # Otherwise the block can only close right at the last newline of the run
+        previous_newline = content.rfind("\n", ws_start, last_newline)
+        if previous_newline != -1 and content.startswith("-->", last_newline + 1):
+            return previous_newline + 1, last_newline
+
+
+def html_comment_read(content: str) -> bool:
+    """Whether find_html_comment_span gives the whole file's result for content, its start."""
+    span = find_html_comment_span(content)
+    # A block closing right after its opening run might still close later in the file instead
+    return span is not None and bool(content[span[0] : span[1]].strip())
+
+
+def parse_key_values(text: str) -> Dict[str, str]:
+    """Parse ``key: value`` lines, ignoring lines without a colon."""
+    metadata = {}
+    for line in text.split("\n"):
+        line = line.strip()
+        if ":" in line:
+            key, value = line.split(":", 1)
+            metadata[key.strip()] = value.strip()
+    return metadata
+
+
+def _load_flat_mapping(text: str) -> Any:
+    """Parse a header of unindented ``key: scalar`` lines, or raise _NotSimple."""
+    # Also bail on byte order marks and the extra line breaks YAML recognizes
+    if _NON_PRINTABLE.search(text) or any(c in text for c in "\t\r\x85\u2028\u2029\ufeff"):
+        raise _NotSimple
+
+    result: Dict[str, Any] = {}
+    for line in text.split("\n"):
+        if not line.strip():
+            continue
+
+        match = _KEY.match(line)
+        if not match or match.group() in _BOOLEANS or match.group() in _NULLS:
+            raise _NotSimple
+        key = match.group()
+        rest = line[match.end() :]
+        if rest == ":":
+            value = ""
+        elif rest.startswith(": "):
+            value = rest[2:].strip(" ")
+        else:
+            raise _NotSimple
+
+        result[key] = _resolve_scalar(value)
+
+    return result or None
+
+
+def _resolve_scalar(value: str) -> Any:
+    if value in _NULLS:
+        return None
+    if value in _BOOLEANS:
+        return _BOOLEANS[value]
+
+    quote = value[0]
+    if quote in "\"'":
+        # Only quoted strings without escapes or embedded quotes
+        inner = value[1:-1]
+        if len(value) < 2 or value[-1] != quote or quote in inner or "\\" in inner:
+            raise _NotSimple
+        return inner
+
+    if value[0] in _UNSAFE_FIRST_CHARS or ": " in value or " #" in value:
+        raise _NotSimple
+    if value.endswith(":"):
+        raise _NotSimple
+    return value
+
+
+def _load_full_yaml(text: str) -> Any:
+    # Imported lazily so headers handled by the fast path never pay for PyYAML
+    import yaml
+
+    loader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+    # libyaml differs from PyYAML on tabs, empty tags and byte order marks
+    if any(c in text for c in _LIBYAML_DIVERGENT) or _LIBYAML_DIVERGENT_BLOCK_HEADER.search(text):
+        loader = yaml.SafeLoader
+    try:
+        return yaml.load(text, Loader=loader)
+    except yaml.YAMLError as e:
+        raise FrontmatterError(str(e)) from e
@@ -1,8 +1,9 @@
 #!/usr/bin/env python3
 
 from abc import ABC, abstractmethod
-from typing import Any, Dict, List
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Set, TextIO
 
+from sync_ai_rules.core.reconciler import OutputReconciler
 from sync_ai_rules.core.rule_metadata import RuleMetadata
 
 
@@ -23,17 +24,60 @@ class OutputGenerator(ABC):
     def generate(self, rules: Dict[str, List[RuleMetadata]], config: Dict[str, Any]) -> str:
         """Generate output content from grouped rules."""
 
+    def generate_chunks(
+        self, rules: Dict[str, List[RuleMetadata]], config: Dict[str, Any]
+    ) -> Iterator[str]:
+        """
+        Generate output content as a stream of text chunks that concatenate to generate().
+
+        Streaming generators override this so large outputs flow into files without
+        being assembled in memory; by default it adapts generate() as a single chunk.
+        """
+        yield self.generate(rules, config)
+
+    def generate_to(
+        self, sink: TextIO, rules: Dict[str, List[RuleMetadata]], config: Dict[str, Any]
+    ) -> None:
+        """Write the generated content to a file-like sink, chunk by chunk."""
+        for chunk in self.generate_chunks(rules, config):
+            sink.write(chunk)
+
     @abstractmethod
     def get_section_markers(self) -> tuple[str, str]:
         """Return start and end markers for auto-generated section."""
 
+    def invalidate_categories(self, categories: Optional[Iterable[str]] = None) -> None:
+        """Forget renderings reused across generate() calls for these categories (all if None)."""
+        # Intentionally a no-op: only generators that reuse renderings override it
+        return
+
+    @property
+    def needs_body(self) -> bool:
+        """
+        Whether this generator reads rule bodies (body or raw_content), not just metadata.
+        Generators that only list rules return False, letting parsers read just file headers.
+        """
+        return True
+
     @property
     def is_multi_file(self) -> bool:
         """Whether this generator creates files directly via generate_files()."""
         return False
 
-    def generate_files(self, rules: Dict[str, List[RuleMetadata]], project_root: str) -> None:
-        """Generate multiple files directly. Only called when is_multi_file is True."""
+    def generate_files(
+        self,
+        rules: Dict[str, List[RuleMetadata]],
+        project_root: str,
+        reconciler: Optional[OutputReconciler] = None,
+        changed_paths: Optional[Set[str]] = None,
+    ) -> None:
+        """
+        Generate multiple files directly. Only called when is_multi_file is True.
+
+        Files should be written through reconciler so unchanged outputs aren't rewritten.
+        If changed_paths is given, only outputs of rules with those relative paths
+        (including deleted rules) need to be regenerated.
+        """
         raise NotImplementedError(
             f"{type(self).__name__} sets is_multi_file=True but does not implement generate_files()"
         )
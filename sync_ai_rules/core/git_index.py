@@ -0,0 +1,212 @@
+#!/usr/bin/env python3
+"""
+Git index - rule source files listed, and optionally read, through git.
+
+Full scans list candidate files with one ``git ls-files`` call instead of
+walking source directories, so ignored and untracked directories lying around
+in the working tree are never visited.
+
+With --staged the hook syncs from exactly what is being committed: source files
+are listed with ``git ls-files --stage`` and their blobs are streamed through a
+single ``git cat-file --batch`` process, instead of opening each file in the
+working tree (where unstaged edits would leak into the generated outputs).
+"""
+
+import os
+import subprocess
+import threading
+from typing import Dict, List, Optional, Tuple
+
+from sync_ai_rules.core.git_utils import run_git
+
+# Index entries that aren't regular files: symlinks and submodules
+_SKIPPED_MODES = ("120000", "160000")
+_SUBMODULE_MODE = "160000"
+
+# ls-files -t tags of entries missing from the working tree: removed, and
+# skip-worktree entries of sparse checkouts
+_ABSENT_TAGS = ("R", "S")
+
+
+def worktree_files(
+    project_root: str, source_dirs: List[str]
+) -> Optional[Tuple[List[str], List[str]]]:
+    """
+    List the files under source_dirs that are tracked or untracked but not ignored.
+
+    Uses one ``git ls-files`` call. Tracked files deleted from the working tree
+    are left out. Returns (files, directories git doesn't list files of, i.e.
+    submodules and nested repositories), relative to project_root, or None if
+    project_root isn't in a git work tree.
+    """
+    output = run_git(
+        "-C",
+        project_root,
+        "ls-files",
+        "-z",
+        "-t",
+        "--stage",
+        "--cached",
+        "--others",
+        "--deleted",
+        "--exclude-standard",
+        "--",
+        *source_dirs,
+    )
+    if output is None:
+        return None
+
+    files = set()
+    absent = set()
+    directories = set()
+    for entry in output.split("\0"):
+        if not entry:
+            continue
+        tag, rest = entry.split(" ", 1)
+        if tag == "?":
+            # Untracked; a trailing slash marks a nested repository
+            (directories if rest.endswith("/") else files).add(rest.rstrip("/"))
+            continue
+        info, rel_path = rest.split("\t", 1)
+        if tag in _ABSENT_TAGS:
+            absent.add(rel_path)
+        elif info.startswith(_SUBMODULE_MODE):
+            directories.add(rel_path)
+        else:
+            files.add(rel_path)
+    return sorted(files - absent), sorted(directories)
+
+
+class BlobReader:
+    """A long-lived ``git cat-file --batch`` process, started on first use."""
+
+    def __init__(self, cwd: str):
+        self.cwd = cwd
+        self._process: Optional[subprocess.Popen] = None
+        self._lock = threading.Lock()
+
+    def read(self, object_ids: List[str]) -> Dict[str, Optional[bytes]]:
+        """
+        Read many blobs in one round trip.
+
+        Args:
+            object_ids: Object names to read
+
+        Returns:
+            Each object's content, or None if git doesn't have it
+
+        Raises:
+            OSError: If git can't be started or exits early
+        """
+        object_ids = list(dict.fromkeys(object_ids))
+        if not object_ids:
+            return {}
+        with self._lock:
+            process = self._start()
+            # Requests are written from another thread so a full stdout pipe can't deadlock us
+            writer = threading.Thread(
+                target=_write_requests, args=(process.stdin, object_ids), daemon=True
+            )
+            writer.start()
+            try:
+                return {object_id: _read_object(process.stdout) for object_id in object_ids}
+            finally:
+                writer.join()
+
+    def close(self) -> None:
+        """Stop the git process, if running."""
+        if self._process is not None:
+            self._process.stdin.close()
+            self._process.wait()
+            self._process.stdout.close()
+            self._process = None
+
+    def _start(self) -> subprocess.Popen:
+        if self._process is None:
+            self._process = subprocess.Popen(
+                ["git", "cat-file", "--batch"],
+                cwd=self.cwd,
+                stdin=subprocess.PIPE,
+                stdout=subprocess.PIPE,
+            )
+        return self._process
+
+
+class StagedSnapshot:
+    """The staged versions of a project's files, listed and read through git."""
+
+    def __init__(self, project_root: str):
+        self.project_root = project_root
+        self._reader = BlobReader(project_root)
+
+    def list_files(self, source_dirs: List[str]) -> Optional[Dict[str, str]]:
+        """
+        Return the staged regular files under source_dirs, mapped to their blob names.
+
+        Paths are relative to the project root. Returns None if git isn't usable.
+        """
+        output = run_git("-C", self.project_root, "ls-files", "--stage", "-z", "--", *source_dirs)
+        if output is None:
+            return None
+
+        files = {}
+        for entry in output.split("\0"):
+            if not entry:
+                continue
+            info, rel_path = entry.split("\t", 1)
+            mode, object_id, stage = info.split(" ")
+            # Unmerged paths have no single staged version
+            if mode in _SKIPPED_MODES or stage != "0":
+                continue
+            files[rel_path] = object_id
+        return files
+
+    def read(self, files: Dict[str, str]) -> Dict[str, bytes]:
+        """Read the staged content of files (as returned by list_files), keyed by path."""
+        blobs = self._reader.read(list(files.values()))
+        return {
+            rel_path: blobs[object_id]
+            for rel_path, object_id in files.items()
+            if blobs.get(object_id) is not None
+        }
+
+    def close(self) -> None:
+        self._reader.close()
+
+    def __enter__(self) -> "StagedSnapshot":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+def open_snapshot(project_root: str) -> Optional[StagedSnapshot]:
+    """Return a snapshot of project_root's staged files, or None if it isn't in a git work tree."""
+    inside = run_git("-C", project_root, "rev-parse", "--is-inside-work-tree")
+    if inside is None or inside.strip() != "true":
+        return None
+    return StagedSnapshot(os.path.abspath(project_root))
+
+
+def _write_requests(stdin, object_ids: List[str]) -> None:
+    try:
+        stdin.write("".join(f"{object_id}\n" for object_id in object_ids).encode())
+        stdin.flush()
+    except OSError:
+        # git exited; the reader sees the truncated output
+        pass
+
+
+def _read_object(stdout) -> Optional[bytes]:
+    header = stdout.readline()
+    if not header:
+        raise OSError("git cat-file exited unexpectedly")
+    fields = header.split()
+    if fields[-1] == b"missing" or fields[-1] == b"ambiguous":
+        return None
+    size = int(fields[2])
+    data = stdout.read(size)
+    stdout.read(1)  # Trailing newline
+    if len(data) != size:
+        raise OSError("git cat-file exited unexpectedly")
+    return data if fields[1] == b"blob" else None
@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+Thin git helpers. Kept free of heavy imports since the hook's no-op path uses them.
+"""
+
+import os
+import subprocess
+from typing import List, Optional
+
+
+def run_git(*args: str) -> Optional[str]:
+    """Run a git command and return its stdout, or None if git fails or isn't installed."""
+    try:
+        result = subprocess.run(
+            ["git", *args],
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+    except (subprocess.CalledProcessError, FileNotFoundError):
+        return None
+    return result.stdout
+
+
+def get_staged_changes() -> Optional[List[str]]:
+    """
+    Return staged paths, listing both sides of renames, or None if git isn't usable.
+
+    Renames are split into a deletion and an addition so moving a file out of a
+    source directory is still seen as a change to that directory.
+    """
+    output = run_git("diff", "--cached", "--name-only", "--no-renames", "-z")
+    if output is None:
+        return None
+    return [path for path in output.split("\0") if path]
+
+
+def find_cache_dir(project_root: str) -> Optional[str]:
+    """
+    Return the directory to persist caches in, or None to keep them in memory.
+
+    Defaults to .git/sync-ai-rules so caches survive across hook runs without
+    ever showing up in the working tree. Can be overridden with
+    SYNC_AI_RULES_CACHE_DIR or disabled with SYNC_AI_RULES_NO_CACHE=1.
+    """
+    if os.environ.get("SYNC_AI_RULES_NO_CACHE"):
+        return None
+
+    override = os.environ.get("SYNC_AI_RULES_CACHE_DIR")
+    if override:
+        return override
+
+    git_path = os.path.join(project_root, ".git")
+    if os.path.isdir(git_path):
+        return os.path.join(git_path, "sync-ai-rules")
+
+    # Worktrees and submodules have a .git file pointing at the real git dir
+    if os.path.isfile(git_path):
+        try:
+            with open(git_path, encoding="utf-8") as f:
+                line = f.readline().strip()
+        except OSError:
+            return None
+        if line.startswith("gitdir:"):
+            git_dir = os.path.join(project_root, line[len("gitdir:") :].strip())
+            return os.path.join(os.path.normpath(git_dir), "sync-ai-rules")
+
+    return None
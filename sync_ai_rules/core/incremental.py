@@ -0,0 +1,230 @@
+#!/usr/bin/env python3
+"""
+Incremental sync state - lets a run re-parse only the rule files that changed.
+
+The state records the rules parsed by the previous run together with the HEAD
+trees of the source directories and the paths that differed from HEAD at that
+time. Any file that differs between then and now must be in one of: the paths
+dirty then, the paths dirty now, or the diff between the two HEAD trees.
+"""
+
+import os
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Set, Tuple
+
+from sync_ai_rules.core.git_utils import run_git
+from sync_ai_rules.core.parse_cache import read_json, write_json_atomic
+from sync_ai_rules.core.parser_interface import InputParser
+from sync_ai_rules.core.rule_metadata import RuleMetadata
+
+_STATE_VERSION = 1
+_STATE_FILENAME = "incremental-state.json"
+
+
+@dataclass
+class RuleChanges:
+    """Rule paths and categories touched by an incremental update for one parser."""
+
+    paths: Set[str] = field(default_factory=set)
+    categories: Set[str] = field(default_factory=set)
+
+
+class SyncState:
+    """Rules from the previous run and the git state they were parsed from."""
+
+    def __init__(self, cache_dir: Optional[str], salt: str, project_root: str):
+        self.path = os.path.join(cache_dir, _STATE_FILENAME) if cache_dir else None
+        self.salt = salt
+        # Rules are read back from their files on demand, so they must not move
+        self.project_root = project_root
+        self._rules: Dict[str, Dict[str, RuleMetadata]] = {}
+        self._trees: Dict[str, Optional[str]] = {}
+        self._dirty: Set[str] = set()
+        self._valid = False
+        self._load()
+
+    def changed_paths(
+        self, source_dirs: List[str], staged: Optional[List[str]], prefix: str = ""
+    ) -> Optional[Tuple[Set[str], Dict[str, Optional[str]], Set[str]]]:
+        """
+        Work out which source files may have changed since the previous run.
+
+        prefix is the project root's path within the git working tree ("" at its
+        top). Returns (changed paths, current HEAD trees, currently dirty paths), or
+        None if a full scan is needed because the state is missing or can't be trusted.
+        """
+        if not self._valid or staged is None:
+            return None
+        # Source directories the previous runs never covered need a full scan
+        if any(rel_dir not in self._trees for rel_dir in source_dirs):
+            return None
+
+        trees = head_trees(source_dirs, prefix)
+        dirty = dirty_paths(source_dirs, prefix)
+        if trees is None or dirty is None:
+            return None
+
+        changed = set(staged) | dirty | self._dirty
+        for rel_dir in source_dirs:
+            diff = _tree_diff(self._trees[rel_dir], trees[rel_dir], rel_dir)
+            if diff is None:
+                return None
+            changed |= diff
+
+        return changed, trees, dirty
+
+    def apply(
+        self,
+        parsers: List[InputParser],
+        updates: Dict[InputParser, Dict[str, Optional[RuleMetadata]]],
+    ) -> Tuple[Dict[InputParser, List[RuleMetadata]], Dict[InputParser, RuleChanges]]:
+        """Merge re-parsed rules into the previous run's rules."""
+        rules_by_parser: Dict[InputParser, List[RuleMetadata]] = {}
+        changes_by_parser: Dict[InputParser, RuleChanges] = {}
+
+        for parser in parsers:
+            rules = self._rules.setdefault(parser.name, {})
+            changes = RuleChanges()
+            for rel_path, rule in updates.get(parser, {}).items():
+                previous = rules.pop(rel_path, None)
+                if previous is not None:
+                    changes.categories.add(previous.category)
+                if rule is not None:
+                    rules[rel_path] = rule
+                    changes.categories.add(rule.category)
+                if previous is not None or rule is not None:
+                    changes.paths.add(rel_path)
+
+            rules_by_parser[parser] = [rules[path] for path in sorted(rules)]
+            changes_by_parser[parser] = changes
+
+        return rules_by_parser, changes_by_parser
+
+    def rule_paths(self) -> Set[str]:
+        """Relative paths of every rule currently known, across parsers."""
+        return {path for rules in self._rules.values() for path in rules}
+
+    def record(
+        self,
+        rules_by_parser: Dict[InputParser, List[RuleMetadata]],
+        trees: Optional[Dict[str, Optional[str]]],
+        dirty: Optional[Set[str]],
+    ) -> None:
+        """
+        Remember this run's rules and the git state they were parsed from.
+
+        Parsers and source directories this run skipped keep their previous state,
+        so changes made under them since are still picked up when they next run.
+        """
+        if trees is None or dirty is None:
+            self._valid = False
+            return
+        if not self._valid:
+            self._rules, self._trees, self._dirty = {}, {}, set()
+
+        for parser, rules in rules_by_parser.items():
+            self._rules[parser.name] = {rule.relative_path: rule for rule in rules}
+        prefixes = tuple(f"{rel_dir}/" for rel_dir in trees)
+        self._dirty = {path for path in self._dirty if not path.startswith(prefixes)} | dirty
+        self._trees.update(trees)
+        self._valid = True
+
+    def save(self) -> None:
+        """Persist the state; rules that can't be serialized are re-parsed next time."""
+        if not self.path:
+            return
+        if not self._valid:
+            if os.path.exists(self.path):
+                os.remove(self.path)
+            return
+
+        rules: Dict[str, Dict[str, dict]] = {}
+        dirty = set(self._dirty)
+        for parser_name, parser_rules in self._rules.items():
+            serialized = rules.setdefault(parser_name, {})
+            for rel_path, rule in parser_rules.items():
+                data = rule.to_dict()
+                if data is None:
+                    dirty.add(rel_path)
+                else:
+                    serialized[rel_path] = data
+
+        write_json_atomic(
+            self.path,
+            {
+                "version": _STATE_VERSION,
+                "salt": self.salt,
+                "project_root": self.project_root,
+                "trees": self._trees,
+                "dirty": sorted(dirty),
+                "rules": rules,
+            },
+        )
+
+    def _load(self) -> None:
+        data = read_json(self.path)
+        if not isinstance(data, dict):
+            return
+        if data.get("version") != _STATE_VERSION or data.get("salt") != self.salt:
+            return
+        if data.get("project_root") != self.project_root:
+            return
+        self._rules = {
+            parser_name: {path: RuleMetadata.from_dict(rule) for path, rule in rules.items()}
+            for parser_name, rules in data["rules"].items()
+        }
+        self._trees = data["trees"]
+        self._dirty = set(data["dirty"])
+        self._valid = True
+
+
+def head_trees(source_dirs: List[str], prefix: str = "") -> Optional[Dict[str, Optional[str]]]:
+    """Return the HEAD tree id of each source directory (None if absent from HEAD)."""
+    output = run_git("ls-tree", "-z", "HEAD", "--", *(prefix + d for d in source_dirs))
+    if output is None:
+        return None
+
+    trees: Dict[str, Optional[str]] = dict.fromkeys(source_dirs)
+    for entry in output.split("\0"):
+        if not entry:
+            continue
+        info, path = entry.split("\t", 1)
+        _, obj_type, obj_id = info.split()
+        path = path[len(prefix) :]
+        if obj_type == "tree" and path in trees:
+            trees[path] = obj_id
+    return trees
+
+
+def dirty_paths(source_dirs: List[str], prefix: str = "") -> Optional[Set[str]]:
+    """Return paths in source directories that differ from HEAD, including untracked files."""
+    output = run_git(
+        "status",
+        "--porcelain=v1",
+        "-z",
+        "--untracked-files=all",
+        "--no-renames",
+        "--",
+        *(prefix + d for d in source_dirs),
+    )
+    if output is None:
+        return None
+    # Each entry is "XY path", with the path relative to the top of the working tree
+    return {
+        entry[3 + len(prefix) :]
+        for entry in output.split("\0")
+        if len(entry) > 3 and entry.startswith(prefix, 3)
+    }
+
+
+def _tree_diff(old: Optional[str], new: Optional[str], prefix: str) -> Optional[Set[str]]:
+    """Return paths that differ between two trees of the same source directory."""
+    if old == new:
+        return set()
+    if old is None or new is None:
+        output = run_git("ls-tree", "-r", "-z", "--name-only", old or new)
+    else:
+        output = run_git("diff", "--name-only", "--no-renames", "-z", old, new)
+    if output is None:
+        return None
+    return {f"{prefix}/{path}" for path in output.split("\0") if path}
@@ -0,0 +1,270 @@
+#!/usr/bin/env python3
+"""
+Output manifest - lets a run skip pipelines whose inputs and outputs haven't changed.
+
+Inputs are fingerprinted Merkle-style: each source file's content hash feeds a
+hash of its source directory, and a pipeline's fingerprint combines those with
+a salt covering plugins.yaml and the plugin modules. Source files are listed as
+the scanner lists them, so files git ignores don't count. The manifest records the
+fingerprint each pipeline's outputs were generated from, plus the size, mtime
+and content hash of every output written. Unchanged files are recognised by
+their size and mtime, so checking a run is mostly stat calls.
+
+Files shared between pipelines (like AGENTS.md) are rewritten whenever any of
+their sections is, so the manifest also hashes each pipeline's section of them.
+A section edited by hand is then noticed even after another pipeline has
+rewritten the file around it.
+"""
+
+import hashlib
+import os
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from sync_ai_rules.core.parse_cache import hash_file, read_json, trusted_mtime, write_json_atomic
+from sync_ai_rules.core.reconciler import REMOVED, OutputReconciler
+from sync_ai_rules.core.scanner import list_source_files
+from sync_ai_rules.file_updater import find_demarcated_section
+
+_MANIFEST_VERSION = 2
+_MANIFEST_FILENAME = "output-manifest.json"
+
+
+class OutputManifest:
+    """Fingerprints the outputs were generated from, and the outputs as written."""
+
+    def __init__(self, cache_dir: Optional[str], salt: str, project_root: str):
+        self.path = os.path.join(cache_dir, _MANIFEST_FILENAME) if cache_dir else None
+        self.salt = salt
+        self.project_root = project_root
+        # Pipeline name -> fingerprint of the inputs its outputs were generated from
+        self._generated_from: Dict[str, str] = {}
+        # Output path -> [size, mtime_ns, sha256] as last written or verified
+        self._outputs: Dict[str, List] = {}
+        # Output path -> names of the pipelines that write it
+        self._owners: Dict[str, List[str]] = {}
+        # Output path -> pipeline name -> [start marker, end marker, sha256 of its
+        # section as written], with None for the hash once the section was edited
+        self._sections: Dict[str, Dict[str, List]] = {}
+        self._intact: Dict[str, bool] = {}
+        # Source file path -> [size, mtime_ns, sha256], so unchanged files aren't re-read
+        self._sources: Dict[str, List] = {}
+        self._directory_hashes: Dict[str, Optional[str]] = {}
+        self._seen: Set[str] = set()
+        self._load()
+
+    def fingerprint(self, source_dirs: List[str]) -> Optional[str]:
+        """Combined hash of the salt and source directories, or None if any file is unreadable."""
+        # One listing for every directory not hashed yet
+        unlisted = sorted(set(source_dirs) - set(self._directory_hashes))
+        if unlisted:
+            for rel_dir, rel_paths in list_source_files(self.project_root, unlisted).items():
+                self._directory_hashes[rel_dir] = self._directory_hash(rel_paths)
+
+        digest = hashlib.sha256(self.salt.encode())
+        for rel_dir in sorted(set(source_dirs)):
+            directory_hash = self._directory_hashes[rel_dir]
+            if directory_hash is None:
+                return None
+            digest.update(f"{rel_dir}\0{directory_hash}\n".encode())
+        return digest.hexdigest()
+
+    def is_current(self, pipeline_name: str, fingerprint: Optional[str]) -> bool:
+        """Whether the pipeline's outputs were last generated from inputs with this fingerprint."""
+        return fingerprint is not None and self._generated_from.get(pipeline_name) == fingerprint
+
+    def outputs_intact(self, pipeline_name: str) -> bool:
+        """Whether the pipeline's outputs are on disk with the content they were written with."""
+        for rel_path, owners in self._owners.items():
+            if pipeline_name not in owners:
+                continue
+            if rel_path not in self._intact:
+                entry = self._outputs[rel_path]
+                self._intact[rel_path] = self._matches(rel_path, entry)
+            if not self._intact[rel_path]:
+                return False
+            section = self._sections.get(rel_path, {}).get(pipeline_name)
+            if section is not None and section[2] is None:
+                return False
+        return True
+
+    def sections_intact(self, pipeline_name: str) -> bool:
+        """Whether the pipeline's sections of shared files still have the content it wrote."""
+        for rel_path, sections in self._sections.items():
+            section = sections.get(pipeline_name)
+            if section is None:
+                continue
+            start_marker, end_marker, sha256 = section
+            if sha256 is None:
+                return False
+            if rel_path not in self._intact:
+                self._intact[rel_path] = self._matches(rel_path, self._outputs[rel_path])
+            if self._intact[rel_path]:
+                continue
+            content = _read(os.path.join(self.project_root, rel_path))
+            if _section_hash(content, start_marker, end_marker) != sha256:
+                return False
+        return True
+
+    def record(
+        self,
+        reconciler: OutputReconciler,
+        owners: Dict[str, Iterable[str]],
+        fingerprints: Optional[Dict[str, Optional[str]]],
+        sections: Optional[Dict[str, Dict[str, Tuple[str, str]]]] = None,
+    ) -> None:
+        """
+        Remember the outputs a run handled and the fingerprints of the pipelines that ran.
+
+        owners maps each output path to the pipelines that wrote it, and sections
+        maps it to the markers of each pipeline's section written there. Pass None
+        for fingerprints after a failed run, so every pipeline runs again.
+        """
+        for path, status in reconciler.handled.items():
+            rel_path = os.path.relpath(path, self.project_root)
+            entry = None if status == REMOVED else _stat_and_hash(path)
+            if entry is None:
+                self._outputs.pop(rel_path, None)
+                self._owners.pop(rel_path, None)
+                self._sections.pop(rel_path, None)
+            else:
+                self._outputs[rel_path] = entry
+                self._owners[rel_path] = sorted(
+                    set(self._owners.get(rel_path, [])) | set(owners.get(path, []))
+                )
+                self._record_sections(rel_path, (sections or {}).get(path, {}))
+
+        if fingerprints is None:
+            self._generated_from = {}
+            return
+        for pipeline_name, fingerprint in fingerprints.items():
+            if fingerprint is None:
+                self._generated_from.pop(pipeline_name, None)
+            else:
+                self._generated_from[pipeline_name] = fingerprint
+
+    def save(self) -> None:
+        """Persist the manifest, dropping source files that no longer exist."""
+        if not self.path:
+            return
+        hashed_dirs = tuple(f"{rel_dir}/" for rel_dir in self._directory_hashes)
+        sources = {
+            path: entry
+            for path, entry in self._sources.items()
+            if path in self._seen or not path.startswith(hashed_dirs)
+        }
+        write_json_atomic(
+            self.path,
+            {
+                "version": _MANIFEST_VERSION,
+                "salt": self.salt,
+                "project_root": self.project_root,
+                "generated_from": self._generated_from,
+                "outputs": self._outputs,
+                "owners": self._owners,
+                "sections": self._sections,
+                "sources": sources,
+            },
+        )
+
+    def _load(self) -> None:
+        data = read_json(self.path)
+        if not isinstance(data, dict):
+            return
+        if data.get("version") != _MANIFEST_VERSION or data.get("salt") != self.salt:
+            return
+        if data.get("project_root") != self.project_root:
+            return
+        self._generated_from = data["generated_from"]
+        self._outputs = data["outputs"]
+        self._owners = data["owners"]
+        self._sections = data["sections"]
+        self._sources = data["sources"]
+
+    def _record_sections(self, rel_path: str, written: Dict[str, Tuple[str, str]]) -> None:
+        """Hash the sections just written to a file, and check its other sections still match."""
+        sections = self._sections.get(rel_path, {})
+        for pipeline_name, (start_marker, end_marker) in written.items():
+            sections[pipeline_name] = [start_marker, end_marker, None]
+        if not sections:
+            return
+        content = _read(os.path.join(self.project_root, rel_path))
+        for pipeline_name, section in sections.items():
+            sha256 = _section_hash(content, section[0], section[1])
+            if pipeline_name in written:
+                section[2] = sha256
+            elif section[2] != sha256:
+                # Carried over from disk by another pipeline's write, after an edit
+                section[2] = None
+        self._sections[rel_path] = sections
+
+    def _directory_hash(self, rel_paths: List[str]) -> Optional[str]:
+        """Hash of the paths and contents of a source directory's files."""
+        entries = []
+        for rel_path in rel_paths:
+            file_hash = self._source_hash(rel_path)
+            if file_hash is None:
+                return None
+            entries.append(f"{rel_path}\0{file_hash}\n")
+
+        digest = hashlib.sha256()
+        for entry in sorted(entries):
+            digest.update(entry.encode())
+        return digest.hexdigest()
+
+    def _source_hash(self, rel_path: str) -> Optional[str]:
+        """Content hash of a source file, re-read only if its size or mtime changed."""
+        self._seen.add(rel_path)
+        entry = self._sources.get(rel_path)
+        if entry is None or not self._matches(rel_path, entry):
+            entry = _stat_and_hash(os.path.join(self.project_root, rel_path))
+            if entry is None:
+                self._sources.pop(rel_path, None)
+                return None
+            self._sources[rel_path] = entry
+        return entry[2]
+
+    def _matches(self, rel_path: str, entry: List) -> bool:
+        """Whether a file still has the recorded content, hashing it only if its stat changed."""
+        path = os.path.join(self.project_root, rel_path)
+        try:
+            st = os.stat(path)
+        except OSError:
+            return False
+        size, mtime_ns, sha256 = entry
+        if st.st_size != size:
+            return False
+        if mtime_ns is not None and st.st_mtime_ns == mtime_ns:
+            return True
+        if hash_file(path) != sha256:
+            return False
+        entry[1] = trusted_mtime(st)
+        return True
+
+
+def _read(path: str) -> bytes:
+    try:
+        with open(path, "rb") as f:
+            return f.read()
+    except OSError:
+        return b""
+
+
+def _section_hash(content: bytes, start_marker: str, end_marker: str) -> Optional[str]:
+    """Hash of the section between the markers, markers included, or None if it's missing."""
+    start_pos, end_pos = find_demarcated_section(
+        content, start_marker.encode("utf-8"), end_marker.encode("utf-8")
+    )
+    if start_pos is None:
+        return None
+    return hashlib.sha256(content[start_pos:end_pos]).hexdigest()
+
+
+def _stat_and_hash(path: str) -> Optional[List]:
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    sha256 = hash_file(path)
+    if sha256 is None:
+        return None
+    return [st.st_size, trusted_mtime(st), sha256]
@@ -0,0 +1,287 @@
+#!/usr/bin/env python3
+"""
+Persistent parse cache - skips re-parsing rule files whose content hasn't changed.
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional
+
+from sync_ai_rules import __version__
+from sync_ai_rules.core.parser_interface import InputParser
+from sync_ai_rules.core.rule_metadata import RuleMetadata
+
+_CACHE_VERSION = 2
+_CACHE_FILENAME = "parse-cache.json"
+_DEFAULT_MAX_ENTRIES = 20000
+
+_PACKAGE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Files modified this recently may still change within the same mtime tick,
+# so their stat info isn't trusted and the next lookup re-hashes the content
+_RACY_WINDOW_NS = 2_000_000_000
+
+
+def write_json_atomic(path: str, data: Any) -> bool:
+    """Write data as JSON via a temp file and rename. Returns False if it couldn't be written."""
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f, separators=(",", ":"))
+        os.replace(tmp_path, path)
+        return True
+    except OSError:
+        # Caching is best-effort; a read-only git dir shouldn't fail the hook
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        return False
+
+
+def read_json(path: Optional[str]) -> Optional[Any]:
+    """Read a JSON cache file, or None if it's missing or corrupt."""
+    if not path or not os.path.exists(path):
+        return None
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def compute_salt(config_path: str, plugin_paths: List[str]) -> str:
+    """
+    Hash plugins.yaml, every module of the package and plugin sources.
+
+    Any change to them, such as a hook upgrade changing how rules are parsed
+    or rendered, invalidates caches keyed by the salt.
+    """
+    paths = [config_path, *_package_modules(), *plugin_paths]
+
+    digest = hashlib.sha256(f"{_CACHE_VERSION}\0{__version__}".encode())
+    for path in sorted(set(paths)):
+        try:
+            with open(path, "rb") as f:
+                digest.update(f.read())
+        except OSError:
+            digest.update(path.encode())
+    return digest.hexdigest()
+
+
+class ParseCache:
+    """
+    LRU cache of parsed RuleMetadata keyed by parser, path, size, mtime and content hash.
+
+    A lookup trusts matching size and mtime; otherwise the file is re-hashed and
+    the cached rule is reused if the content is unchanged. Hits only reorder the
+    entries in memory, so a run where nothing changed doesn't rewrite the cache.
+    """
+
+    def __init__(self, cache_dir: Optional[str], salt: str, max_entries: Optional[int] = None):
+        self.cache_dir = cache_dir
+        self.salt = salt
+        if max_entries is None:
+            max_entries = int(os.environ.get("SYNC_AI_RULES_CACHE_SIZE", _DEFAULT_MAX_ENTRIES))
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[str, Dict[str, Any]] = OrderedDict()
+        self._dirty = False
+        # parse() may be called from parser worker threads
+        self._lock = threading.Lock()
+        self._load()
+
+    @property
+    def path(self) -> Optional[str]:
+        """Location of the cache file, if persisted."""
+        if not self.cache_dir:
+            return None
+        return os.path.join(self.cache_dir, _CACHE_FILENAME)
+
+    def parse(
+        self, parser: InputParser, file_path: str, context: Dict[str, Any]
+    ) -> Optional[RuleMetadata]:
+        """
+        Return the cached rule for file_path, parsing it on a miss.
+
+        Header-only parses (context has a "header_limit") are cached separately,
+        keyed by a hash of just the start of the file the parse depended on.
+        """
+        key = f"{parser.name}:{context.get('relative_path', file_path)}"
+        header_only = bool(context.get("header_limit"))
+        if header_only:
+            key += ":header"
+
+        try:
+            st = os.stat(file_path)
+        except OSError:
+            return parser.parse(file_path, context)
+
+        with self._lock:
+            entry = self._entries.get(key)
+        content_hash = None
+        if entry is not None and entry["context"] == _context_key(context):
+            if entry["size"] == st.st_size and entry["mtime_ns"] == st.st_mtime_ns:
+                return self._hit(key, entry)
+            if not header_only:
+                content_hash = hash_file(file_path)
+            elif entry["size"] == st.st_size:
+                # The rule's body runs to the end of the file, so its size must match too
+                content_hash = hash_file(file_path, entry["hashed"])
+            if content_hash is not None and content_hash == entry["sha256"]:
+                return self._hit(key, entry, st)
+
+        rule = parser.parse(file_path, context)
+        hashed = None
+        if header_only:
+            hashed = _header_length(rule, st.st_size, context["header_limit"])
+            content_hash = hash_file(file_path, hashed)
+        elif content_hash is None:
+            content_hash = hash_file(file_path)
+        with self._lock:
+            self.misses += 1
+            if content_hash is not None:
+                self._store(key, st.st_size, trusted_mtime(st), content_hash, hashed, context, rule)
+        return rule
+
+    def parse_data(
+        self, parser: InputParser, file_path: str, data: bytes, context: Dict[str, Any]
+    ) -> Optional[RuleMetadata]:
+        """Like parse(), for a file's content given as bytes (e.g. its staged blob)."""
+        key = f"{parser.name}:{context.get('relative_path', file_path)}"
+        content_hash = hashlib.sha256(data).hexdigest()
+
+        with self._lock:
+            entry = self._entries.get(key)
+        if (
+            entry is not None
+            and entry["context"] == _context_key(context)
+            and entry["sha256"] == content_hash
+        ):
+            rule = self._hit(key, entry)
+            if rule is not None:
+                rule.data = data
+            return rule
+
+        rule = parser.parse_data(file_path, data, context)
+        with self._lock:
+            self.misses += 1
+            # No mtime: the file on disk may differ, so a later parse() re-hashes it
+            self._store(key, len(data), None, content_hash, None, context, rule)
+        return rule
+
+    def save(self) -> None:
+        """Persist the cache if it changed, evicting least recently used entries over the bound."""
+        with self._lock:
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._dirty = True
+
+            if not self._dirty or not self.path:
+                return
+
+            data = {"version": _CACHE_VERSION, "salt": self.salt, "entries": self._entries}
+            if write_json_atomic(self.path, data):
+                self._dirty = False
+
+    def _load(self) -> None:
+        data = read_json(self.path)
+        if not isinstance(data, dict):
+            return
+        if data.get("version") != _CACHE_VERSION or data.get("salt") != self.salt:
+            self._dirty = True
+            return
+        self._entries = OrderedDict(data.get("entries", {}))
+
+    def _hit(
+        self, key: str, entry: Dict[str, Any], st: Optional[os.stat_result] = None
+    ) -> Optional[RuleMetadata]:
+        """Count a hit; with st given, the file's stat changed but its content didn't."""
+        with self._lock:
+            self.hits += 1
+            if key in self._entries:
+                # Recency is only persisted along with other changes
+                self._entries.move_to_end(key)
+            if st is not None:
+                entry["size"] = st.st_size
+                entry["mtime_ns"] = trusted_mtime(st)
+                self._dirty = True
+        rule = entry["rule"]
+        return RuleMetadata.from_dict(rule) if rule is not None else None
+
+    def _store(
+        self,
+        key: str,
+        size: int,
+        mtime_ns: Optional[int],
+        content_hash: str,
+        hashed: Optional[int],
+        context: Dict[str, Any],
+        rule: Optional[RuleMetadata],
+    ) -> None:
+        serialized = None
+        if rule is not None:
+            serialized = rule.to_dict()
+            # Rather than return altered data later, don't cache what JSON can't hold
+            if serialized is None:
+                return
+
+        self._entries[key] = {
+            "size": size,
+            "mtime_ns": mtime_ns,
+            "sha256": content_hash,
+            # Bytes at the start of the file content_hash covers; None for all of them
+            "hashed": hashed,
+            "context": _context_key(context),
+            "rule": serialized,
+        }
+        self._entries.move_to_end(key)
+        self._dirty = True
+
+
+def _package_modules() -> List[str]:
+    """Every Python source file of the sync_ai_rules package."""
+    paths = []
+    for dirpath, dirnames, filenames in os.walk(_PACKAGE_DIR):
+        dirnames[:] = [d for d in dirnames if d != "__pycache__"]
+        paths.extend(os.path.join(dirpath, name) for name in filenames if name.endswith(".py"))
+    return paths
+
+
+def _header_length(rule: Optional[RuleMetadata], size: int, limit: int) -> int:
+    """
+    Bytes at the start of a file that a header-only parse of it depended on.
+
+    That's everything the parser may have read looking for the header (up to
+    limit), or the whole header if it runs past that.
+    """
+    end = 0
+    if rule is not None and rule.frontmatter_span is not None:
+        end = rule.frontmatter_span[1]
+    if rule is not None and rule.body_span is not None:
+        end = max(end, rule.body_span[0])
+    return min(size, max(end, limit))
+
+
+def _context_key(context: Dict[str, Any]) -> List[str]:
+    return [str(context.get("project_root")), str(context.get("category"))]
+
+
+def trusted_mtime(st: os.stat_result) -> Optional[int]:
+    """The file's mtime, or None if it's too recent to prove the content hasn't changed since."""
+    if st.st_mtime_ns >= time.time_ns() - _RACY_WINDOW_NS:
+        return None
+    return st.st_mtime_ns
+
+
+def hash_file(file_path: str, length: Optional[int] = None) -> Optional[str]:
+    """SHA-256 of the file's content (its first length bytes), or None if it can't be read."""
+    try:
+        with open(file_path, "rb") as f:
+            return hashlib.sha256(f.read(-1 if length is None else length)).hexdigest()
+    except OSError:
+        return None
@@ -23,10 +23,34 @@ class InputParser(ABC):
         """
         return []
 
+    @property
+    def file_extensions(self) -> List[str]:
+        """
+        File suffixes this parser handles, used to route files without calling
+        can_parse() on every file in a source directory.
+        Returns empty list by default (can_parse() is called for every file).
+        """
+        return []
+
     @abstractmethod
     def can_parse(self, file_path: str) -> bool:
         """Check if this parser can handle the given file."""
 
     @abstractmethod
     def parse(self, file_path: str, context: Dict[str, Any]) -> Optional[RuleMetadata]:
-        """Parse a file and return standardized metadata."""
+        """
+        Parse a file and return standardized metadata.
+        If context has a "header_limit", no generator will read the rule's body:
+        the parser may read just the file's header, and the whole file only if
+        the header hasn't closed within that many bytes.
+        """
+
+    def parse_data(
+        self, file_path: str, data: bytes, context: Dict[str, Any]
+    ) -> Optional[RuleMetadata]:
+        """
+        Parse a file's content given as bytes (e.g. its staged blob) instead of reading file_path.
+        Override in subclass to honor data; the returned rule should keep it as its data.
+        Parses file_path from disk by default.
+        """
+        return self.parse(file_path, context)
@@ -1,13 +1,46 @@
 #!/usr/bin/env python3
 
-from dataclasses import dataclass
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Callable, Optional
+
+if TYPE_CHECKING:
+    from sync_ai_rules.core.generator_interface import OutputGenerator
+    from sync_ai_rules.core.parser_interface import InputParser
 
 
 @dataclass
 class Pipeline:
-    """Represents a parser-generator pipeline."""
+    """
+    Represents a parser-generator pipeline.
+
+    The parser and generator are loaded on first access, so a pipeline with
+    nothing to do never imports its plugin modules.
+    """
 
     name: str
     description: str
-    parser: "InputParser"
-    generator: "OutputGenerator"
+    parser_config: dict
+    generator_config: dict
+    load_parser: Callable[[], "InputParser"] = field(repr=False)
+    load_generator: Callable[[], "OutputGenerator"] = field(repr=False)
+    _parser: Optional["InputParser"] = field(default=None, init=False, repr=False)
+    _generator: Optional["OutputGenerator"] = field(default=None, init=False, repr=False)
+
+    def load(self) -> None:
+        """Load the parser and generator now rather than on first access."""
+        if self._parser is None:
+            self._parser = self.load_parser()
+        if self._generator is None:
+            self._generator = self.load_generator()
+
+    @property
+    def parser(self) -> "InputParser":
+        if self._parser is None:
+            self._parser = self.load_parser()
+        return self._parser
+
+    @property
+    def generator(self) -> "OutputGenerator":
+        if self._generator is None:
+            self._generator = self.load_generator()
+        return self._generator
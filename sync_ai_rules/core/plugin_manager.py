@@ -1,8 +1,10 @@
 #!/usr/bin/env python3
 
 import importlib.util
+import time
 from pathlib import Path
-from typing import List
+from types import ModuleType
+from typing import Dict, List, Optional, Tuple
 
 import yaml
 
@@ -16,55 +18,117 @@ class PluginManager:
 
     def __init__(self):
         self.pipelines: List[Pipeline] = []
-
-    def load_plugins(self, base_path: str):
-        """Load all pipelines from plugins.yaml configuration file."""
-        config_path = Path(base_path) / "plugins.yaml"
+        self.config_path: Optional[str] = None
+        # Seconds spent importing each plugin module, keyed by module name
+        self.import_times: Dict[str, float] = {}
+        self._base_path: Optional[Path] = None
+        self._modules: Dict[str, ModuleType] = {}
+        # Pipelines declaring the same parser share one instance so its files are parsed once
+        self._parsers: Dict[Tuple[str, str], InputParser] = {}
+
+    def load_plugins(self, base_path: str, verbose: bool = True):
+        """
+        Load all pipelines from plugins.yaml configuration file.
+
+        Plugin modules aren't imported until a pipeline's parser or generator is used.
+        Each loaded pipeline is listed unless verbose is False.
+        """
+        self._base_path = Path(base_path)
+        config_path = self._base_path / "plugins.yaml"
+        self.config_path = str(config_path)
 
         with open(config_path) as f:
             config = yaml.safe_load(f)
 
         # Load pipelines
         for pipeline_config in config.get("pipelines", []):
-            pipeline = self._load_pipeline(base_path, pipeline_config)
-            if pipeline:
-                self.pipelines.append(pipeline)
+            pipeline = self._load_pipeline(pipeline_config)
+            self.pipelines.append(pipeline)
+            if verbose:
                 print(f"✓ Loaded pipeline: {pipeline.name} - {pipeline.description}")
 
-    def _load_pipeline(self, base_path: str, config: dict) -> Pipeline:
-        """Load a single parser-generator pipeline."""
-        # Load parser
+    def load_all(self) -> None:
+        """Import every pipeline's plugin modules now instead of on first use."""
+        for pipeline in self.pipelines:
+            pipeline.load()
+
+    def clone(self) -> "PluginManager":
+        """
+        Return a manager with the same pipelines and already imported plugin modules.
+
+        Parsers and generators are instantiated afresh, so state they keep (such
+        as rendered categories) isn't shared with this manager's.
+        """
+        clone = PluginManager()
+        clone.config_path = self.config_path
+        clone.import_times = self.import_times
+        clone._base_path = self._base_path
+        clone._modules = self._modules
+        clone.pipelines = [
+            clone._load_pipeline(
+                {
+                    "name": pipeline.name,
+                    "description": pipeline.description,
+                    "parser": pipeline.parser_config,
+                    "generator": pipeline.generator_config,
+                }
+            )
+            for pipeline in self.pipelines
+        ]
+        return clone
+
+    def plugin_paths(self, kinds: Tuple[str, ...] = ("parsers", "generators")) -> List[str]:
+        """Source files of the configured plugin modules of these kinds, without importing them."""
+        paths = set()
+        for pipeline in self.pipelines:
+            if "parsers" in kinds:
+                paths.add(str(self._module_path("parsers", pipeline.parser_config["module"])))
+            if "generators" in kinds:
+                paths.add(str(self._module_path("generators", pipeline.generator_config["module"])))
+        return sorted(paths)
+
+    def _load_pipeline(self, config: dict) -> Pipeline:
+        """Create a single parser-generator pipeline with lazily loaded plugins."""
         parser_config = config["parser"]
-        parser = self._load_parser(base_path, parser_config)
-
-        # Load generator
         generator_config = config["generator"]
-        generator = self._load_generator(base_path, generator_config)
 
-        # Create pipeline
         return Pipeline(
             name=config["name"],
             description=config["description"],
-            parser=parser,
-            generator=generator,
+            parser_config=parser_config,
+            generator_config=generator_config,
+            load_parser=lambda: self._load_parser(parser_config),
+            load_generator=lambda: self._load_generator(generator_config),
         )
 
-    def _load_parser(self, base_path: str, config: dict) -> InputParser:
-        """Load a parser from configuration."""
-        module_path = Path(base_path) / "parsers" / f"{config['module']}.py"
-        spec = importlib.util.spec_from_file_location(f"parsers.{config['module']}", module_path)
-        module = importlib.util.module_from_spec(spec)
-        spec.loader.exec_module(module)
-
-        parser_class = getattr(module, config["class"])
-        return parser_class()
+    def _load_parser(self, config: dict) -> InputParser:
+        """Load a parser from configuration, reusing an existing instance of the same class."""
+        key = (config["module"], config["class"])
+        if key not in self._parsers:
+            module = self._load_module("parsers", config["module"])
+            parser_class = getattr(module, config["class"])
+            self._parsers[key] = parser_class()
+        return self._parsers[key]
 
-    def _load_generator(self, base_path: str, config: dict) -> OutputGenerator:
+    def _load_generator(self, config: dict) -> OutputGenerator:
         """Load a generator from configuration."""
-        module_path = Path(base_path) / "generators" / f"{config['module']}.py"
-        spec = importlib.util.spec_from_file_location(f"generators.{config['module']}", module_path)
-        module = importlib.util.module_from_spec(spec)
-        spec.loader.exec_module(module)
-
+        module = self._load_module("generators", config["module"])
         generator_class = getattr(module, config["class"])
         return generator_class()
+
+    def _load_module(self, kind: str, name: str) -> ModuleType:
+        """Import a plugin module from its file, once."""
+        module_name = f"{kind}.{name}"
+        if module_name not in self._modules:
+            start = time.perf_counter()
+            spec = importlib.util.spec_from_file_location(
+                module_name, self._module_path(kind, name)
+            )
+            module = importlib.util.module_from_spec(spec)
+            spec.loader.exec_module(module)
+            self.import_times[module_name] = time.perf_counter() - start
+            self._modules[module_name] = module
+        return self._modules[module_name]
+
+    def _module_path(self, kind: str, name: str) -> Path:
+        return self._base_path / kind / f"{name}.py"
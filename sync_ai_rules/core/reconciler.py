@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+"""
+Output reconciler - writes only outputs whose content differs from what's on disk.
+
+Leaving unchanged files untouched keeps their mtimes stable, so IDE indexers,
+file watchers and build caches don't see churn on every commit. Changed files
+are replaced atomically through a temp file, so readers never see a partial write.
+"""
+
+import os
+import stat
+import tempfile
+from typing import Callable, Dict, Iterable, List, Optional
+
+CREATED = "created"
+UPDATED = "updated"
+UNCHANGED = "unchanged"
+REMOVED = "removed"
+
+
+def _read_umask() -> int:
+    # The umask can only be read by setting it, which affects every thread, so
+    # this runs once at import, before outputs are written from a thread pool
+    umask = os.umask(0)
+    os.umask(umask)
+    return umask
+
+
+_UMASK = _read_umask()
+
+
+class OutputReconciler:
+    """
+    Compares rendered outputs with disk and applies the minimal set of changes.
+
+    With dry_run set nothing is written or removed; outputs that would have been
+    are only listed in stale.
+    """
+
+    def __init__(self, dry_run: bool = False):
+        self.counts: Dict[str, int] = {CREATED: 0, UPDATED: 0, UNCHANGED: 0, REMOVED: 0}
+        self.dry_run = dry_run
+        # Paths whose content differs from what was rendered, or that are to be removed
+        self.stale: List[str] = []
+        # Every path written, left unchanged or removed, with its status
+        self.handled: Dict[str, str] = {}
+
+    def write_file(self, path: str, content: str) -> str:
+        """
+        Write content to path unless the file already holds exactly that content.
+
+        Args:
+            path: File to write
+            content: Rendered file content
+
+        Returns:
+            One of "created", "updated" or "unchanged"
+        """
+        encoded = content.encode("utf-8")
+        status = _compare_with_disk(path, encoded)
+        if status != UNCHANGED:
+            self._replace(path, lambda: [encoded])
+
+        self._count(path, status)
+        return status
+
+    def write_stream(self, path: str, chunks: Callable[[], Iterable[bytes]]) -> str:
+        """
+        Like write_file, but for content produced as a stream of byte chunks.
+
+        Args:
+            path: File to write
+            chunks: Returns a fresh iterator over the content each time it's called;
+                it's consumed once to compare with disk and again if a write is needed
+
+        Returns:
+            One of "created", "updated" or "unchanged"
+        """
+        status = _compare_stream_with_disk(path, chunks())
+        if status != UNCHANGED:
+            self._replace(path, chunks)
+
+        self._count(path, status)
+        return status
+
+    def remove_stale(
+        self,
+        directory: str,
+        keep: Iterable[str],
+        suffix: str,
+        only: Optional[Iterable[str]] = None,
+    ) -> List[str]:
+        """
+        Delete files in directory ending with suffix that aren't in keep.
+
+        If only is given, just those candidate names are checked instead of listing
+        the whole directory. In a dry run the files are only listed as stale.
+        """
+        if not os.path.isdir(directory):
+            return []
+
+        keep = set(keep)
+        removed = []
+        candidates = sorted(os.listdir(directory)) if only is None else sorted(only)
+        for entry in candidates:
+            entry_path = os.path.join(directory, entry)
+            if entry.endswith(suffix) and entry not in keep and os.path.isfile(entry_path):
+                self.stale.append(entry_path)
+                if not self.dry_run:
+                    os.remove(entry_path)
+                self._count(entry_path, REMOVED)
+                removed.append(entry)
+
+        return removed
+
+    def merge(self, other: "OutputReconciler") -> None:
+        """Add the outputs another reconciler handled (e.g. on another thread) to this one."""
+        for status, count in other.counts.items():
+            self.counts[status] += count
+        self.stale.extend(other.stale)
+        self.handled.update(other.handled)
+
+    def _count(self, path: str, status: str) -> None:
+        self.counts[status] += 1
+        self.handled[path] = status
+
+    def _replace(self, path: str, chunks: Callable[[], Iterable[bytes]]) -> None:
+        self.stale.append(path)
+        if not self.dry_run:
+            _replace_file(path, chunks())
+
+    def summary(self) -> str:
+        """Human-readable counts of reconciled outputs."""
+        return ", ".join(f"{count} {status}" for status, count in self.counts.items())
+
+
+def _compare_stream_with_disk(path: str, chunks: Iterable[bytes]) -> str:
+    """Classify how path differs from the chunks, stopping at the first difference."""
+    try:
+        with open(path, "rb") as f:
+            for chunk in chunks:
+                if f.read(len(chunk)) != chunk:
+                    return UPDATED
+            return UPDATED if f.read(1) else UNCHANGED
+    except FileNotFoundError:
+        return CREATED
+
+
+def _replace_file(path: str, chunks: Iterable[bytes]) -> None:
+    """Write chunks to a temp file next to path, then atomically rename it over path."""
+    # Write through symlinks (e.g. CLAUDE.md -> AGENTS.md) instead of replacing them
+    target = os.path.realpath(path)
+    parent = os.path.dirname(target)
+    os.makedirs(parent, exist_ok=True)
+
+    try:
+        mode = stat.S_IMODE(os.stat(target).st_mode)
+    except FileNotFoundError:
+        # What open() would have created: 0o666 minus the umask
+        mode = 0o666 & ~_UMASK
+
+    fd, tmp_path = tempfile.mkstemp(
+        dir=parent, prefix=f".{os.path.basename(target)}.", suffix=".tmp"
+    )
+    try:
+        with os.fdopen(fd, "wb") as f:
+            for chunk in chunks:
+                f.write(chunk)
+        os.chmod(tmp_path, mode)
+        os.replace(tmp_path, target)
+    except BaseException:
+        os.remove(tmp_path)
+        raise
+
+
+def _compare_with_disk(path: str, encoded: bytes) -> str:
+    """Classify how path differs from encoded, skipping the read on a size mismatch."""
+    try:
+        if os.path.getsize(path) != len(encoded):
+            return UPDATED
+        with open(path, "rb") as f:
+            return UNCHANGED if f.read() == encoded else UPDATED
+    except FileNotFoundError:
+        return CREATED
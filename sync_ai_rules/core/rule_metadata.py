@@ -1,23 +1,140 @@
 #!/usr/bin/env python3
 
-from dataclasses import dataclass
-from typing import Any, Dict, List
+import json
+from typing import Any, Dict, List, Optional, Tuple
+
+_FIELDS = (
+    "file_path",
+    "relative_path",
+    "title",
+    "description",
+    "scope_patterns",
+    "always_apply",
+    "category",
+    "metadata",
+    "content_span",
+    "frontmatter_span",
+    "body_span",
+)
 
 
-@dataclass
 class RuleMetadata:
-    """Universal rule representation, format-agnostic."""
-
-    file_path: str
-    relative_path: str
-    title: str
-    description: str
-    scope_patterns: List[str]
-    always_apply: bool
-    category: str
-    raw_content: str
-    metadata: Dict[str, Any] = None
-
-    def __post_init__(self):
-        if self.metadata is None:
-            self.metadata = {}
+    """
+    Universal rule representation, format-agnostic.
+
+    Slotted and header-only by default: parsers that leave raw_content unset get
+    it read back from file_path (or the content_span byte range of it) only when
+    a generator asks for it, so large corpora aren't held in memory.
+
+    Parsers that split a rule into header and body record both as byte ranges
+    (frontmatter_span, body_span), so generators can read the body alone
+    without scanning for the header again.
+
+    Rules parsed from bytes that aren't the file on disk (e.g. its staged blob)
+    keep those bytes in data, and content is read from them instead of file_path.
+    """
+
+    __slots__ = (*_FIELDS, "data", "_raw_content")
+
+    def __init__(
+        self,
+        file_path: str,
+        relative_path: str,
+        title: str,
+        description: str,
+        scope_patterns: List[str],
+        always_apply: bool,
+        category: str,
+        raw_content: Optional[str] = None,
+        metadata: Optional[Dict[str, Any]] = None,
+        content_span: Optional[Tuple[int, int]] = None,
+        frontmatter_span: Optional[Tuple[int, int]] = None,
+        body_span: Optional[Tuple[int, int]] = None,
+        data: Optional[bytes] = None,
+    ):
+        self.file_path = file_path
+        self.relative_path = relative_path
+        self.title = title
+        self.description = description
+        self.scope_patterns = scope_patterns
+        self.always_apply = always_apply
+        self.category = category
+        self.metadata = metadata if metadata is not None else {}
+        # Byte range of the rule's content in file_path; None for the whole file
+        self.content_span = tuple(content_span) if content_span is not None else None
+        # Byte ranges in file_path of the header's text and of everything after the header
+        self.frontmatter_span = tuple(frontmatter_span) if frontmatter_span is not None else None
+        self.body_span = tuple(body_span) if body_span is not None else None
+        # Never cached: rules loaded from a cache read file_path unless given data again
+        self.data = data
+        self._raw_content = raw_content
+
+    @property
+    def raw_content(self) -> str:
+        """The rule's full text, read from disk on each access unless given up front."""
+        if self._raw_content is not None:
+            return self._raw_content
+        return self.load_content()
+
+    @property
+    def body(self) -> str:
+        """The rule's text after its header; all of raw_content if the parser recorded no body."""
+        if self.body_span is None:
+            return self.raw_content
+        return self._read_span(self.body_span)
+
+    def load_content(self) -> str:
+        """Read the rule's text from file_path as the parser did (UTF-8, universal newlines)."""
+        if self.content_span is None and self.data is None:
+            with open(self.file_path, encoding="utf-8") as f:
+                return f.read()
+        return self._read_span(self.content_span or (0, len(self.data)))
+
+    def _read_span(self, span: Tuple[int, int]) -> str:
+        start, end = span
+        if self.data is not None:
+            data = self.data[start:end]
+        else:
+            with open(self.file_path, "rb") as f:
+                f.seek(start)
+                data = f.read(end - start)
+        return data.decode("utf-8").replace("\r\n", "\n").replace("\r", "\n")
+
+    def to_dict(self) -> Optional[Dict[str, Any]]:
+        """
+        Serialize to a JSON-compatible dict for on-disk caches.
+
+        Lazily loaded content isn't included; it's read from the file again when needed.
+        Returns None if the metadata wouldn't survive a JSON round trip unchanged
+        (e.g. YAML dates or integer keys in frontmatter), so callers can skip caching it.
+        """
+        data = {name: getattr(self, name) for name in _FIELDS}
+        for span in ("content_span", "frontmatter_span", "body_span"):
+            if data[span] is not None:
+                data[span] = list(data[span])
+        if self._raw_content is not None:
+            data["raw_content"] = self._raw_content
+        try:
+            if json.loads(json.dumps(data)) != data:
+                return None
+        except (TypeError, ValueError):
+            return None
+        return data
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "RuleMetadata":
+        """Deserialize metadata produced by to_dict()."""
+        return cls(**data)
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, RuleMetadata):
+            return NotImplemented
+        return all(getattr(self, name) == getattr(other, name) for name in _FIELDS) and (
+            self._raw_content == other._raw_content
+        )
+
+    __hash__ = None
+
+    def __repr__(self) -> str:
+        fields = ", ".join(f"{name}={getattr(self, name)!r}" for name in _FIELDS[:7])
+        return f"RuleMetadata({fields})"
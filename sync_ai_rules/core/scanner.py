@@ -0,0 +1,308 @@
+#!/usr/bin/env python3
+"""
+Source scanner - lists each source directory once and routes files to parsers.
+
+Candidate files come from one ``git ls-files`` call for all source directories,
+so untracked or ignored directories in the working tree are never visited.
+Outside a git work tree the directories are walked instead.
+"""
+
+import os
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Collection, Dict, List, Optional, Tuple
+
+from sync_ai_rules.core.git_index import StagedSnapshot, worktree_files
+from sync_ai_rules.core.parse_cache import ParseCache
+from sync_ai_rules.core.parser_interface import InputParser
+from sync_ai_rules.core.rule_metadata import RuleMetadata
+
+# (parser, absolute file path, absolute source directory)
+_ParseTask = Tuple[InputParser, str, str]
+
+_DEFAULT_HEADER_LIMIT = 64 * 1024
+
+
+def default_jobs() -> int:
+    """Default number of parser threads; parsing is mostly blocked on file I/O."""
+    return min(32, (os.cpu_count() or 1) + 4)
+
+
+def header_limit() -> int:
+    """Most bytes read for a rule's header before reading the whole file (0: whole files)."""
+    return int(os.environ.get("SYNC_AI_RULES_HEADER_LIMIT", _DEFAULT_HEADER_LIMIT))
+
+
+def get_category(file_path: str, source_dir: str) -> str:
+    """Extract category from file path relative to source directory."""
+    rel_path = os.path.relpath(file_path, source_dir)
+    folder = os.path.dirname(rel_path)
+    return folder if folder and folder != "." else "root"
+
+
+class ParserDispatch:
+    """Routes file names to the parsers that declared a matching suffix."""
+
+    def __init__(self, parsers: List[InputParser]):
+        # Keyed by the last extension segment so multi-part suffixes (.pkr.hcl) still match
+        self._by_extension: Dict[str, List[Tuple[str, InputParser]]] = {}
+        self._catch_all: List[InputParser] = []
+
+        for parser in parsers:
+            if not parser.file_extensions:
+                self._catch_all.append(parser)
+                continue
+            for suffix in parser.file_extensions:
+                ext = os.path.splitext(suffix)[1] or suffix
+                self._by_extension.setdefault(ext, []).append((suffix, parser))
+
+    def parsers_for(self, file_path: str) -> List[InputParser]:
+        """Return parsers that accept file_path, in registration order."""
+        matches = [
+            parser
+            for suffix, parser in self._by_extension.get(os.path.splitext(file_path)[1], [])
+            if file_path.endswith(suffix) and parser.can_parse(file_path)
+        ]
+        matches.extend(parser for parser in self._catch_all if parser.can_parse(file_path))
+        return matches
+
+
+def scan_sources(
+    parsers: List[InputParser],
+    project_root: str,
+    cache: Optional[ParseCache] = None,
+    jobs: int = 1,
+    snapshot: Optional[StagedSnapshot] = None,
+    header_only: Collection[InputParser] = (),
+) -> Dict[InputParser, List[RuleMetadata]]:
+    """
+    List every distinct source directory once and parse each file once per parser.
+
+    With a snapshot, the staged files are parsed instead, read in one batch
+    from the git index. Parsers in header_only are asked to read just each
+    file's header, as nothing will read the bodies of their rules. Returns
+    parsed rules per parser, sorted by relative path so output doesn't depend
+    on filesystem listing order or on which parser thread finishes first.
+    Pipelines sharing a parser share the same rule list.
+    """
+    parsers_by_dir: Dict[str, List[InputParser]] = {}
+    for parser in parsers:
+        for rel_dir in parser.source_directories:
+            dir_parsers = parsers_by_dir.setdefault(os.path.normpath(rel_dir), [])
+            if parser not in dir_parsers:
+                dir_parsers.append(parser)
+
+    rel_dirs = list(parsers_by_dir)
+    staged = snapshot.list_files(rel_dirs) if snapshot is not None else None
+    if staged is None:
+        files = list_source_files(project_root, rel_dirs)
+    else:
+        files = {rel_dir: _under(sorted(staged), rel_dir) for rel_dir in rel_dirs}
+
+    tasks: List[_ParseTask] = []
+    for rel_dir, dir_parsers in parsers_by_dir.items():
+        print(f"  Scanning {rel_dir}{' (staged)' if staged is not None else ''}...")
+        source_dir = os.path.join(project_root, rel_dir)
+        tasks.extend(_collect_tasks(dir_parsers, source_dir, files[rel_dir], project_root))
+
+    contents = None
+    if staged is not None:
+        # Every blob in one stream, instead of an open() per file
+        wanted = {os.path.relpath(file_path, project_root) for _, file_path, _ in tasks}
+        blobs = snapshot.read({path: staged[path] for path in sorted(wanted)})
+        contents = {os.path.join(project_root, path): data for path, data in blobs.items()}
+
+    results: Dict[InputParser, List[RuleMetadata]] = {parser: [] for parser in parsers}
+    for (parser, _, _), rule in _run_tasks(tasks, project_root, cache, jobs, contents, header_only):
+        if rule:
+            results[parser].append(rule)
+    for rules in results.values():
+        rules.sort(key=lambda rule: rule.relative_path)
+    return results
+
+
+def parse_paths(
+    parsers: List[InputParser],
+    rel_paths: List[str],
+    project_root: str,
+    cache: Optional[ParseCache] = None,
+    jobs: int = 1,
+    header_only: Collection[InputParser] = (),
+) -> Dict[InputParser, Dict[str, Optional[RuleMetadata]]]:
+    """
+    Parse only the given project-relative paths, as a full scan would have.
+
+    Parsers in header_only are asked to read just each file's header.
+    Returns, per parser, each routed path mapped to its rule, or to None if the
+    file no longer exists, is ignored by git or no longer parses, so callers
+    can drop it.
+    """
+    results: Dict[InputParser, Dict[str, Optional[RuleMetadata]]] = {p: {} for p in parsers}
+    tasks: List[_ParseTask] = []
+
+    for rel_path in sorted(set(rel_paths)):
+        file_path = os.path.join(project_root, rel_path)
+        for parser in parsers:
+            source_dir = _owning_source_dir(parser, rel_path, project_root)
+            if source_dir is None or _is_excluded(os.path.dirname(file_path)):
+                continue
+            if not ParserDispatch([parser]).parsers_for(file_path):
+                continue
+            if os.path.isfile(file_path):
+                tasks.append((parser, file_path, source_dir))
+            else:
+                results[parser][os.path.relpath(file_path, project_root)] = None
+
+    if tasks:
+        # Only files a full scan would list, so gitignored files are left out the same way
+        rel_dirs = sorted({os.path.relpath(source_dir, project_root) for _, _, source_dir in tasks})
+        listed = set()
+        for paths in list_source_files(project_root, rel_dirs).values():
+            listed.update(paths)
+        kept = []
+        for task in tasks:
+            rel_path = os.path.relpath(task[1], project_root)
+            if rel_path in listed:
+                kept.append(task)
+            else:
+                results[task[0]][rel_path] = None
+        tasks = kept
+
+    for (parser, file_path, _), rule in _run_tasks(
+        tasks, project_root, cache, jobs, header_only=header_only
+    ):
+        results[parser][os.path.relpath(file_path, project_root)] = rule
+
+    return results
+
+
+def list_source_files(project_root: str, rel_dirs: List[str]) -> Dict[str, List[str]]:
+    """
+    Return the candidate files under each source directory, relative to project_root.
+
+    Lists tracked files still in the working tree plus untracked files git
+    doesn't ignore, with one git call for all directories. Falls back to
+    walking each directory outside a git work tree.
+    """
+    listed = worktree_files(project_root, rel_dirs)
+    if listed is None:
+        return {rel_dir: _walk(project_root, rel_dir) for rel_dir in rel_dirs}
+
+    files, directories = listed
+    # git doesn't list what's inside submodules and nested repositories
+    for directory in directories:
+        files.extend(_walk(project_root, directory))
+    return {rel_dir: _under(files, rel_dir) for rel_dir in rel_dirs}
+
+
+def _walk(project_root: str, rel_dir: str) -> List[str]:
+    rel_paths = []
+    for root, _, names in os.walk(os.path.join(project_root, rel_dir)):
+        rel_root = os.path.relpath(root, project_root)
+        rel_paths.extend(os.path.join(rel_root, name) for name in names)
+    return rel_paths
+
+
+def _under(rel_paths: List[str], rel_dir: str) -> List[str]:
+    prefix = os.path.join(os.path.normpath(rel_dir), "")
+    return [rel_path for rel_path in rel_paths if rel_path.startswith(prefix)]
+
+
+def _collect_tasks(
+    parsers: List[InputParser], source_dir: str, rel_paths: List[str], project_root: str
+) -> List[_ParseTask]:
+    """Route the listed files of one source directory to parsers, skipping excluded directories."""
+    dispatch = ParserDispatch(parsers)
+    tasks: List[_ParseTask] = []
+    for rel_path in rel_paths:
+        file_path = os.path.join(project_root, rel_path)
+        if _is_excluded(os.path.dirname(file_path)):
+            continue
+        tasks.extend((parser, file_path, source_dir) for parser in dispatch.parsers_for(file_path))
+    return tasks
+
+
+def _run_tasks(
+    tasks: List[_ParseTask],
+    project_root: str,
+    cache: Optional[ParseCache],
+    jobs: int,
+    contents: Optional[Dict[str, bytes]] = None,
+    header_only: Collection[InputParser] = (),
+) -> List[Tuple[_ParseTask, Optional[RuleMetadata]]]:
+    """
+    Parse every task, in parallel if jobs > 1, returning results in task order.
+
+    With contents, files are parsed from the bytes given for their path (and
+    skipped if there are none) instead of being read from disk.
+    """
+    limit = header_limit() if header_only else 0
+
+    def run(task: _ParseTask) -> Optional[RuleMetadata]:
+        parser, file_path, source_dir = task
+        if contents is None:
+            return _parse_file(
+                parser,
+                file_path,
+                source_dir,
+                project_root,
+                cache,
+                limit=limit if parser in header_only else 0,
+            )
+        if file_path not in contents:
+            return None
+        return _parse_file(parser, file_path, source_dir, project_root, cache, contents[file_path])
+
+    if jobs <= 1 or len(tasks) <= 1:
+        rules = [run(task) for task in tasks]
+    else:
+        with ThreadPoolExecutor(max_workers=min(jobs, len(tasks))) as executor:
+            rules = list(executor.map(run, tasks))
+    return list(zip(tasks, rules))
+
+
+def _parse_file(
+    parser: InputParser,
+    file_path: str,
+    source_dir: str,
+    project_root: str,
+    cache: Optional[ParseCache],
+    data: Optional[bytes] = None,
+    limit: int = 0,
+) -> Optional[RuleMetadata]:
+    context: Dict[str, Any] = {
+        "project_root": project_root,
+        "relative_path": os.path.relpath(file_path, project_root),
+        "category": get_category(file_path, source_dir),
+    }
+    if limit:
+        # Only the header is needed; see InputParser.parse()
+        context["header_limit"] = limit
+    try:
+        if data is not None:
+            if cache is not None:
+                return cache.parse_data(parser, file_path, data, context)
+            return parser.parse_data(file_path, data, context)
+        if cache is not None:
+            return cache.parse(parser, file_path, context)
+        return parser.parse(file_path, context)
+    except Exception as e:
+        # One malformed rule file shouldn't take down the rest of the sync
+        print(f"Error parsing {file_path}: {e}")
+        return None
+
+
+def _is_excluded(directory: str) -> bool:
+    """Skip generated/personal directories."""
+    parts = Path(directory).parts
+    return "generated" in parts or "personal" in parts
+
+
+def _owning_source_dir(parser: InputParser, rel_path: str, project_root: str) -> Optional[str]:
+    """Return the absolute source directory of parser that contains rel_path, if any."""
+    normalized = os.path.normpath(rel_path)
+    for rel_dir in parser.source_directories:
+        prefix = os.path.normpath(rel_dir) + os.sep
+        if normalized.startswith(prefix):
+            return os.path.join(project_root, os.path.normpath(rel_dir))
+    return None
@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Pipeline scheduler - runs the output stages of independent pipelines concurrently.
+
+Pipelines are grouped so that any two writing the same path, or one writing
+inside a directory another one manages, land in the same group, whose work
+then runs in order on one thread. Groups share no outputs, so they run side by
+side on a thread pool. What each group prints is captured and replayed in
+order afterwards, so the log reads the same as a sequential run.
+"""
+
+import io
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, TypeVar
+
+T = TypeVar("T")
+
+
+class _ThreadStdout(io.TextIOBase):
+    """Sends each thread's writes to its own buffer, if it has one, or to the original stdout."""
+
+    def __init__(self, original):
+        self.original = original
+        self.local = threading.local()
+
+    def write(self, text: str) -> int:
+        buffer = getattr(self.local, "buffer", None)
+        return (buffer if buffer is not None else self.original).write(text)
+
+    def flush(self) -> None:
+        if getattr(self.local, "buffer", None) is None:
+            self.original.flush()
+
+
+def conflict_groups(outputs: Dict[str, List[str]], linked: Iterable[str] = ()) -> List[List[str]]:
+    """
+    Group names whose outputs overlap, keeping the order they were given in.
+
+    Args:
+        outputs: Paths (files or directories) each name writes
+        linked: Names that must share a group regardless of their outputs
+
+    Returns:
+        Groups of names; names in different groups never write the same path
+    """
+    names = list(outputs)
+    parent = {name: name for name in names}
+
+    def find(name: str) -> str:
+        while parent[name] != name:
+            parent[name] = parent[parent[name]]
+            name = parent[name]
+        return name
+
+    def union(a: str, b: str) -> None:
+        root_a, root_b = find(a), find(b)
+        if root_a != root_b:
+            # The earlier name stays the root, so groups come out in input order
+            if names.index(root_a) < names.index(root_b):
+                parent[root_b] = root_a
+            else:
+                parent[root_a] = root_b
+
+    linked = [name for name in linked if name in parent]
+    for name in linked[1:]:
+        union(linked[0], name)
+    for i, a in enumerate(names):
+        for b in names[i + 1 :]:
+            if any(_overlaps(x, y) for x in outputs[a] for y in outputs[b]):
+                union(a, b)
+
+    groups: Dict[str, List[str]] = {}
+    for name in names:
+        groups.setdefault(find(name), []).append(name)
+    return list(groups.values())
+
+
+def run_concurrently(tasks: List[Callable[[], T]], workers: int) -> List[T]:
+    """Run tasks on up to workers threads (in this one if that's 1), returning results in order."""
+    if workers <= 1 or len(tasks) <= 1:
+        return [task() for task in tasks]
+    with ThreadPoolExecutor(max_workers=min(workers, len(tasks))) as executor:
+        futures = [executor.submit(task) for task in tasks]
+        return [future.result() for future in futures]
+
+
+@contextmanager
+def thread_output() -> Iterator[None]:
+    """Let captured_output() capture per thread until the block exits."""
+    original = sys.stdout
+    sys.stdout = _ThreadStdout(original)
+    try:
+        yield
+    finally:
+        sys.stdout = original
+
+
+@contextmanager
+def captured_output(log: io.StringIO) -> Iterator[io.StringIO]:
+    """Capture what this thread prints into log (within thread_output(), else all of stdout)."""
+    stdout = sys.stdout
+    if not isinstance(stdout, _ThreadStdout):
+        sys.stdout = log
+        try:
+            yield log
+        finally:
+            sys.stdout = stdout
+        return
+
+    previous: Optional[io.StringIO] = getattr(stdout.local, "buffer", None)
+    stdout.local.buffer = log
+    try:
+        yield log
+    finally:
+        stdout.local.buffer = previous
+
+
+def _overlaps(a: str, b: str) -> bool:
+    a, b = a.rstrip("/"), b.rstrip("/")
+    return a == b or a.startswith(b + "/") or b.startswith(a + "/")
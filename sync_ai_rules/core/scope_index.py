@@ -0,0 +1,285 @@
+#!/usr/bin/env python3
+"""
+Scope index - which rules apply to a path, for many paths at once.
+
+Every rule's glob patterns are compiled together: brace alternatives are
+expanded, and each pattern is filed in a trie under its leading literal
+directories, then bucketed by the literal file extension it requires (if any).
+A path only walks the trie along its own directories and is tested against
+the buckets for its extension, each bucket pre-screened by one combined regex,
+so a batch costs roughly its total path length rather than paths × patterns.
+
+Patterns are relative to the project root. A pattern without a "/" (e.g.
+``*.py``) matches files of that name in any directory; ``**`` matches any
+number of directories, ``*`` and ``?`` match within one path segment, and
+``[...]`` and ``{a,b}`` work as in shell globs.
+"""
+
+import re
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sync_ai_rules.core.rule_metadata import RuleMetadata
+
+_GLOB_CHARS = set("*?[{")
+# Brace patterns expanding to more alternatives than this are matched by one regex instead
+_MAX_EXPANSION = 256
+
+
+class _Bucket:
+    """Patterns sharing a trie node and extension, pre-screened by one combined regex."""
+
+    __slots__ = ("_sources", "patterns", "rule_ids", "union")
+
+    def __init__(self):
+        # Rule ids per regex, until compile()
+        self._sources: Dict[str, List[int]] = {}
+        self.patterns: List[re.Pattern[str]] = []
+        self.rule_ids: List[List[int]] = []
+        self.union: Optional[re.Pattern[str]] = None
+
+    def add(self, regex: str, rule_id: int) -> None:
+        ids = self._sources.setdefault(regex, [])
+        if rule_id not in ids:
+            ids.append(rule_id)
+
+    def compile(self) -> None:
+        self.union = re.compile("|".join(f"(?:{regex})" for regex in self._sources))
+        self.patterns = [re.compile(regex) for regex in self._sources]
+        self.rule_ids = list(self._sources.values())
+        self._sources = {}
+
+    def matches(self, path: str) -> Iterable[List[int]]:
+        if not self.union.fullmatch(path):
+            return
+        if len(self.patterns) == 1:
+            yield self.rule_ids[0]
+            return
+        for pattern, ids in zip(self.patterns, self.rule_ids):
+            if pattern.fullmatch(path):
+                yield ids
+
+
+class _Node:
+    __slots__ = ("buckets", "children")
+
+    def __init__(self):
+        self.children: Dict[str, _Node] = {}
+        # Keyed by the extension a path must have, None for patterns that don't require one
+        self.buckets: Dict[Optional[str], _Bucket] = {}
+
+
+class ScopeIndex:
+    """
+    All rules' scope patterns compiled into one matcher.
+
+    Rules with always_apply set apply to every path. Rules that are neither
+    always applied nor scoped by any pattern apply to no path.
+    """
+
+    def __init__(self, rules: List[RuleMetadata]):
+        self.rules = list(rules)
+        self._always = [i for i, rule in enumerate(self.rules) if rule.always_apply]
+        self._root = _Node()
+        nodes = [self._root]
+        for rule_id, rule in enumerate(self.rules):
+            for pattern in rule.scope_patterns or []:
+                if isinstance(pattern, str) and pattern.strip():
+                    pattern = _normalize(pattern)
+                    if pattern.endswith("/"):
+                        # A directory: everything below it
+                        pattern += "**"
+                    for expanded in _expand_braces(pattern):
+                        nodes.extend(self._add(expanded, rule_id))
+        for node in nodes:
+            for bucket in node.buckets.values():
+                bucket.compile()
+
+    def match(self, path: str, include_always: bool = True) -> List[RuleMetadata]:
+        """Return the rules that apply to path (relative to the project root), in index order."""
+        return [self.rules[i] for i in self._match_ids(_normalize(path), include_always)]
+
+    def match_all(
+        self, paths: Iterable[str], include_always: bool = True
+    ) -> Dict[str, List[RuleMetadata]]:
+        """Return the rules that apply to each of paths, keyed by the path as given."""
+        return {path: self.match(path, include_always) for path in paths}
+
+    def _add(self, pattern: str, rule_id: int) -> List[_Node]:
+        """File one brace-free pattern under its literal directories; returns nodes created."""
+        segments = pattern.split("/")
+        if len(segments) == 1:
+            # A bare name matches in any directory
+            segments = ["**", pattern]
+        elif segments[-1] == "**":
+            # "dir/**" matches everything below dir, but not dir itself
+            segments[-1:] = ["**", "*"]
+
+        created = []
+        node = self._root
+        literal = 0
+        while literal < len(segments) - 1 and not _GLOB_CHARS & set(segments[literal]):
+            child = node.children.get(segments[literal])
+            if child is None:
+                child = node.children[segments[literal]] = _Node()
+                created.append(child)
+            node = child
+            literal += 1
+
+        extension = _required_extension(segments[-1])
+        bucket = node.buckets.get(extension)
+        if bucket is None:
+            bucket = node.buckets[extension] = _Bucket()
+        bucket.add(_translate(segments), rule_id)
+        return created
+
+    def _match_ids(self, path: str, include_always: bool) -> List[int]:
+        ids = set(self._always) if include_always else set()
+        segments = path.split("/")
+        name = segments[-1]
+        keys = (None, name.rsplit(".", 1)[1]) if "." in name else (None,)
+
+        node = self._root
+        depth = 0
+        while node is not None:
+            for key in keys:
+                bucket = node.buckets.get(key)
+                if bucket is not None:
+                    for rule_ids in bucket.matches(path):
+                        ids.update(rule_ids)
+            if depth >= len(segments) - 1:
+                break
+            node = node.children.get(segments[depth])
+            depth += 1
+        return sorted(ids)
+
+
+def _normalize(path: str) -> str:
+    path = path.strip()
+    while path.startswith("./"):
+        path = path[2:]
+    return path.lstrip("/")
+
+
+def _expand_braces(pattern: str) -> List[str]:
+    """Expand {a,b} alternatives into separate patterns (unless there'd be too many)."""
+    results = [pattern]
+    while True:
+        expanded = []
+        changed = False
+        for item in results:
+            span = _innermost_braces(item)
+            if span is None:
+                expanded.append(item)
+                continue
+            start, end = span
+            changed = True
+            for alternative in item[start + 1 : end].split(","):
+                expanded.append(item[:start] + alternative + item[end + 1 :])
+        if not changed:
+            return results
+        if len(expanded) > _MAX_EXPANSION:
+            return [pattern]
+        results = expanded
+
+
+def _innermost_braces(pattern: str) -> Optional[Tuple[int, int]]:
+    """Span of the first {...} group containing a comma and no other braces."""
+    start = None
+    for i, char in enumerate(pattern):
+        if char == "{":
+            start = i
+        elif char == "}" and start is not None:
+            if "," in pattern[start:i]:
+                return start, i
+            start = None
+    return None
+
+
+def _required_extension(name: str) -> Optional[str]:
+    """The extension every match of a file name pattern ends with, e.g. "py" for "test_*.py"."""
+    if "." not in name:
+        return None
+    extension = name.rsplit(".", 1)[1]
+    if not extension or _GLOB_CHARS & set(extension) or "]" in extension or "}" in extension:
+        return None
+    return extension
+
+
+def _translate(segments: List[str]) -> str:
+    """Translate a brace-free glob, split into path segments, into a regex."""
+    parts = []
+    for i, segment in enumerate(segments):
+        last = i == len(segments) - 1
+        if segment == "**":
+            parts.append(".*" if last else "(?:[^/]+/)*")
+        else:
+            parts.append(_translate_segment(segment) + ("" if last else "/"))
+    return "".join(parts)
+
+
+def _translate_segment(segment: str) -> str:
+    parts = []
+    i = 0
+    while i < len(segment):
+        char = segment[i]
+        if char == "*":
+            while i + 1 < len(segment) and segment[i + 1] == "*":
+                i += 1
+            parts.append("[^/]*")
+        elif char == "?":
+            parts.append("[^/]")
+        elif char == "[":
+            start = i + 1
+            negate = segment[start : start + 1] in ("!", "^")
+            if negate:
+                start += 1
+            # A "]" right after the opening bracket is part of the set
+            end = segment.find("]", start + 1)
+            if end == -1:
+                parts.append(re.escape(char))
+            else:
+                body = segment[start:end].replace("\\", "\\\\").replace("[", "\\[")
+                if not negate and body.startswith("^"):
+                    body = "\\" + body
+                parts.append(f"[^/{body}]" if negate else f"[{body}]")
+                i = end
+        elif char in "{}":
+            parts.append(_translate_braces(segment, i) if char == "{" else re.escape(char))
+            if char == "{":
+                i = _closing_brace(segment, i)
+        else:
+            parts.append(re.escape(char))
+        i += 1
+    return "".join(parts)
+
+
+def _closing_brace(segment: str, start: int) -> int:
+    depth = 0
+    for i in range(start, len(segment)):
+        if segment[i] == "{":
+            depth += 1
+        elif segment[i] == "}":
+            depth -= 1
+            if depth == 0:
+                return i
+    return start
+
+
+def _translate_braces(segment: str, start: int) -> str:
+    """Braces left after expansion (too many alternatives, or unbalanced) as a regex group."""
+    end = _closing_brace(segment, start)
+    if end == start or "," not in segment[start:end]:
+        return re.escape("{")
+    alternatives = []
+    depth = 0
+    current = start + 1
+    for i in range(start + 1, end):
+        if segment[i] == "{":
+            depth += 1
+        elif segment[i] == "}":
+            depth -= 1
+        elif segment[i] == "," and depth == 0:
+            alternatives.append(segment[current:i])
+            current = i + 1
+    alternatives.append(segment[current:end])
+    return "(?:" + "|".join(_translate_segment(alt) for alt in alternatives) + ")"
@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Run trace - records how long each stage of a sync takes and how much I/O it does.
+
+Stage timings are always collected (they cost a clock read per stage). A detailed
+trace also records bytes read and written per stage from /proc/self/io, where
+available, and can be written as a JSON report.
+"""
+
+import json
+import os
+import platform
+import resource
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, Optional
+
+_REPORT_VERSION = 1
+_PROC_IO = "/proc/self/io"
+
+
+class Trace:
+    """Accumulates wall time and counters per named stage, overall and per pipeline."""
+
+    def __init__(self, detailed: bool = False):
+        # Seconds per stage, in the order stages first ran
+        self.stages: Dict[str, float] = {}
+        # Counters per stage, e.g. files, files_written, bytes_read, bytes_written
+        self.counts: Dict[str, Dict[str, int]] = {}
+        # Seconds and counters per stage of each pipeline
+        self.pipelines: Dict[str, Dict[str, Dict[str, float]]] = {}
+        self.detailed = detailed
+        self._started = time.perf_counter()
+        # Stages of pipelines running concurrently are recorded from several threads
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def stage(self, name: str, pipeline: Optional[str] = None) -> Iterator[Dict[str, int]]:
+        """
+        Time the enclosed block, adding to any earlier time recorded for name.
+
+        Yields a dict the block can add counters to; in a detailed trace, bytes
+        read and written by the whole process during the block are added to it.
+        """
+        counts: Dict[str, int] = {}
+        io_before = _read_process_io() if self.detailed else None
+        start = time.perf_counter()
+        try:
+            yield counts
+        finally:
+            seconds = time.perf_counter() - start
+            io_after = _read_process_io() if io_before is not None else None
+            if io_before is not None and io_after is not None:
+                counts["bytes_read"] = io_after["rchar"] - io_before["rchar"]
+                counts["bytes_written"] = io_after["wchar"] - io_before["wchar"]
+            self.record(name, seconds, counts, pipeline)
+
+    def record(
+        self,
+        name: str,
+        seconds: float,
+        counts: Optional[Dict[str, int]] = None,
+        pipeline: Optional[str] = None,
+    ) -> None:
+        """Add time and counters measured elsewhere to a stage."""
+        counts = counts or {}
+        with self._lock:
+            self.stages[name] = self.stages.get(name, 0.0) + seconds
+            stage_counts = self.counts.setdefault(name, {})
+            for key, value in counts.items():
+                stage_counts[key] = stage_counts.get(key, 0) + value
+
+            if pipeline is not None:
+                entry = self.pipelines.setdefault(pipeline, {}).setdefault(name, {"seconds": 0.0})
+                entry["seconds"] += seconds
+                for key, value in counts.items():
+                    entry[key] = entry.get(key, 0) + value
+
+    def report(self) -> Dict:
+        """Machine-readable summary of the run so far."""
+        return {
+            "version": _REPORT_VERSION,
+            "argv": sys.argv,
+            "python": platform.python_version(),
+            "platform": sys.platform,
+            "total_seconds": time.perf_counter() - self._started + self.stages.get("git", 0.0),
+            "peak_rss_kb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+            "stages": {
+                name: {"seconds": seconds, **self.counts.get(name, {})}
+                for name, seconds in self.stages.items()
+            },
+            "pipelines": self.pipelines,
+        }
+
+    def write_report(self, path: str) -> None:
+        """Write report() as JSON to path."""
+        parent = os.path.dirname(path)
+        if parent:
+            os.makedirs(parent, exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.report(), f, indent=2)
+
+
+def _read_process_io() -> Optional[Dict[str, int]]:
+    """Bytes this process has read and written so far (Linux only), or None."""
+    try:
+        with open(_PROC_IO, encoding="ascii") as f:
+            return {key: int(value) for key, value in (line.split(": ") for line in f)}
+    except (OSError, ValueError):
+        return None
@@ -1,10 +1,50 @@
 #!/usr/bin/env python3
 """
 File updater for maintaining demarcated sections in documentation files.
+
+Several pipelines can own sections of the same file (e.g. AGENTS.md). A
+DocumentationTransaction collects every section update per target file and
+applies them with one read and at most one atomic write per file, producing
+the same content as updating the sections one after another would. Sections
+that aren't being updated can be queued as kept, so the file is spaced as if
+they had been updated with their current content.
 """
 
+import codecs
+import mmap
 import os
-from typing import Optional, Tuple
+from typing import (
+    BinaryIO,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    NamedTuple,
+    Optional,
+    Tuple,
+    Union,
+)
+
+from sync_ai_rules.core.reconciler import UNCHANGED, OutputReconciler
+
+# Files are spliced in chunks of this size, keeping memory use independent of file size
+_CHUNK_SIZE = 1 << 20
+
+_DEFAULT_MARKERS = ("<auto-generated-rules>", "</auto-generated-rules>")
+_NEWLINES = b"\r\n"
+_SEPARATOR = b"\n\n"
+
+# Raw file content: a memory map, or bytes for empty files
+Buffer = Union[mmap.mmap, bytes]
+
+# New section content: text, or a function returning a fresh stream of text chunks
+# (such as a generator's generate_chunks bound to its rules)
+Section = Union[str, Callable[[], Iterable[str]]]
+
+
+class MarkerConflict(Exception):
+    """Section updates to one file whose markers can't be told apart."""
 
 
 def find_demarcated_section(
@@ -16,7 +56,7 @@ def find_demarcated_section(
     Find the start and end positions of the auto-generated rules section.
 
     Args:
-        content: File content to search
+        content: File content to search (str, or bytes/mmap with bytes markers)
         start_marker: Optional custom start marker
         end_marker: Optional custom end marker
 
@@ -36,65 +76,463 @@ def find_demarcated_section(
 
 
 def update_documentation_file(
-    file_path: str, new_section: str, section_markers: Tuple[str, str] = None
+    file_path: str,
+    new_section: Section,
+    section_markers: Tuple[str, str] = None,
+    reconciler: Optional[OutputReconciler] = None,
 ) -> Tuple[bool, str]:
     """
     Update a documentation file with new rules section.
 
+    The existing file is memory-mapped and spliced as a stream of chunks, so the
+    whole file is never decoded or copied, and it's only rewritten (atomically)
+    if the updated content differs from what's on disk. A streamed section is
+    encoded chunk by chunk as it's written, and is never held whole in memory.
+
     Args:
         file_path: Path to documentation file (e.g., CLAUDE.md)
-        new_section: New rules section content
+        new_section: New rules section content, or a function returning its chunks
         section_markers: Optional custom section markers
+        reconciler: Optional reconciler to record the outcome in
 
     Returns:
         Tuple of (success, message)
     """
-    try:
-        start_marker = section_markers[0] if section_markers else None
-        end_marker = section_markers[1] if section_markers else None
-
-        # Check if file exists
-        if os.path.exists(file_path):
-            # Read existing file
-            with open(file_path, encoding="utf-8") as f:
-                content = f.read()
-
-            # Find existing section
-            start_pos, end_pos = find_demarcated_section(content, start_marker, end_marker)
-
-            if start_pos is not None and end_pos is not None:
-                # Replace existing section
-                before = content[:start_pos].rstrip("\n")
-                after = content[end_pos:].lstrip("\n")
-
-                # Add proper spacing: before section (2 newlines), after section (2 newlines)
-                if before:
-                    before += "\n\n"
-                if after:
-                    after = "\n\n" + after
-
-                updated_content = before + new_section + after
-                operation = "updated"
+    transaction = DocumentationTransaction()
+    transaction.add(file_path, new_section, section_markers)
+    [(_, success, message)] = transaction.commit(reconciler)
+    return success, message
+
+
+class _SectionUpdate(NamedTuple):
+    owner: str
+    # None for a section that's kept as it is
+    chunks: Optional[Callable[[], Iterator[bytes]]]
+    start_marker: bytes
+    end_marker: bytes
+
+
+class DocumentationTransaction:
+    """Section updates collected per target file, applied with one read and write per file."""
+
+    def __init__(self):
+        self._updates: Dict[str, List[_SectionUpdate]] = {}
+
+    @property
+    def files(self) -> List[str]:
+        """Target files with a section to update, in the order they were first added."""
+        return [
+            file_path
+            for file_path, updates in self._updates.items()
+            if any(update.chunks is not None for update in updates)
+        ]
+
+    def add(
+        self,
+        file_path: str,
+        new_section: Section,
+        section_markers: Optional[Tuple[str, str]] = None,
+        owner: Optional[str] = None,
+    ) -> None:
+        """
+        Queue a section update; sections of one file are applied in the order added.
+
+        Args:
+            file_path: Path to documentation file
+            new_section: New section content, or a function returning its chunks
+            section_markers: Optional custom section markers
+            owner: Name of whatever produced the section (e.g. a pipeline), for messages
+        """
+        start_marker, end_marker = (m.encode("utf-8") for m in section_markers or _DEFAULT_MARKERS)
+        update = _SectionUpdate(
+            owner or start_marker.decode("utf-8"),
+            _section_chunks(new_section),
+            start_marker,
+            end_marker,
+        )
+        self._updates.setdefault(file_path, []).append(update)
+
+    def keep(
+        self,
+        file_path: str,
+        section_markers: Optional[Tuple[str, str]] = None,
+        owner: Optional[str] = None,
+    ) -> None:
+        """
+        Queue a section that isn't being updated, in order with the sections that are.
+
+        The blank lines around it end up as updating it with its current content
+        would leave them. Files with only kept sections aren't touched.
+
+        Args:
+            file_path: Path to documentation file
+            section_markers: Optional custom section markers
+            owner: Name of whatever produced the section (e.g. a pipeline), for messages
+        """
+        start_marker, end_marker = (m.encode("utf-8") for m in section_markers or _DEFAULT_MARKERS)
+        update = _SectionUpdate(
+            owner or start_marker.decode("utf-8"), None, start_marker, end_marker
+        )
+        self._updates.setdefault(file_path, []).append(update)
+
+    def commit(self, reconciler: Optional[OutputReconciler] = None) -> List[Tuple[str, bool, str]]:
+        """
+        Apply all queued updates.
+
+        Every file is read and checked for marker conflicts before anything is
+        written; if any file has a conflict, no file is written.
+
+        Returns:
+            (file_path, success, message) for each target file
+        """
+        if reconciler is None:
+            reconciler = OutputReconciler()
+
+        plans: Dict[str, _FilePlan] = {}
+        failures: Dict[str, str] = {}
+        conflicted = False
+        files = self.files
+        try:
+            for file_path in files:
+                try:
+                    plans[file_path] = _plan_file(file_path, self._updates[file_path])
+                except MarkerConflict as e:
+                    failures[file_path] = f"Section marker conflict in {file_path}: {e}"
+                    conflicted = True
+                except Exception as e:
+                    failures[file_path] = f"Failed to update {file_path}: {e}"
+
+            results = []
+            for file_path in files:
+                if file_path in failures:
+                    results.append((file_path, False, failures[file_path]))
+                elif conflicted:
+                    message = f"Not updating {file_path}: section marker conflict in another file"
+                    results.append((file_path, False, message))
+                else:
+                    results.append((file_path, *_apply_plan(plans[file_path], reconciler)))
+            return results
+        finally:
+            for plan in plans.values():
+                plan.close()
+
+
+class _FilePlan:
+    """
+    The updated content of one file as a list of pieces to stream in order.
+
+    Pieces are ("range", start, stop) spans of the existing file, ("separator",
+    0, 2) blank lines, or (index, start, stop) byte spans of a new section.
+    """
+
+    def __init__(self, file_path: str, updates: List[_SectionUpdate], content: Optional[Buffer]):
+        self.file_path = file_path
+        self.updates = updates
+        self.content = content if content is not None else b""
+        self.exists = content is not None
+        self.pieces: List[List] = []
+        # Old sections being replaced; still checked to be valid text like the rest
+        self.dropped: List[Tuple[int, int]] = []
+        self.operations: List[str] = []
+        # Length, leading newlines and trailing newlines of each new section
+        self.shapes: List[Tuple[int, int, int]] = []
+
+    def chunks(self) -> Iterator[bytes]:
+        """Stream the updated file content."""
+        for start, stop in self.dropped:
+            for _ in _text_chunks(self.content, start, stop):
+                pass
+        for kind, start, stop in self.pieces:
+            if kind == "range":
+                yield from _text_chunks(self.content, start, stop)
+            elif kind == "separator":
+                yield _SEPARATOR
             else:
-                # No existing section, append to end
-                if content:
-                    # Ensure exactly 2 newlines before new section
-                    content = content.rstrip("\n") + "\n\n"
-                updated_content = content + new_section
-                operation = "added"
+                yield from _slice_chunks(self.updates[kind].chunks(), start, stop)
+
+    def close(self) -> None:
+        """Unmap the existing file."""
+        if isinstance(self.content, mmap.mmap):
+            self.content.close()
+
+
+def _plan_file(file_path: str, updates: List[_SectionUpdate]) -> _FilePlan:
+    """Read file_path once, check its section markers and plan the updated content."""
+    _check_marker_overlap(updates)
+
+    content = None
+    if os.path.exists(file_path):
+        with open(file_path, "rb") as f:
+            content = _map_file(f)
+    plan = _FilePlan(file_path, updates, content)
+
+    # Sections the file already has, by their position in it
+    spans: List[Tuple[int, int, int]] = []
+    for index, update in enumerate(updates):
+        start_pos, end_pos = find_demarcated_section(
+            plan.content, update.start_marker, update.end_marker
+        )
+        if start_pos is not None and end_pos is not None:
+            if end_pos - len(update.end_marker) < start_pos:
+                raise MarkerConflict(f"{update.owner} end marker comes before its start marker")
+            spans.append((start_pos, end_pos, index))
+    spans.sort()
+    for (_, end_a, a), (start_b, _, b) in zip(spans, spans[1:]):
+        if start_b < end_a:
+            raise MarkerConflict(f"sections of {updates[a].owner} and {updates[b].owner} overlap")
+
+    plan.shapes = [_measure_section(updates, index) for index in range(len(updates))]
+
+    # Splice the sections in one after another, as separate updates would
+    span_by_index = {index: (start, end) for start, end, index in spans}
+    if plan.exists and len(plan.content):
+        plan.pieces.append(["range", 0, len(plan.content)])
+    for index, update in enumerate(updates):
+        if update.chunks is None:
+            if index in span_by_index:
+                _keep_section(plan, *span_by_index[index])
+        elif index in span_by_index:
+            _splice_section(plan, index, *span_by_index[index])
+            plan.operations.append("updated")
         else:
-            # File doesn't exist, create new one with just the section
-            updated_content = new_section
-            operation = "created"
+            _append_section(plan, index)
+            plan.operations.append("added" if plan.exists or plan.operations else "created")
+    return plan
 
-        # Create parent directories if they don't exist
-        os.makedirs(os.path.dirname(file_path), exist_ok=True)
 
-        # Write updated content
-        with open(file_path, "w", encoding="utf-8") as f:
-            f.write(updated_content)
+def _measure_section(updates: List[_SectionUpdate], index: int) -> Tuple[int, int, int]:
+    """Shape of the new content of updates[index], checked not to contain other markers."""
+    update = updates[index]
+    if update.chunks is None:
+        return 0, 0, 0
+    # New content must not contain another section's markers, or the sections
+    # would be found in the wrong place on the next run
+    others = [
+        marker
+        for other, o in enumerate(updates)
+        if other != index
+        for marker in (o.start_marker, o.end_marker)
+    ]
+    shape, found = _scan_section(update.chunks(), others)
+    if found is not None:
+        owner = next(o.owner for o in updates if found in (o.start_marker, o.end_marker))
+        raise MarkerConflict(
+            f"content of {update.owner} contains the {owner} marker {found.decode('utf-8')!r}"
+        )
+    return shape
 
-        return True, f"Successfully {operation} rules section in {file_path}"
 
+def _apply_plan(plan: _FilePlan, reconciler: OutputReconciler) -> Tuple[bool, str]:
+    """Write a planned file unless it's already up to date."""
+    file_path = plan.file_path
+    try:
+        status = reconciler.write_stream(file_path, plan.chunks)
     except Exception as e:
         return False, f"Failed to update {file_path}: {e}"
+
+    count = len(plan.operations)
+    if count == 1:
+        if status == UNCHANGED:
+            return True, f"Rules section already up to date in {file_path}"
+        return True, f"Successfully {plan.operations[0]} rules section in {file_path}"
+
+    if status == UNCHANGED:
+        return True, f"{count} rules sections already up to date in {file_path}"
+    operation = "updated" if plan.exists else "created"
+    return True, f"Successfully {operation} {count} rules sections in {file_path}"
+
+
+def _check_marker_overlap(updates: List[_SectionUpdate]) -> None:
+    """Reject sections of one file whose markers are equal or contain each other."""
+    for index, update in enumerate(updates):
+        for other in updates[index + 1 :]:
+            for marker in (update.start_marker, update.end_marker):
+                for other_marker in (other.start_marker, other.end_marker):
+                    if marker in other_marker or other_marker in marker:
+                        shared = min(marker, other_marker, key=len).decode("utf-8")
+                        raise MarkerConflict(
+                            f"{update.owner} and {other.owner} both use the marker {shared!r}"
+                        )
+
+
+def _splice_section(plan: _FilePlan, index: int, start: int, end: int) -> None:
+    """Replace the existing section at [start, end) with section index, spaced by blank lines."""
+    before, after = _split_pieces(plan, start, end)
+    plan.dropped.append((start, end))
+
+    # Add proper spacing: before section (2 newlines), after section (2 newlines)
+    _rstrip_pieces(plan, before)
+    _lstrip_pieces(plan, after)
+    if before:
+        before.append(["separator", 0, 2])
+    if after:
+        after.insert(0, ["separator", 0, 2])
+    plan.pieces = [*before, [index, 0, plan.shapes[index][0]], *after]
+
+
+def _keep_section(plan: _FilePlan, start: int, end: int) -> None:
+    """
+    Keep the existing section at [start, end), with the line breaks around it on disk.
+
+    Those are the line breaks its last update left, which updating it again with
+    the same content would leave too.
+    """
+    before, after = _split_pieces(plan, start, end)
+    _rstrip_pieces(plan, before)
+    _lstrip_pieces(plan, after)
+    start = _rstrip_newlines(plan.content, start)
+    end = _lstrip_newlines(plan.content, end)
+    plan.pieces = [*before, ["range", start, end], *after]
+
+
+def _split_pieces(plan: _FilePlan, start: int, end: int) -> Tuple[List[List], List[List]]:
+    """Split the pieces around the existing section at [start, end)."""
+    pieces = plan.pieces
+    # Other sections only ever strip line breaks, so the old section is still intact
+    position = next(
+        i for i, (kind, a, b) in enumerate(pieces) if kind == "range" and a <= start and end <= b
+    )
+    _, range_start, range_end = pieces[position]
+    before = [*pieces[:position], ["range", range_start, start]]
+    after = [["range", end, range_end], *pieces[position + 1 :]]
+    return before, after
+
+
+def _append_section(plan: _FilePlan, index: int) -> None:
+    """Append section index after exactly one blank line."""
+    nonempty = any(start < stop for _, start, stop in plan.pieces)
+    _rstrip_pieces(plan, plan.pieces)
+    if nonempty:
+        plan.pieces.append(["separator", 0, 2])
+    plan.pieces.append([index, 0, plan.shapes[index][0]])
+
+
+def _rstrip_pieces(plan: _FilePlan, pieces: List[List]) -> None:
+    """Strip the run of line breaks ending the pieces, dropping pieces left empty."""
+    while pieces:
+        kind, start, stop = pieces[-1]
+        if kind == "range":
+            stop = _rstrip_newlines(plan.content, stop, start)
+        elif kind == "separator":
+            stop = start
+        else:
+            length, leading, trailing = plan.shapes[kind]
+            stop = start if leading == length else max(start, min(stop, length - trailing))
+        if start < stop:
+            pieces[-1][2] = stop
+            return
+        pieces.pop()
+
+
+def _lstrip_pieces(plan: _FilePlan, pieces: List[List]) -> None:
+    """Strip the run of line breaks starting the pieces, dropping pieces left empty."""
+    while pieces:
+        kind, start, stop = pieces[0]
+        if kind == "range":
+            start = _lstrip_newlines(plan.content, start, stop)
+        elif kind == "separator":
+            start = stop
+        else:
+            length, leading, _ = plan.shapes[kind]
+            start = stop if leading == length else min(stop, max(start, leading))
+        if start < stop:
+            pieces[0][1] = start
+            return
+        pieces.pop(0)
+
+
+def _scan_section(
+    chunks: Iterator[bytes], markers: List[bytes]
+) -> Tuple[Tuple[int, int, int], Optional[bytes]]:
+    """
+    Measure a section's length and leading and trailing line breaks.
+
+    Returns the (length, leading, trailing) shape and the first of markers found
+    in the section, if any.
+    """
+    length = leading = trailing = 0
+    overlap = max((len(marker) for marker in markers), default=1) - 1
+    tail = b""
+    for chunk in chunks:
+        if not chunk:
+            continue
+        if leading == length:
+            leading += len(chunk) - len(chunk.lstrip(_NEWLINES))
+        stripped = chunk.rstrip(_NEWLINES)
+        trailing = len(chunk) - len(stripped) if stripped else trailing + len(chunk)
+        length += len(chunk)
+
+        # Keep enough of the previous chunk to find markers split across chunks
+        window = tail + chunk
+        for marker in markers:
+            if marker in window:
+                return (length, leading, trailing), marker
+        tail = window[-overlap:] if overlap else b""
+    return (length, leading, trailing), None
+
+
+def _slice_chunks(chunks: Iterator[bytes], start: int, stop: int) -> Iterator[bytes]:
+    """Yield bytes [start, stop) of a chunk stream."""
+    pos = 0
+    for chunk in chunks:
+        chunk_start, pos = pos, pos + len(chunk)
+        if pos <= start:
+            continue
+        if chunk_start >= stop:
+            return
+        yield chunk[max(start - chunk_start, 0) : stop - chunk_start]
+
+
+def _section_chunks(new_section: Section) -> Callable[[], Iterator[bytes]]:
+    """Adapt a section given as text or as a chunk stream to a source of UTF-8 chunks."""
+    if isinstance(new_section, str):
+        encoded = new_section.encode("utf-8")
+        return lambda: iter((encoded,))
+    return lambda: (chunk.encode("utf-8") for chunk in new_section())
+
+
+def _map_file(f: BinaryIO) -> Union[mmap.mmap, bytes]:
+    """Memory-map an open file; empty files can't be mapped."""
+    if os.fstat(f.fileno()).st_size == 0:
+        return b""
+    return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+
+def _text_chunks(content: Buffer, start: int, stop: int) -> Iterator[bytes]:
+    """
+    Yield content[start:stop] in chunks with universal newlines translated to "\\n".
+
+    Each chunk is also run through a UTF-8 decoder, so invalid text fails the
+    update just as reading the file in text mode would.
+    """
+    decoder = codecs.getincrementaldecoder("utf-8")()
+    pending_cr = False
+    for pos in range(start, stop, _CHUNK_SIZE):
+        chunk = content[pos : min(pos + _CHUNK_SIZE, stop)]
+        decoder.decode(chunk)
+        # A "\r" at the end of a chunk may be the first half of a "\r\n"
+        if pending_cr:
+            chunk = b"\r" + chunk
+        pending_cr = chunk.endswith(b"\r")
+        if pending_cr:
+            chunk = chunk[:-1]
+        yield chunk.replace(b"\r\n", b"\n").replace(b"\r", b"\n")
+    decoder.decode(b"", final=True)
+    if pending_cr:
+        yield b"\n"
+
+
+def _rstrip_newlines(content: Buffer, end: int, start: int = 0) -> int:
+    """Index where the run of line breaks ending at end (but not before start) starts."""
+    while end > start and content[end - 1 : end] in (b"\n", b"\r"):
+        end -= 1
+    return end
+
+
+def _lstrip_newlines(content: Buffer, start: int, end: Optional[int] = None) -> int:
+    """Index just past the run of line breaks starting at start (but not past end)."""
+    if end is None:
+        end = len(content)
+    while start < end and content[start : start + 1] in (b"\n", b"\r"):
+        start += 1
+    return start
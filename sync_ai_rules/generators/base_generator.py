@@ -1,7 +1,7 @@
 #!/usr/bin/env python3
 
 from abc import abstractmethod
-from typing import List
+from typing import Any, Dict, Iterable, Iterator, List, Optional
 
 from sync_ai_rules.core.generator_interface import OutputGenerator
 from sync_ai_rules.core.rule_metadata import RuleMetadata
@@ -10,6 +10,10 @@ from sync_ai_rules.core.rule_metadata import RuleMetadata
 class BaseGenerator(OutputGenerator):
     """Base class for all generators with shared functionality."""
 
+    def __init__(self):
+        # Rendered text per category, reused until the category is invalidated
+        self._category_text: Dict[str, str] = {}
+
     @property
     def default_filenames(self) -> List[str]:
         """Default target files for all generators."""
@@ -18,6 +22,51 @@ class BaseGenerator(OutputGenerator):
             ".github/copilot-instructions.md",
         ]
 
+    def generate(self, rules: Dict[str, List[RuleMetadata]], config: Dict[str, Any]) -> str:
+        """Generate the whole output as one string from generate_chunks()."""
+        return "".join(self.generate_chunks(rules, config))
+
+    def generate_chunks(
+        self, rules: Dict[str, List[RuleMetadata]], config: Dict[str, Any]
+    ) -> Iterator[str]:
+        """Stream the output; subclasses override this or generate(), not neither."""
+        if type(self).generate is BaseGenerator.generate:
+            raise NotImplementedError(
+                f"{type(self).__name__} must implement generate() or generate_chunks()"
+            )
+        yield from super().generate_chunks(rules, config)
+
+    def invalidate_categories(self, categories: Optional[Iterable[str]] = None) -> None:
+        """Drop rendered categories so they're re-rendered; None drops all of them."""
+        if categories is None:
+            self._category_text.clear()
+            return
+        for category in categories:
+            self._category_text.pop(category, None)
+
+    def _render_categories(self, rules: Dict[str, List[RuleMetadata]]) -> Iterator[str]:
+        """
+        Yield every category's text alphabetically, one chunk per category,
+        reusing categories that weren't invalidated.
+        """
+        for category in sorted(rules.keys()):
+            if category not in self._category_text:
+                lines = self._render_category(category, rules[category])
+                self._category_text[category] = self._join_lines(lines)
+            yield self._category_text[category]
+
+    def _render_category(self, category: str, rules: List[RuleMetadata]) -> List[str]:
+        """Render a category heading followed by its rules sorted by title."""
+        lines = [f"### {self._format_heading(category)}", ""]
+        for rule in self._sort_rules_by_title(rules):
+            lines.extend(self._format_rule(rule))
+            lines.append("")
+        return lines
+
+    def _join_lines(self, lines: List[str]) -> str:
+        """Join lines into text with each line terminated by a newline."""
+        return "".join(f"{line}\n" for line in lines)
+
     def _format_heading(self, category: str) -> str:
         """Format category as heading."""
         return category.replace("-", " ").replace("_", " ").title()
@@ -7,15 +7,17 @@ with optional paths frontmatter for file-scoped activation.
 
 import logging
 import os
-import re
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Optional, Set
 
 from sync_ai_rules.core.generator_interface import OutputGenerator
+from sync_ai_rules.core.reconciler import UNCHANGED, OutputReconciler
 from sync_ai_rules.core.rule_metadata import RuleMetadata
 
 _RULES_DIR = ".claude/rules/generated"
 _SOURCE_DIR = ".cursor/rules"
 
+_GITATTRIBUTES = "# Auto-generated by sync-ai-rules hook. Do not edit.\n*.md linguist-generated\n"
+
 logger = logging.getLogger(__name__)
 
 
@@ -38,47 +40,74 @@ class ClaudeRulesGenerator(OutputGenerator):
     def is_multi_file(self) -> bool:
         return True
 
-    def generate_files(self, rules: Dict[str, List[RuleMetadata]], project_root: str) -> None:
-        """Generate rule files in .claude/rules/generated/."""
-        rules_root = os.path.join(project_root, _RULES_DIR)
-
-        # Remove all existing generated files before regenerating
-        if os.path.isdir(rules_root):
-            for entry in os.listdir(rules_root):
-                entry_path = os.path.join(rules_root, entry)
-                if entry.endswith(".md") and os.path.isfile(entry_path):
-                    os.remove(entry_path)
-
-        os.makedirs(rules_root, exist_ok=True)
+    def generate_files(
+        self,
+        rules: Dict[str, List[RuleMetadata]],
+        project_root: str,
+        reconciler: Optional[OutputReconciler] = None,
+        changed_paths: Optional[Set[str]] = None,
+    ) -> None:
+        """Generate rule files in .claude/rules/generated/, touching only those that changed."""
+        if reconciler is None:
+            reconciler = OutputReconciler()
 
+        rules_root = os.path.join(project_root, _RULES_DIR)
+        rendered = self.render_files(rules, changed_paths)
+
+        for rule_filename, content in rendered.items():
+            rule_file = os.path.join(rules_root, rule_filename)
+            try:
+                status = reconciler.write_file(rule_file, content)
+                if status != UNCHANGED:
+                    print(f"  ✓ {status.capitalize()} rule: {rule_filename}")
+            except OSError as e:
+                logger.warning("Failed to write rule %s: %s", rule_filename, e)
+                print(f"  ✗ Failed to create rule: {rule_filename}")
+
+        # Remove only rule files whose source rule no longer exists
+        if changed_paths is None:
+            stale = reconciler.remove_stale(rules_root, rendered, ".md")
+        else:
+            current = {_rule_filename(r.relative_path) for rs in rules.values() for r in rs}
+            deleted = {_rule_filename(path) for path in changed_paths} - current
+            stale = reconciler.remove_stale(rules_root, current, ".md", only=deleted)
+        for rule_filename in stale:
+            print(f"  ✓ Removed stale rule: {rule_filename}")
+
+        reconciler.write_file(os.path.join(rules_root, ".gitattributes"), _GITATTRIBUTES)
+
+    def render_files(
+        self, rules: Dict[str, List[RuleMetadata]], changed_paths: Optional[Set[str]] = None
+    ) -> Dict[str, str]:
+        """
+        Render rule files in memory, keyed by filename within .claude/rules/generated/.
+
+        If changed_paths is given, only rules with those relative paths are rendered.
+        Rules whose body can no longer be read (e.g. the file was removed after it
+        was parsed) are left out with a warning.
+        """
+        rendered: Dict[str, str] = {}
         for category_rules in rules.values():
             for rule in category_rules:
-                rel_path = _strip_source_prefix(rule.relative_path)
-                path_parts = rel_path.replace(os.sep, "/").split("/")
-                path_parts[-1] = os.path.splitext(path_parts[-1])[0]
-                rule_filename = "-".join(path_parts) + ".md"
-                rule_file = os.path.join(rules_root, rule_filename)
-
-                try:
-                    content = _format_rule(rule)
-                    with open(rule_file, "w", encoding="utf-8") as f:
-                        f.write(content)
-                    print(f"  ✓ Created rule: {rule_filename}")
-                except OSError as e:
-                    logger.warning("Failed to write rule %s: %s", rule_filename, e)
-                    print(f"  ✗ Failed to create rule: {rule_filename}")
-
-        _write_gitattributes(rules_root)
+                if changed_paths is None or rule.relative_path in changed_paths:
+                    rule_filename = _rule_filename(rule.relative_path)
+                    try:
+                        rendered[rule_filename] = _format_rule(rule)
+                    except (OSError, ValueError) as e:
+                        logger.warning("Failed to read rule %s: %s", rule.relative_path, e)
+                        print(f"  ✗ Failed to create rule: {rule_filename}")
+        return rendered
 
     def get_section_markers(self) -> tuple[str, str]:
         return ("", "")
 
 
-def _write_gitattributes(rules_root: str) -> None:
-    """Write .gitattributes to hide generated rules from GitHub PR diffs."""
-    path = os.path.join(rules_root, ".gitattributes")
-    with open(path, "w", encoding="utf-8") as f:
-        f.write("# Auto-generated by sync-ai-rules hook. Do not edit.\n*.md linguist-generated\n")
+def _rule_filename(relative_path: str) -> str:
+    """Flatten a rule's path under .cursor/rules/ into a single .md filename."""
+    rel_path = _strip_source_prefix(relative_path)
+    path_parts = rel_path.replace(os.sep, "/").split("/")
+    path_parts[-1] = os.path.splitext(path_parts[-1])[0]
+    return "-".join(path_parts) + ".md"
 
 
 def _strip_source_prefix(relative_path: str) -> str:
@@ -104,16 +133,9 @@ def _format_rule(rule: RuleMetadata) -> str:
         lines.append("---")
         lines.append("")
 
-    body = _extract_body(rule.raw_content)
+    # The parser recorded where the body starts, so the text isn't scanned for frontmatter again
+    body = rule.body.strip()
     if body:
         lines.append(body)
 
     return "\n".join(lines) + "\n"
-
-
-def _extract_body(raw_content: str) -> str:
-    """Extract body content from raw rule content (after frontmatter)."""
-    match = re.match(r"^---\s*\n.*?\n---\s*\n(.*)$", raw_content, re.DOTALL)
-    if match:
-        return match.group(1).strip()
-    return raw_content.strip()
@@ -1,6 +1,6 @@
 #!/usr/bin/env python3
 
-from typing import Any, Dict, List
+from typing import Any, Dict, Iterator, List
 
 from sync_ai_rules.core.rule_metadata import RuleMetadata
 from sync_ai_rules.generators.base_generator import BaseGenerator
@@ -13,6 +13,10 @@ class CodeReviewGuidelinesGenerator(BaseGenerator):
     def name(self) -> str:
         return "code-review-guidelines"
 
+    @property
+    def needs_body(self) -> bool:
+        return False
+
     @property
     def default_filenames(self) -> List[str]:
         """Default target files for all generators."""
@@ -20,9 +24,11 @@ class CodeReviewGuidelinesGenerator(BaseGenerator):
             "AGENTS.md",
         ]
 
-    def generate(self, rules: Dict[str, List[RuleMetadata]], config: Dict[str, Any]) -> str:
+    def generate_chunks(
+        self, rules: Dict[str, List[RuleMetadata]], config: Dict[str, Any]
+    ) -> Iterator[str]:
         """Generate review guidelines content with XML tags."""
-        lines = [
+        header = [
             "<code-review-guidelines>",
             "<!-- DO NOT EDIT THIS SECTION - Auto-generated from .code_review/ -->",
             "",
@@ -30,24 +36,9 @@ class CodeReviewGuidelinesGenerator(BaseGenerator):
             "",
         ]
 
-        # Sort categories alphabetically
-        sorted_categories = sorted(rules.keys())
-
-        for category in sorted_categories:
-            category_rules = rules[category]
-
-            # Add category heading
-            heading = self._format_heading(category)
-            lines.append(f"### {heading}")
-            lines.append("")
-
-            # Add each rule
-            for rule in self._sort_rules_by_title(category_rules):
-                lines.extend(self._format_rule(rule))
-                lines.append("")
-
-        lines.append("</code-review-guidelines>")
-        return "\n".join(lines) + "\n"
+        yield self._join_lines(header)
+        yield from self._render_categories(rules)
+        yield "</code-review-guidelines>\n"
 
     def get_section_markers(self) -> tuple[str, str]:
         """Return XML tags for the auto-generated section."""
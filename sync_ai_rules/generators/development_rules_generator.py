@@ -1,6 +1,6 @@
 #!/usr/bin/env python3
 
-from typing import Any, Dict, List
+from typing import Any, Dict, Iterator, List
 
 from sync_ai_rules.core.rule_metadata import RuleMetadata
 from sync_ai_rules.generators.base_generator import BaseGenerator
@@ -13,9 +13,15 @@ class DevelopmentRulesGenerator(BaseGenerator):
     def name(self) -> str:
         return "development-rules"
 
-    def generate(self, rules: Dict[str, List[RuleMetadata]], config: Dict[str, Any]) -> str:
+    @property
+    def needs_body(self) -> bool:
+        return False
+
+    def generate_chunks(
+        self, rules: Dict[str, List[RuleMetadata]], config: Dict[str, Any]
+    ) -> Iterator[str]:
         """Generate markdown content with XML tags."""
-        lines = [
+        header = [
             "<auto-generated-rules>",
             "<!-- DO NOT EDIT THIS SECTION - Auto-generated from .cursor/rules/ -->",
             "",
@@ -32,24 +38,9 @@ class DevelopmentRulesGenerator(BaseGenerator):
             "",
         ]
 
-        # Sort categories alphabetically
-        sorted_categories = sorted(rules.keys())
-
-        for category in sorted_categories:
-            category_rules = rules[category]
-
-            # Add category heading
-            heading = self._format_heading(category)
-            lines.append(f"### {heading}")
-            lines.append("")
-
-            # Add each rule
-            for rule in self._sort_rules_by_title(category_rules):
-                lines.extend(self._format_rule(rule))
-                lines.append("")
-
-        lines.append("</auto-generated-rules>")
-        return "\n".join(lines) + "\n"
+        yield self._join_lines(header)
+        yield from self._render_categories(rules)
+        yield "</auto-generated-rules>\n"
 
     def get_section_markers(self) -> tuple[str, str]:
         """Return XML tags for the auto-generated section."""
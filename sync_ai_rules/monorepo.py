@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+"""
+Multi-root mode - sync every project root of a monorepo in one run.
+
+    python3 -m sync_ai_rules --discover-roots
+    python3 -m sync_ai_rules --root services/api --root web
+
+Besides the repository root, each nested project root has its own rule
+sources and outputs (.cursor/rules, .code_review, AGENTS.md, ...). Plugins are
+loaded once; roots whose sources have staged changes are then synced in
+parallel by forked worker processes, which inherit the loaded plugins. Each
+root keeps its own caches, and its output is reported as one block.
+"""
+
+import argparse
+import io
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import redirect_stdout
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from sync_ai_rules.core.change_gate import touches
+from sync_ai_rules.sync import SyncSession, find_parents, report_check
+
+# Session of the repository root in this process, set by _init_worker
+_worker: Dict[str, SyncSession] = {}
+
+
+def run_roots(args: argparse.Namespace, staged: Optional[List[str]]) -> None:
+    """Sync each project root whose rule sources the staged paths touch."""
+    session = _start(args)
+    tasks = []
+    for rel_root in project_roots(session):
+        root_staged = _staged_under(staged, rel_root)
+        if rel_root and not _needs_sync(session, root_staged):
+            continue
+        tasks.append((rel_root, root_staged))
+
+    # Roots with nothing to do print nothing
+    results = [result for result in _map(session, _sync_root, tasks) if result[2].strip()]
+    for rel_root, _, output in results:
+        print(f"\nProject root: {rel_root or '.'}")
+        print(output.rstrip("\n"))
+
+    failed = [rel_root or "." for rel_root, succeeded, _ in results if not succeeded]
+    if failed:
+        print(f"\n✗ Some outputs could not be updated in: {', '.join(failed)}")
+    elif len(results) > 1:
+        print(f"\n✓ Synchronized {len(results)} project roots")
+
+
+def check_roots(args: argparse.Namespace) -> int:
+    """Check every project root's generated outputs without writing; returns the exit code."""
+    session = _start(args)
+    stale: List[str] = []
+    errors: List[str] = []
+    roots = [(rel_root,) for rel_root in project_roots(session)]
+    for root_stale, root_errors in _map(session, _check_root, roots):
+        stale.extend(root_stale)
+        errors.extend(root_errors)
+    return report_check(stale, errors)
+
+
+def project_roots(session: SyncSession) -> List[str]:
+    """
+    Return the project roots to sync, relative to the repository root ("" for itself).
+
+    Roots come from --root and, with --discover-roots, from every directory
+    holding one of the pipelines' source directories.
+    """
+    args = session.args
+    project_root = session.project_root
+    roots = {""}
+    for root in args.root or []:
+        rel_root = os.path.normpath(root).replace(os.sep, "/")
+        if rel_root.startswith("../") or rel_root == "..":
+            print(f"✗ Project root outside the repository: {root}")
+        elif not os.path.isdir(os.path.join(project_root, rel_root)):
+            print(f"✗ Project root not found: {root}")
+        elif rel_root != ".":
+            roots.add(rel_root)
+
+    if args.discover_roots:
+        sources = {source for entry in session.layout.values() for source in entry.sources}
+        for source in sorted(sources):
+            for parent in find_parents(project_root, source):
+                rel_root = os.path.relpath(parent, project_root).replace(os.sep, "/")
+                if rel_root != ".":
+                    roots.add(rel_root)
+    return sorted(roots)
+
+
+def _start(args: argparse.Namespace) -> SyncSession:
+    """Load plugins once, before any worker is forked, so every worker inherits them."""
+    session = SyncSession(args, str(Path.cwd()))
+    session.plugin_manager.load_all()
+    return session
+
+
+def _needs_sync(session: SyncSession, staged: Optional[List[str]]) -> bool:
+    if session.args.full or staged is None:
+        return True
+    return any(touches(staged, entry.sources) for entry in session.layout.values())
+
+
+def _staged_under(staged: Optional[List[str]], rel_root: str) -> Optional[List[str]]:
+    """Staged paths inside rel_root, made relative to it."""
+    if staged is None or not rel_root:
+        return staged
+    prefix = f"{rel_root}/"
+    return [path[len(prefix) :] for path in staged if path.startswith(prefix)]
+
+
+def _map(session: SyncSession, function, tasks: List[tuple]) -> list:
+    """Run function over tasks in forked workers, or in this process if that's not worth it."""
+    workers = min(len(tasks), os.cpu_count() or 1)
+    if workers < 2 or "fork" not in multiprocessing.get_all_start_methods():
+        _init_worker(session)
+        return [function(*task) for task in tasks]
+    with ProcessPoolExecutor(
+        workers,
+        mp_context=multiprocessing.get_context("fork"),
+        initializer=_init_worker,
+        initargs=(session,),
+    ) as pool:
+        return list(pool.map(function, *zip(*tasks)))
+
+
+def _init_worker(session: SyncSession) -> None:
+    """Set the session of the repository root that tasks in this process sync from."""
+    _worker["session"] = session
+
+
+def _root_session(rel_root: str) -> SyncSession:
+    session = _worker["session"]
+    if not rel_root:
+        return session
+    return SyncSession(session.args, os.path.join(session.project_root, rel_root), parent=session)
+
+
+def _sync_root(rel_root: str, staged: Optional[List[str]]) -> Tuple[str, bool, str]:
+    """Sync one root, capturing what it prints so roots' reports don't interleave."""
+    log = io.StringIO()
+    with redirect_stdout(log):
+        succeeded = _root_session(rel_root).sync(staged)
+    return rel_root, succeeded, log.getvalue()
+
+
+def _check_root(rel_root: str) -> Tuple[List[str], List[str]]:
+    stale, errors = _root_session(rel_root).check()
+    return [os.path.join(rel_root, path) for path in stale], errors
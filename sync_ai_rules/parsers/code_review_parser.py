@@ -3,10 +3,15 @@
 Code Review Parser plugin - parses code review markdown files with HTML comment frontmatter.
 """
 
-import re
 from pathlib import Path
-from typing import Any, Dict, Optional
-
+from typing import Any, Dict, Optional, Tuple
+
+from sync_ai_rules.core.document import Document, read_document
+from sync_ai_rules.core.frontmatter import (
+    find_html_comment_span,
+    html_comment_read,
+    parse_key_values,
+)
 from sync_ai_rules.core.parser_interface import InputParser
 from sync_ai_rules.core.rule_metadata import RuleMetadata
 
@@ -23,6 +28,10 @@ class CodeReviewParser(InputParser):
         """Code review parser scans .code_review/ directory."""
         return [".code_review"]
 
+    @property
+    def file_extensions(self) -> list[str]:
+        return [".md"]
+
     def can_parse(self, file_path: str) -> bool:
         """Check if this parser can handle the given file."""
         return file_path.endswith(".md")
@@ -30,14 +39,33 @@ class CodeReviewParser(InputParser):
     def parse(self, file_path: str, context: Dict[str, Any]) -> Optional[RuleMetadata]:
         """Parse a code review markdown file and extract metadata."""
         try:
-            with open(file_path, encoding="utf-8") as f:
-                content = f.read()
+            document = read_document(file_path, html_comment_read, context.get("header_limit"))
         except (FileNotFoundError, PermissionError, UnicodeDecodeError) as e:
             print(f"Error reading {file_path}: {e}")
             return None
+        return self._parse_document(file_path, document, context)
 
+    def parse_data(
+        self, file_path: str, data: bytes, context: Dict[str, Any]
+    ) -> Optional[RuleMetadata]:
+        """Parse a code review markdown file's content given as bytes."""
+        try:
+            document = Document(data)
+        except UnicodeDecodeError as e:
+            print(f"Error reading {file_path}: {e}")
+            return None
+        return self._parse_document(file_path, document, context, data)
+
+    def _parse_document(
+        self,
+        file_path: str,
+        document: Document,
+        context: Dict[str, Any],
+        data: Optional[bytes] = None,
+    ) -> Optional[RuleMetadata]:
         # Extract HTML comment frontmatter
-        metadata = self._parse_frontmatter(content)
+        span = find_html_comment_span(document.text)
+        metadata = self._parse_frontmatter(document.text, span)
         if not metadata:
             return None
 
@@ -52,28 +80,18 @@ class CodeReviewParser(InputParser):
             scope_patterns=[],
             always_apply=False,
             category=context.get("category", "root"),
-            raw_content=content,
             metadata=metadata,
+            # The comment may sit anywhere in the file, so no separate body is recorded
+            frontmatter_span=document.byte_span(*span),
+            data=data,
         )
 
-    def _parse_frontmatter(self, content: str) -> Dict[str, str]:
-        """Parse HTML comment frontmatter from markdown content."""
-        # Match HTML comment block at start of file
+    def _parse_frontmatter(self, content: str, span: Optional[Tuple[int, int]]) -> Dict[str, str]:
+        """Parse HTML comment frontmatter found at span of markdown content."""
+        # HTML comment block at start of a line
         # Pattern: <!--\nname: ...\ndescription: ...\n-->
-        pattern = r"^<!--\s*\n(.*?)\n-->"
-        match = re.search(pattern, content, re.MULTILINE | re.DOTALL)
-
-        if not match:
+        if span is None:
             return {}
 
-        frontmatter_text = match.group(1)
-        metadata = {}
-
         # Parse key: value pairs
-        for line in frontmatter_text.split("\n"):
-            line = line.strip()
-            if ":" in line:
-                key, value = line.split(":", 1)
-                metadata[key.strip()] = value.strip()
-
-        return metadata
+        return parse_key_values(content[span[0] : span[1]])
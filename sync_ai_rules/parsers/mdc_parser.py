@@ -4,11 +4,16 @@ MDC Parser plugin - parses .mdc files with YAML frontmatter.
 """
 
 import os
-import re
 from typing import Any, Dict, List, Optional
 
-import yaml
-
+from sync_ai_rules.core.document import (
+    Document,
+    Span,
+    read_document,
+    split_yaml_frontmatter,
+    yaml_header_read,
+)
+from sync_ai_rules.core.frontmatter import FrontmatterError, load_yaml
 from sync_ai_rules.core.parser_interface import InputParser
 from sync_ai_rules.core.rule_metadata import RuleMetadata
 
@@ -25,20 +30,43 @@ class MDCParser(InputParser):
         """MDC parser scans .cursor/rules/ directory."""
         return [".cursor/rules"]
 
+    @property
+    def file_extensions(self) -> List[str]:
+        return [".mdc"]
+
     def can_parse(self, file_path: str) -> bool:
         return file_path.endswith(".mdc")
 
     def parse(self, file_path: str, context: Dict[str, Any]) -> Optional[RuleMetadata]:
         """Parse an .mdc file and return standardized metadata."""
         try:
-            with open(file_path, encoding="utf-8") as f:
-                content = f.read()
+            document = read_document(file_path, yaml_header_read, context.get("header_limit"))
         except Exception as e:
             print(f"Error reading {file_path}: {e}")
             return None
+        return self._parse_document(file_path, document, context)
 
-        # Extract frontmatter
-        frontmatter, body = self._extract_frontmatter(content)
+    def parse_data(
+        self, file_path: str, data: bytes, context: Dict[str, Any]
+    ) -> Optional[RuleMetadata]:
+        """Parse an .mdc file's content given as bytes."""
+        try:
+            document = Document(data)
+        except UnicodeDecodeError as e:
+            print(f"Error reading {file_path}: {e}")
+            return None
+        return self._parse_document(file_path, document, context, data)
+
+    def _parse_document(
+        self,
+        file_path: str,
+        document: Document,
+        context: Dict[str, Any],
+        data: Optional[bytes] = None,
+    ) -> RuleMetadata:
+        # Split off the frontmatter once; generators read the body through body_span
+        header_span, body_start = split_yaml_frontmatter(document.text)
+        frontmatter = self._load_frontmatter(document.text, header_span)
 
         # Use defaults for missing fields
         description = ""
@@ -69,25 +97,20 @@ class MDCParser(InputParser):
             always_apply=always_apply,
             category=context.get("category", "root"),
             metadata={"frontmatter": frontmatter} if frontmatter else {},
-            raw_content=content,
+            frontmatter_span=document.byte_span(*header_span) if header_span else None,
+            # The fenced header is never part of the body, even if it isn't valid YAML
+            body_span=document.byte_span(body_start, len(document.text)),
+            data=data,
         )
 
-    def _extract_frontmatter(self, content: str) -> tuple[Optional[Dict], str]:
-        """Extract YAML frontmatter from content."""
-        pattern = r"^---\s*\n(.*?)\n---\s*\n(.*)$"
-        match = re.match(pattern, content, re.DOTALL)
-
-        if not match:
-            return None, content
-
-        frontmatter_str = match.group(1)
-        remaining_content = match.group(2)
-
+    def _load_frontmatter(self, content: str, span: Optional[Span]) -> Optional[Dict]:
+        """Load the YAML frontmatter within span of content, if any."""
+        if span is None:
+            return None
         try:
-            frontmatter = yaml.safe_load(frontmatter_str)
-            return frontmatter, remaining_content
-        except yaml.YAMLError:
-            return None, content
+            return load_yaml(content[span[0] : span[1]])
+        except FrontmatterError:
+            return None
 
     def _kebab_to_title_case(self, kebab_str: str) -> str:
         """Convert kebab-case filename to Title Case."""
@@ -0,0 +1,873 @@
+#!/usr/bin/env python3
+"""
+Sync orchestration: load pipelines → parse → generate → update files.
+
+Imported by __main__ only once staged changes call for a sync, so the hook's
+no-op path never pays for YAML, plugin or parser imports.
+"""
+
+import argparse
+import cProfile
+import functools
+import io
+import logging
+import os
+from contextlib import contextmanager, nullcontext, redirect_stdout
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Set, Tuple
+
+from sync_ai_rules.core.change_gate import (
+    PipelineLayout,
+    load_layout,
+    pipeline_layout,
+    save_layout,
+    touches,
+    touches_skills,
+)
+from sync_ai_rules.core.generator_interface import OutputGenerator
+from sync_ai_rules.core.git_index import StagedSnapshot, open_snapshot
+from sync_ai_rules.core.git_utils import find_cache_dir, run_git
+from sync_ai_rules.core.incremental import RuleChanges, SyncState, dirty_paths, head_trees
+from sync_ai_rules.core.manifest import OutputManifest
+from sync_ai_rules.core.parse_cache import ParseCache, compute_salt
+from sync_ai_rules.core.parser_interface import InputParser
+from sync_ai_rules.core.pipeline import Pipeline
+from sync_ai_rules.core.plugin_manager import PluginManager
+from sync_ai_rules.core.reconciler import UNCHANGED, OutputReconciler
+from sync_ai_rules.core.rule_metadata import RuleMetadata
+from sync_ai_rules.core.scanner import default_jobs, parse_paths, scan_sources
+from sync_ai_rules.core.scheduler import (
+    captured_output,
+    conflict_groups,
+    run_concurrently,
+    thread_output,
+)
+from sync_ai_rules.core.trace import Trace
+from sync_ai_rules.file_updater import DocumentationTransaction
+
+logger = logging.getLogger(__name__)
+
+
+def group_by_category(rules: List[RuleMetadata]) -> Dict[str, List[RuleMetadata]]:
+    """Group rules by category."""
+    groups: Dict[str, List[RuleMetadata]] = {}
+    for rule in rules:
+        groups.setdefault(rule.category, []).append(rule)
+    return groups
+
+
+def _write_gitattributes(
+    directory: str, filenames: List[str], reconciler: OutputReconciler
+) -> None:
+    """Write .gitattributes to hide generated files from GitHub PR diffs."""
+    lines = ["# Auto-generated by sync-ai-rules hook. Do not edit.\n"]
+    lines.extend(f"{name} linguist-generated\n" for name in filenames)
+    reconciler.write_file(os.path.join(directory, ".gitattributes"), "".join(lines))
+
+
+# Directories that should be completely ignored when looking for skills
+_IGNORE_DIRS = {
+    ".build",
+    ".git",
+    ".hg",
+    ".idea",
+    ".svn",
+    ".tox",
+    ".venv",
+    "__pycache__",
+    "build",
+    "node_modules",
+    "venv",
+}
+
+_TRACE_FILENAME = "sync-ai-rules-trace.json"
+
+_SKILLS_DIR = os.path.join(".agents", "skills")
+
+
+def _ensure_agents_skills_symlinks(project_root: str, parents: Optional[List[str]] = None) -> int:
+    """
+    Create .claude/skills -> .agents/skills wherever .agents/skills/ exists; returns how many.
+
+    Only the given parent directories are checked, if any are given.
+    """
+    if parents is None:
+        parents = find_agents_skills_parents(project_root)
+    created = 0
+    for dirpath in _missing_skills_symlinks(parents):
+        claude_dir = os.path.join(dirpath, ".claude")
+        symlink_path = os.path.join(claude_dir, "skills")
+        # Relative target: .claude/skills -> ../.agents/skills
+        target = os.path.join("..", ".agents", "skills")
+
+        try:
+            os.makedirs(claude_dir, exist_ok=True)
+            os.symlink(target, symlink_path)
+            rel = os.path.relpath(symlink_path, project_root)
+            print(f"  ✓ Created symlink: {rel} -> .agents/skills")
+            created += 1
+        except OSError as e:
+            rel = os.path.relpath(dirpath, project_root)
+            logger.warning("Failed to create agents skills symlink at %s: %s", rel, e)
+
+    return created
+
+
+def _missing_skills_symlinks(parents: List[str]) -> List[str]:
+    """Those of parents that have an .agents/skills/ directory but no .claude/skills."""
+    return [
+        dirpath
+        for dirpath in parents
+        if os.path.isdir(os.path.join(dirpath, _SKILLS_DIR))
+        and not os.path.lexists(os.path.join(dirpath, ".claude", "skills"))
+    ]
+
+
+def find_agents_skills_parents(project_root: str) -> List[str]:
+    """Return directories containing an .agents/skills/ directory."""
+    return find_parents(project_root, ".agents/skills")
+
+
+def find_parents(project_root: str, rel_dir: str) -> List[str]:
+    """
+    Return directories at any depth under project_root (itself included) containing rel_dir.
+
+    Uses the git index, so the cost scales with the number of tracked files in
+    such directories rather than the size of the tree and ignored paths are
+    never visited. Falls back to walking the tree outside git repositories.
+    """
+    rel_dir = os.path.normpath(rel_dir).replace(os.sep, "/")
+    output = run_git("-C", project_root, "ls-files", "-z", "--", f":(glob)**/{rel_dir}/**")
+    if output is None:
+        return _walk_parents(project_root, rel_dir)
+
+    parents = set()
+    for path in output.split("\0"):
+        # "a/b/.agents/skills/x" -> "a/b"; "/" prefix matches the root's own rel_dir too
+        index = f"/{path}".find(f"/{rel_dir}/")
+        if index == -1:
+            continue
+        parent = path[: max(index - 1, 0)]
+        if not _IGNORE_DIRS.intersection(parent.split("/")):
+            parents.add(os.path.join(project_root, parent) if parent else project_root)
+
+    return [parent for parent in sorted(parents) if os.path.isdir(os.path.join(parent, rel_dir))]
+
+
+def _walk_parents(project_root: str, rel_dir: str) -> List[str]:
+    parents = []
+    for dirpath, dirnames, _ in os.walk(project_root):
+        # Modify dirnames in-place to prevent os.walk from descending into them
+        dirnames[:] = [d for d in dirnames if d not in _IGNORE_DIRS]
+        if os.path.isdir(os.path.join(dirpath, rel_dir)):
+            parents.append(dirpath)
+    return parents
+
+
+@contextmanager
+def _output_stage(
+    trace: Trace, reconciler: OutputReconciler, name: str, pipeline: Optional[str] = None
+) -> Iterator[None]:
+    """Time a trace stage, counting the outputs the reconciler handles in it."""
+    before = dict(reconciler.counts)
+    with trace.stage(name, pipeline) as counts:
+        try:
+            yield
+        finally:
+            handled = {status: reconciler.counts[status] - before[status] for status in before}
+            counts["files"] = counts.get("files", 0) + sum(handled.values())
+            counts["files_written"] = counts.get("files_written", 0) + sum(
+                count for status, count in handled.items() if status != UNCHANGED
+            )
+
+
+def _load_layout(
+    plugin_manager: PluginManager, cache_dir: Optional[str], plugin_dir: str, save: bool = True
+) -> Dict[str, PipelineLayout]:
+    """Return each pipeline's source directories and outputs, loading plugins only if not cached."""
+    layout = load_layout(cache_dir, plugin_dir)
+    names = {pipeline.name for pipeline in plugin_manager.pipelines}
+    if layout is None or set(layout) != names:
+        layout = {pipeline.name: pipeline_layout(pipeline) for pipeline in plugin_manager.pipelines}
+        if save:
+            save_layout(cache_dir, plugin_dir, layout)
+    return layout
+
+
+def run(
+    args: argparse.Namespace, staged: Optional[List[str]], trace: Optional[Trace] = None
+) -> None:
+    """Run a sync for the parsed command line arguments and the currently staged paths."""
+    SyncSession(args, str(Path.cwd()), trace).sync(staged)
+
+
+def run_check(args: argparse.Namespace, trace: Optional[Trace] = None) -> int:
+    """Verify that every generated output is up to date without writing; returns the exit code."""
+    stale, errors = SyncSession(args, str(Path.cwd()), trace).check()
+    return report_check(stale, errors)
+
+
+def report_check(stale: List[str], errors: List[str]) -> int:
+    """Print the outcome of a check; returns the exit code."""
+    for error in errors:
+        print(error)
+    for path in stale:
+        print(f"✗ Out of date: {path}")
+    if stale or errors:
+        print("\nRun `python3 -m sync_ai_rules --full` to regenerate outputs")
+        return 1
+    print("✓ All generated outputs are up to date")
+    return 0
+
+
+def run_instrumented(
+    args: argparse.Namespace,
+    staged: Optional[List[str]],
+    sync: bool,
+    git_seconds: float,
+    trace_path: Optional[str],
+    profile_path: Optional[str],
+) -> None:
+    """
+    Run a sync (if sync is set) with a detailed trace, optionally under cProfile.
+
+    Writes the trace as JSON to trace_path ("" for the default location in the
+    cache directory) and the profile to profile_path, if given.
+    """
+    trace = Trace(detailed=True)
+    trace.record("git", git_seconds)
+
+    profiler = None
+    if profile_path:
+        profiler = cProfile.Profile()
+        profiler.enable()
+    try:
+        if sync:
+            run(args, staged, trace)
+    finally:
+        if profiler is not None:
+            profiler.disable()
+            profiler.dump_stats(profile_path)
+            print(f"✓ Profile written to {profile_path}")
+        if trace_path is not None:
+            if not trace_path:
+                project_root = str(Path.cwd())
+                trace_path = os.path.join(
+                    find_cache_dir(project_root) or project_root, _TRACE_FILENAME
+                )
+            trace.write_report(trace_path)
+            print(f"✓ Trace written to {trace_path}")
+
+
+class _OutputRun:
+    """What one regeneration of outputs rendered, and which pipelines wrote what."""
+
+    def __init__(self, pipelines: List[Pipeline]):
+        self.succeeded = True
+        # Sections of every pipeline, so files shared between them are written once
+        self.transaction = DocumentationTransaction()
+        # Each pipeline's progress, printed in pipeline order once all have finished
+        self.logs = {pipeline.name: io.StringIO() for pipeline in pipelines}
+        self.multi_file: Dict[str, Tuple[OutputGenerator, Dict[str, List[RuleMetadata]], Any]] = {}
+        self.single_file: List[str] = []
+        # Pipeline name -> the outputs it writes
+        self.outputs: Dict[str, List[str]] = {}
+        # Output path -> names of the pipelines that wrote it
+        self.owners: Dict[str, Set[str]] = {}
+        # Output path -> pipeline name -> markers of its section there
+        self.sections: Dict[str, Dict[str, Tuple[str, str]]] = {}
+
+
+class SyncSession:
+    """
+    Plugins, caches and parsed rules for syncing one project.
+
+    A hook run syncs once. Watch mode keeps a session alive and re-syncs each
+    batch of changed paths through it, reusing loaded plugins, rendered
+    categories and the rules parsed so far instead of starting over.
+    """
+
+    def __init__(
+        self,
+        args: argparse.Namespace,
+        project_root: str,
+        trace: Optional[Trace] = None,
+        parent: Optional["SyncSession"] = None,
+    ):
+        self.args = args
+        self.project_root = project_root
+        self.trace = trace if trace is not None else Trace()
+        self.jobs = args.jobs if args.jobs is not None else default_jobs()
+        script_dir = os.path.dirname(os.path.abspath(__file__))
+
+        if parent is not None:
+            # A project root nested in the parent's: share its plugins, keep separate caches
+            rel_root = os.path.relpath(project_root, parent.project_root)
+            self.git_prefix = f"{parent.git_prefix}{rel_root}/"
+            self.plugin_manager = parent.plugin_manager.clone()
+            self.layout = parent.layout
+            self.cache_dir = (
+                os.path.join(parent.cache_dir, "roots", rel_root) if parent.cache_dir else None
+            )
+        else:
+            # Path of project_root within the git working tree, which git reports paths from
+            self.git_prefix = ""
+            with self.trace.stage("plugins"):
+                self.plugin_manager = PluginManager()
+                # --check lists only what's out of date
+                self.plugin_manager.load_plugins(script_dir, verbose=not args.check)
+                self.cache_dir = find_cache_dir(project_root)
+                self.layout = _load_layout(
+                    self.plugin_manager, self.cache_dir, script_dir, save=not args.check
+                )
+
+        self._parse_cache: Optional[ParseCache] = None
+        self._salt: Optional[str] = None
+        # Rules of every parser, kept in memory between sync_changes() calls
+        self._warm_state: Optional[SyncState] = None
+
+    @property
+    def parse_cache(self) -> ParseCache:
+        """The persistent parse cache, loaded on first use."""
+        if self._parse_cache is None:
+            # Salts hash plugin sources by path, so generators aren't imported just to compute them
+            salt = compute_salt(
+                self.plugin_manager.config_path, self.plugin_manager.plugin_paths(("parsers",))
+            )
+            self._parse_cache = ParseCache(self.cache_dir, salt)
+        return self._parse_cache
+
+    @property
+    def salt(self) -> str:
+        """Hash of plugins.yaml and every package and plugin module, for state depending on them."""
+        if self._salt is None:
+            self._salt = compute_salt(
+                self.plugin_manager.config_path, self.plugin_manager.plugin_paths()
+            )
+        return self._salt
+
+    def sync(self, staged: Optional[List[str]], all_pipelines: bool = False) -> bool:
+        """
+        Sync the pipelines whose sources the staged paths touch, then persist caches.
+
+        Every pipeline runs with --full or --staged, outside git (staged is
+        None), or if all_pipelines is set. A pipeline whose section of a file
+        shared with a running pipeline was edited by hand runs too, to repair it.
+        Returns whether every output was updated.
+        """
+        run_all = self.args.full or self.args.staged or staged is None or all_pipelines
+        pipelines = [
+            pipeline
+            for pipeline in self.plugin_manager.pipelines
+            if run_all or touches(staged, self.layout[pipeline.name].sources)
+        ]
+        # Skills symlinks of the whole tree are kept by the top-level root
+        sync_skills = not self.git_prefix and (run_all or touches_skills(staged))
+        if not pipelines and not sync_skills:
+            return True
+
+        manifest = None
+        damaged: List[Pipeline] = []
+        # The manifest fingerprints the working tree, which staged syncs don't read
+        if pipelines and self.cache_dir and not self.args.staged:
+            with self.trace.stage("state"):
+                manifest = OutputManifest(self.cache_dir, self.salt, self.project_root)
+                damaged = self._damaged_sections(manifest, pipelines)
+            pipelines = [
+                pipeline
+                for pipeline in self.plugin_manager.pipelines
+                if pipeline in pipelines or pipeline in damaged
+            ]
+
+        print()
+        for pipeline in self.plugin_manager.pipelines:
+            if pipeline in damaged:
+                print(f"Running pipeline: {pipeline.name} (its shared section was edited)")
+            elif pipeline not in pipelines:
+                print(f"Skipping pipeline: {pipeline.name} (no staged changes in its sources)")
+
+        all_succeeded = True
+        if pipelines:
+            all_succeeded = self._sync_stale(pipelines, damaged, staged, manifest)
+
+        # Create symlinks so Claude Code can discover skills from .agents/skills/
+        if sync_skills:
+            with self.trace.stage("symlinks") as counts:
+                counts["files_written"] = _ensure_agents_skills_symlinks(self.project_root)
+
+        print("\n✓ Rules synchronization completed!")
+        return all_succeeded
+
+    def _sync_stale(
+        self,
+        pipelines: List[Pipeline],
+        damaged: List[Pipeline],
+        staged: Optional[List[str]],
+        manifest: Optional[OutputManifest],
+    ) -> bool:
+        """
+        Sync the pipelines, except those whose outputs the manifest shows are up to date.
+
+        Pipelines in damaged, or whose outputs were edited or removed, are synced
+        with a full scan. Returns whether every output was updated.
+        """
+        fingerprints = None
+        intact = {pipeline.name: pipeline not in damaged for pipeline in pipelines}
+        if manifest is not None:
+            with self.trace.stage("state"):
+                fingerprints = {
+                    pipeline.name: self._fingerprint(manifest, pipeline) for pipeline in pipelines
+                }
+                if not self.args.full:
+                    intact = {
+                        name: intact[name] and manifest.outputs_intact(name) for name in intact
+                    }
+        if manifest is not None and not self.args.full:
+            fresh = [
+                pipeline
+                for pipeline in pipelines
+                if intact[pipeline.name]
+                and manifest.is_current(pipeline.name, fingerprints[pipeline.name])
+            ]
+            for pipeline in fresh:
+                print(f"Skipping pipeline: {pipeline.name} (outputs match its sources)")
+            pipelines = [pipeline for pipeline in pipelines if pipeline not in fresh]
+
+        if not pipelines:
+            if manifest is not None:
+                # Keeps the mtimes of files found unchanged, so they aren't hashed again
+                manifest.save()
+            return True
+        # Outputs edited or removed by hand can't be repaired incrementally
+        full = not all(intact[pipeline.name] for pipeline in pipelines)
+        return self._sync_pipelines(pipelines, staged, manifest, fingerprints, full)
+
+    def sync_changes(self, changed: List[str]) -> bool:
+        """
+        Re-sync after the given project-relative paths changed, without asking git.
+
+        Only rules at those paths are re-parsed, and only the pipelines whose
+        sources they touch regenerate their outputs. Directories among the paths
+        stand for everything under them. Returns whether every output was updated.
+        """
+        changed = self._expand_directories(changed)
+        pipelines = [
+            pipeline
+            for pipeline in self.plugin_manager.pipelines
+            if touches(changed, self.layout[pipeline.name].sources)
+        ]
+
+        all_succeeded = True
+        if pipelines:
+            parsers = _parsers_of(pipelines)
+            warm_state = self.load_rules()
+            with self.trace.stage("parse") as counts:
+                updates = parse_paths(
+                    parsers,
+                    changed,
+                    self.project_root,
+                    self.parse_cache,
+                    self.jobs,
+                    self._header_only(self.plugin_manager.pipelines),
+                )
+                rules_by_parser, changes_by_parser = warm_state.apply(parsers, updates)
+                counts["files"] = sum(len(paths) for paths in updates.values())
+            all_succeeded = self._write_outputs(
+                pipelines, rules_by_parser, changes_by_parser
+            ).succeeded
+
+        if touches_skills(changed):
+            # New skills may not be tracked yet, so take their parents from the paths
+            parents = {
+                os.path.normpath(
+                    os.path.join(self.project_root, f"/{path}".split("/.agents/skills/")[0][1:])
+                )
+                for path in changed
+                if touches_skills([path])
+            }
+            with self.trace.stage("symlinks") as counts:
+                counts["files_written"] = _ensure_agents_skills_symlinks(
+                    self.project_root, sorted(parents)
+                )
+        return all_succeeded
+
+    def check(self) -> Tuple[List[str], List[str]]:
+        """
+        Render every pipeline's outputs in memory and compare them with disk.
+
+        Nothing is written, not even caches. Returns the project-relative paths of
+        outputs that are missing, out of date or due for removal, and any errors
+        (such as section marker conflicts) that kept outputs from being checked.
+        """
+        pipelines = self.plugin_manager.pipelines
+        reconciler = OutputReconciler(dry_run=True)
+        # Progress output would describe writes that don't happen; keep only failures
+        log = io.StringIO()
+        with redirect_stdout(log):
+            with self.trace.stage("parse"), self._open_snapshot() or nullcontext() as snapshot:
+                rules_by_parser = scan_sources(
+                    _parsers_of(pipelines),
+                    self.project_root,
+                    self.parse_cache,
+                    self.jobs,
+                    snapshot,
+                    self._header_only(pipelines),
+                )
+            succeeded = self._write_outputs(pipelines, rules_by_parser, None, reconciler).succeeded
+        errors = (
+            []
+            if succeeded
+            else [line.strip() for line in log.getvalue().splitlines() if "✗" in line]
+        )
+
+        stale = list(reconciler.stale)
+        if not self.git_prefix:
+            parents = find_agents_skills_parents(self.project_root)
+            stale.extend(
+                os.path.join(dirpath, ".claude", "skills")
+                for dirpath in _missing_skills_symlinks(parents)
+            )
+        return sorted({os.path.relpath(path, self.project_root) for path in stale}), errors
+
+    def save_cache(self) -> None:
+        """Persist the parse cache, if it was used."""
+        if self._parse_cache is not None:
+            self._parse_cache.save()
+
+    def load_rules(self) -> SyncState:
+        """Load every parser's rules into memory for sync_changes(), if not loaded yet."""
+        if self._warm_state is None:
+            pipelines = self.plugin_manager.pipelines
+            with self.trace.stage("parse"):
+                rules_by_parser = scan_sources(
+                    _parsers_of(pipelines),
+                    self.project_root,
+                    self.parse_cache,
+                    self.jobs,
+                    header_only=self._header_only(pipelines),
+                )
+            # Never saved: the hook's own state must stay tied to the git state it recorded
+            self._warm_state = SyncState(None, "", self.project_root)
+            self._warm_state.record(rules_by_parser, {}, set())
+        return self._warm_state
+
+    def _header_only(self, pipelines: List[Pipeline]) -> Set[InputParser]:
+        """Parsers of pipelines whose rules no generator among them reads the body of."""
+        return {pipeline.parser for pipeline in pipelines} - {
+            pipeline.parser for pipeline in pipelines if self.layout[pipeline.name].needs_body
+        }
+
+    def _open_snapshot(self) -> Optional[StagedSnapshot]:
+        """With --staged, a snapshot to read rule sources from the git index; else None."""
+        if not self.args.staged:
+            return None
+        snapshot = open_snapshot(self.project_root)
+        if snapshot is None:
+            print("✗ Not in a git repository; reading rule files from the working tree")
+        return snapshot
+
+    def _expand_directories(self, changed: List[str]) -> List[str]:
+        """Replace directories, existing or removed, with the files under them."""
+        paths = set()
+        prefixes = []
+        for rel_path in changed:
+            abs_path = os.path.join(self.project_root, rel_path)
+            if os.path.isdir(abs_path):
+                for dirpath, _, filenames in os.walk(abs_path):
+                    rel_dir = os.path.relpath(dirpath, self.project_root)
+                    paths.update(f"{rel_dir}/{name}" for name in filenames)
+                prefixes.append(f"{rel_path}/")
+            else:
+                paths.add(rel_path)
+                if not os.path.exists(abs_path):
+                    # Possibly a removed directory; its rules are only known from memory
+                    prefixes.append(f"{rel_path}/")
+        if prefixes and self._warm_state is not None:
+            paths.update(
+                path for path in self._warm_state.rule_paths() if path.startswith(tuple(prefixes))
+            )
+        return sorted(paths)
+
+    def _damaged_sections(
+        self, manifest: OutputManifest, pipelines: List[Pipeline]
+    ) -> List[Pipeline]:
+        """Pipelines not in pipelines whose sections of files written by them were edited."""
+        written = {path for pipeline in pipelines for path in self.layout[pipeline.name].outputs}
+        return [
+            pipeline
+            for pipeline in self.plugin_manager.pipelines
+            if pipeline not in pipelines
+            and written.intersection(self.layout[pipeline.name].outputs)
+            and not manifest.sections_intact(pipeline.name)
+        ]
+
+    def _fingerprint(self, manifest: OutputManifest, pipeline: Pipeline) -> Optional[str]:
+        sources = self.layout[pipeline.name].sources
+        # Pipelines reading from anywhere in the project can't be fingerprinted
+        return manifest.fingerprint(sources) if sources else None
+
+    def _sync_pipelines(
+        self,
+        pipelines: List[Pipeline],
+        staged: Optional[List[str]],
+        manifest: Optional[OutputManifest] = None,
+        fingerprints: Optional[Dict[str, Optional[str]]] = None,
+        full: bool = False,
+    ) -> bool:
+        """
+        Parse the rules of the given pipelines and regenerate their outputs.
+
+        With full set, every rule is re-parsed and every output regenerated. The
+        outputs written and the pipelines' fingerprints are recorded in manifest.
+        Returns whether every output was updated.
+        """
+        trace = self.trace
+        with trace.stage("plugins"):
+            parsers = _parsers_of(pipelines)
+        source_dirs = sorted(
+            {rel_dir for parser in parsers for rel_dir in parser.source_directories}
+        )
+
+        with trace.stage("state"):
+            parse_cache = self.parse_cache
+            sync_state = SyncState(self.cache_dir, self.salt, self.project_root)
+            snapshot = self._open_snapshot()
+            incremental = (
+                None
+                if self.args.full or full or snapshot is not None
+                else sync_state.changed_paths(source_dirs, staged, self.git_prefix)
+            )
+
+        changes_by_parser: Optional[Dict[InputParser, RuleChanges]] = None
+        with trace.stage("parse") as counts:
+            if incremental is not None:
+                # Re-parse only files that may differ from the previous run
+                changed, trees, dirty = incremental
+                print(f"  Incremental sync of {len(changed)} changed paths...")
+                updates = parse_paths(
+                    parsers,
+                    sorted(changed),
+                    self.project_root,
+                    parse_cache,
+                    self.jobs,
+                    self._header_only(pipelines),
+                )
+                rules_by_parser, changes_by_parser = sync_state.apply(parsers, updates)
+            else:
+                # Walk each source directory once and parse each file once per parser
+                with snapshot or nullcontext():
+                    rules_by_parser = scan_sources(
+                        parsers,
+                        self.project_root,
+                        parse_cache,
+                        self.jobs,
+                        snapshot,
+                        self._header_only(pipelines),
+                    )
+            counts["files"] = parse_cache.hits + parse_cache.misses
+            counts["cache_hits"] = parse_cache.hits
+        if snapshot is not None:
+            # Rules parsed from the index don't describe the working tree the next run
+            # compares against, so it starts from a full scan
+            trees = dirty = None
+        elif incremental is None:
+            with trace.stage("state"):
+                trees = head_trees(source_dirs, self.git_prefix)
+                dirty = dirty_paths(source_dirs, self.git_prefix)
+
+        reconciler = OutputReconciler()
+        run = self._write_outputs(pipelines, rules_by_parser, changes_by_parser, reconciler)
+        all_succeeded = run.succeeded
+
+        with trace.stage("state"):
+            parse_cache.save()
+            # A failed update must not be mistaken for an up-to-date output next run
+            if not all_succeeded:
+                trees = dirty = None
+            sync_state.record(rules_by_parser, trees, dirty)
+            sync_state.save()
+            if manifest is not None:
+                ran = {pipeline.name: fingerprints[pipeline.name] for pipeline in pipelines}
+                manifest.record(
+                    reconciler, run.owners, ran if all_succeeded else None, run.sections
+                )
+                manifest.save()
+        print(f"\n✓ Parse cache: {parse_cache.hits} hits, {parse_cache.misses} misses")
+        return all_succeeded
+
+    def _write_outputs(
+        self,
+        pipelines: List[Pipeline],
+        rules_by_parser: Dict[InputParser, List[RuleMetadata]],
+        changes_by_parser: Optional[Dict[InputParser, RuleChanges]],
+        reconciler: Optional[OutputReconciler] = None,
+    ) -> "_OutputRun":
+        """
+        Regenerate the outputs of the given pipelines.
+
+        Returns the run, which tells whether all outputs were updated and which
+        pipelines wrote each output path.
+        """
+        if reconciler is None:
+            reconciler = OutputReconciler()
+        run = _OutputRun(pipelines)
+        with thread_output():
+            for pipeline in self.plugin_manager.pipelines:
+                if pipeline in pipelines:
+                    self._render(run, pipeline, rules_by_parser, changes_by_parser)
+                else:
+                    self._keep_sections(run, pipeline)
+
+            # Pipelines writing the same paths run one after another; other groups run
+            # concurrently. Single-file outputs all go through the one transaction.
+            groups = conflict_groups(run.outputs, linked=run.single_file)
+            write_group = functools.partial(self._write_group, run, reconciler.dry_run)
+            finished = run_concurrently(
+                [functools.partial(write_group, names) for names in groups], self.jobs
+            )
+
+        for pipeline in pipelines:
+            print(run.logs[pipeline.name].getvalue(), end="")
+        for group_reconciler, results, written in finished:
+            for name, paths in written.items():
+                for path in paths:
+                    run.owners.setdefault(path, set()).add(name)
+            reconciler.merge(group_reconciler)
+            if results is not None:
+                print("Updating documentation files")
+                for _, success, message in results:
+                    run.succeeded = run.succeeded and success
+                    status = "✓" if success else "✗"
+                    print(f"  {status} {message}")
+
+        self._update_gitattributes(run, pipelines, reconciler)
+        print(f"✓ Outputs: {reconciler.summary()}")
+        return run
+
+    def _render(
+        self,
+        run: "_OutputRun",
+        pipeline: Pipeline,
+        rules_by_parser: Dict[InputParser, List[RuleMetadata]],
+        changes_by_parser: Optional[Dict[InputParser, RuleChanges]],
+    ) -> None:
+        """Queue a pipeline's sections in the run's transaction, or its files for a group."""
+        with captured_output(run.logs[pipeline.name]):
+            print(f"Processing pipeline: {pipeline.name}")
+
+            changes = changes_by_parser[pipeline.parser] if changes_by_parser is not None else None
+            if changes is not None and not changes.paths:
+                print("  No changed rules, skipping")
+                self._keep_sections(run, pipeline)
+                return
+
+            all_rules = rules_by_parser[pipeline.parser]
+            if not all_rules:
+                print("  No rules found, skipping")
+                return
+
+            # Group rules by category
+            grouped_rules = group_by_category(all_rules)
+            print(f"  Found {len(all_rules)} rules in {len(grouped_rules)} categories")
+
+        with self.trace.stage("plugins"):
+            generator = pipeline.generator
+        run.outputs[pipeline.name] = list(generator.default_filenames)
+        if generator.is_multi_file:
+            run.multi_file[pipeline.name] = (generator, grouped_rules, changes)
+            return
+
+        with self.trace.stage("generate", pipeline.name):
+            # Only categories touched by changed rules need re-rendering
+            generator.invalidate_categories(changes.categories if changes else None)
+        # Rendered as it's streamed into each file, so the update stage includes it
+        section = functools.partial(generator.generate_chunks, grouped_rules, {})
+        for filename in generator.default_filenames:
+            file_path = os.path.join(self.project_root, filename)
+            markers = generator.get_section_markers()
+            run.transaction.add(file_path, section, markers, pipeline.name)
+            run.owners.setdefault(file_path, set()).add(pipeline.name)
+            run.sections.setdefault(file_path, {})[pipeline.name] = markers
+        run.single_file.append(pipeline.name)
+
+    def _keep_sections(self, run: "_OutputRun", pipeline: Pipeline) -> None:
+        """Keep a pipeline's sections that aren't re-rendered, spaced as a full run leaves them."""
+        layout = self.layout[pipeline.name]
+        for filename in layout.outputs:
+            file_path = os.path.join(self.project_root, filename)
+            run.transaction.keep(file_path, layout.markers, pipeline.name)
+
+    def _write_group(
+        self, run: "_OutputRun", dry_run: bool, names: List[str]
+    ) -> Tuple[OutputReconciler, Optional[List[Tuple[str, bool, str]]], Dict[str, Set[str]]]:
+        """
+        Write the outputs of a group of pipelines that share outputs, in pipeline order.
+
+        Runs on a worker thread, so it writes through its own reconciler. Returns
+        that reconciler, the transaction's results if the group committed it, and
+        the paths each multi-file pipeline wrote.
+        """
+        trace = self.trace
+        reconciler = OutputReconciler(dry_run=dry_run)
+        results = None
+        written: Dict[str, Set[str]] = {}
+        for name in names:
+            if name not in run.multi_file:
+                continue
+            generator, grouped_rules, changes = run.multi_file[name]
+            handled = set(reconciler.handled)
+            with captured_output(run.logs[name]), _output_stage(
+                trace, reconciler, "generate", name
+            ):
+                generator.generate_files(
+                    grouped_rules, self.project_root, reconciler, changes.paths if changes else None
+                )
+            written[name] = reconciler.handled.keys() - handled
+
+        if run.transaction.files and any(name in run.single_file for name in names):
+            with _output_stage(trace, reconciler, "update"):
+                results = run.transaction.commit(reconciler)
+        return reconciler, results, written
+
+    def _update_gitattributes(
+        self, run: "_OutputRun", pipelines: List[Pipeline], reconciler: OutputReconciler
+    ) -> None:
+        """
+        Write .gitattributes in the non-root output directories of pipelines that ran.
+
+        Each lists every pipeline's outputs there, so skipped pipelines' entries survive.
+        """
+        layout = self.layout
+        output_dirs = {
+            os.path.dirname(filename)
+            for pipeline in pipelines
+            for filename in layout[pipeline.name].outputs
+            if os.path.dirname(filename)
+        }
+        with _output_stage(self.trace, reconciler, "update"):
+            for dir_path in sorted(output_dirs):
+                filenames = {
+                    os.path.basename(filename)
+                    for entry in layout.values()
+                    for filename in entry.outputs
+                    if os.path.dirname(filename) == dir_path
+                }
+                directory = os.path.join(self.project_root, dir_path)
+                _write_gitattributes(directory, sorted(filenames), reconciler)
+                run.owners.setdefault(os.path.join(directory, ".gitattributes"), set()).update(
+                    pipeline.name
+                    for pipeline in pipelines
+                    if any(
+                        os.path.dirname(filename) == dir_path
+                        for filename in layout[pipeline.name].outputs
+                    )
+                )
+
+
+def _parsers_of(pipelines: List[Pipeline]) -> List[InputParser]:
+    """Return the distinct parsers of the given pipelines, in pipeline order."""
+    parsers: List[InputParser] = []
+    for pipeline in pipelines:
+        if pipeline.parser not in parsers:
+            parsers.append(pipeline.parser)
+    return parsers
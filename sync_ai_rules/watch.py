@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Watch mode - regenerate outputs as rule files are edited.
+
+    python3 -m sync_ai_rules --watch
+
+Runs one sync of every pipeline, then watches each pipeline's source
+directories and every .agents directory. Bursts of events (e.g. an editor's
+save-via-rename) are debounced into one batch, and each batch re-parses only
+the changed files through a warm SyncSession, so plugins, parsed rules and
+rendered categories stay in memory between edits.
+"""
+
+import argparse
+import os
+import time
+from pathlib import Path
+from typing import List, Optional, Set
+
+from sync_ai_rules.core.file_watcher import OVERFLOW, FileWatcher, InotifyWatcher, create_watcher
+from sync_ai_rules.core.git_utils import get_staged_changes
+from sync_ai_rules.sync import SyncSession, find_agents_skills_parents
+
+# How often missing watched directories are checked for, in seconds
+_IDLE_TIMEOUT = 1.0
+
+
+def watch(args: argparse.Namespace) -> None:
+    """Sync once, then keep outputs up to date with rule edits until interrupted."""
+    project_root = str(Path.cwd())
+    session = SyncSession(args, project_root)
+    # Watch before the first sync, so edits made while it runs aren't missed
+    watcher = create_watcher(_watch_roots(session), poll=args.poll)
+    session.sync(get_staged_changes(), all_pipelines=True)
+    session.load_rules()
+
+    kind = "inotify" if isinstance(watcher, InotifyWatcher) else "polling"
+    print(f"\nWatching {len(watcher.roots)} directories ({kind}); press Ctrl-C to stop")
+    try:
+        while True:
+            changed = _next_batch(watcher, args.debounce / 1000)
+            if changed is OVERFLOW:
+                # Events were lost: treat every watched directory as changed
+                changed = set(watcher.roots)
+
+            rel_paths = [_relative(path, project_root) for path in sorted(changed)]
+            start = time.perf_counter()
+            succeeded = session.sync_changes(rel_paths)
+            elapsed = (time.perf_counter() - start) * 1000
+            status = "✓" if succeeded else "✗"
+            print(f"{status} Synced {len(rel_paths)} changed paths in {elapsed:.0f}ms")
+    except KeyboardInterrupt:
+        print("\nStopped watching")
+    finally:
+        watcher.close()
+        session.save_cache()
+
+
+def _next_batch(watcher: FileWatcher, debounce: float) -> Optional[Set[str]]:
+    """Block until something changes, then collect events until debounce seconds pass quietly."""
+    changed: Set[str] = set()
+    while not changed:
+        changed = watcher.wait(_IDLE_TIMEOUT)
+        if changed is OVERFLOW:
+            return OVERFLOW
+
+    while True:
+        more = watcher.wait(debounce)
+        if more is OVERFLOW:
+            return OVERFLOW
+        if not more:
+            return changed
+        changed |= more
+
+
+def _watch_roots(session: SyncSession) -> List[str]:
+    """Every pipeline's source directories plus each .agents directory."""
+    project_root = session.project_root
+    roots = {
+        os.path.join(project_root, source)
+        for entry in session.layout.values()
+        for source in entry.sources
+    }
+    roots.add(os.path.join(project_root, ".agents"))
+    roots.update(
+        os.path.join(parent, ".agents") for parent in find_agents_skills_parents(project_root)
+    )
+    return sorted(roots)
+
+
+def _relative(path: str, project_root: str) -> str:
+    return os.path.relpath(path, project_root).replace(os.sep, "/")
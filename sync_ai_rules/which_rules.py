@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""
+Rule lookup - which rules apply to given paths, without syncing anything.
+
+    python3 -m sync_ai_rules which-rules src/app/main.ts lib/util.py
+    git diff --name-only | python3 -m sync_ai_rules which-rules --json
+
+Rules are parsed through the parse cache and their scope patterns compiled
+into one ScopeIndex, so a batch of thousands of paths is answered in one pass.
+"""
+
+import argparse
+import io
+import json
+import os
+import sys
+from contextlib import redirect_stdout
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from sync_ai_rules.core.rule_metadata import RuleMetadata
+from sync_ai_rules.core.scanner import scan_sources
+from sync_ai_rules.core.scope_index import ScopeIndex
+from sync_ai_rules.sync import SyncSession
+
+
+def load_scope_index(project_root: Optional[str] = None, jobs: Optional[int] = None) -> ScopeIndex:
+    """
+    Parse every pipeline's rules under project_root (default: the current directory) and index them.
+
+    Args:
+        project_root: Directory holding the rule sources
+        jobs: Threads used to read and parse rule files (default: CPUs + 4, max 32)
+
+    Returns:
+        A ScopeIndex of every distinct rule, in relative path order
+    """
+    project_root = project_root or str(Path.cwd())
+    # Plugin loading and scanning report progress; keep it off the query's output
+    with redirect_stdout(io.StringIO()):
+        session = SyncSession(
+            argparse.Namespace(jobs=jobs, check=False, staged=False), project_root
+        )
+        parsers = []
+        for pipeline in session.plugin_manager.pipelines:
+            if pipeline.parser not in parsers:
+                parsers.append(pipeline.parser)
+        # Only headers are looked at, never rule bodies
+        rules_by_parser = scan_sources(
+            parsers, project_root, session.parse_cache, session.jobs, header_only=parsers
+        )
+    session.save_cache()
+
+    rules: Dict[str, RuleMetadata] = {}
+    for parser_rules in rules_by_parser.values():
+        for rule in parser_rules:
+            rules.setdefault(rule.relative_path, rule)
+    return ScopeIndex([rules[path] for path in sorted(rules)])
+
+
+def rules_for_paths(
+    paths: List[str], project_root: Optional[str] = None, include_always: bool = True
+) -> Dict[str, List[RuleMetadata]]:
+    """
+    Return the rules that apply to each path.
+
+    Args:
+        paths: Paths relative to project_root
+        project_root: Directory holding the rule sources (default: the current directory)
+        include_always: Whether rules with alwaysApply set are included for every path
+
+    Returns:
+        Applicable rules per path, keyed by the path as given
+    """
+    return load_scope_index(project_root).match_all(paths, include_always)
+
+
+def main(argv: List[str]) -> int:
+    """Run the which-rules subcommand; returns the exit code."""
+    parser = argparse.ArgumentParser(
+        prog="sync_ai_rules which-rules",
+        description="List the rules whose scope covers each path.",
+    )
+    parser.add_argument(
+        "paths",
+        nargs="*",
+        metavar="PATH",
+        help="paths to look up, relative to the current directory (none or '-': read stdin)",
+    )
+    parser.add_argument("--json", action="store_true", help="print a JSON object keyed by path")
+    parser.add_argument(
+        "--scoped-only",
+        action="store_true",
+        help="leave out rules that always apply, listing only rules matched by their globs",
+    )
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        default=None,
+        help="number of threads used to read and parse rule files (default: CPUs + 4, max 32)",
+    )
+    args = parser.parse_args(argv)
+
+    paths = args.paths
+    if not paths or paths == ["-"]:
+        paths = [line.strip() for line in sys.stdin if line.strip()]
+
+    project_root = str(Path.cwd())
+    index = load_scope_index(project_root, args.jobs)
+    matches = {
+        path: index.match(_relative(path, project_root), not args.scoped_only) for path in paths
+    }
+
+    if args.json:
+        json.dump(
+            {
+                path: [
+                    {
+                        "path": rule.relative_path,
+                        "title": rule.title,
+                        "description": rule.description,
+                        "always_apply": bool(rule.always_apply),
+                    }
+                    for rule in rules
+                ]
+                for path, rules in matches.items()
+            },
+            sys.stdout,
+            indent=2,
+        )
+        print()
+    else:
+        for path, rules in matches.items():
+            print(f"{path}: {', '.join(rule.relative_path for rule in rules) or '-'}")
+    return 0
+
+
+def _relative(path: str, project_root: str) -> str:
+    """A path given on the command line, relative to the project root with "/" separators."""
+    if os.path.isabs(path):
+        path = os.path.relpath(path, project_root)
+    return os.path.normpath(path).replace(os.sep, "/")
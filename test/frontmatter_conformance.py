@@ -0,0 +1,240 @@
+#!/usr/bin/env python3
+"""
+Conformance check for the frontmatter engine.
+
+Verifies that sync_ai_rules.core.frontmatter gives exactly the same results as
+yaml.safe_load and the original HTML comment regex, over a built-in corpus of
+tricky headers plus any rule files given on the command line:
+
+    PYTHONPATH=. python3 test/frontmatter_conformance.py [path ...]
+
+Exits nonzero and lists every mismatch if the engine disagrees with either.
+"""
+
+import itertools
+import math
+import os
+import random
+import re
+import sys
+from typing import Any, Callable, Iterator, List, Tuple
+
+import yaml
+
+from sync_ai_rules.core.frontmatter import FrontmatterError, find_html_comment, load_yaml
+
+_MDC_FRONTMATTER = re.compile(r"^---\s*\n(.*?)\n---\s*\n(.*)$", re.DOTALL)
+_HTML_COMMENT = re.compile(r"^<!--\s*\n(.*?)\n-->", re.MULTILINE | re.DOTALL)
+
+_KEYS = ["description", "globs", "alwaysApply", "name", "on", "yes", "Null", "a-b", "_x", "1"]
+
+_SCALARS = [
+    "",
+    "~",
+    "null",
+    "NULL",
+    "true",
+    "False",
+    "yes",
+    "Off",
+    "tRue",
+    "y",
+    "n",
+    "Rule description",
+    "Rule: with colon",
+    "http://example.com",
+    "C# and F#",
+    "text # comment",
+    "trailing colon:",
+    "src/**/*.ts, src/**/*.tsx",
+    "**/*.ts",
+    "*.md",
+    "&anchor",
+    "!tag value",
+    "[a, b]",
+    "{a: b}",
+    "- item",
+    "|",
+    ">",
+    "'single'",
+    "'it''s'",
+    '"double"',
+    '"esc\\n"',
+    '""',
+    "''",
+    "'unterminated",
+    "42",
+    "-1",
+    "+1",
+    "0x1F",
+    "1_000",
+    "3.14",
+    ".5",
+    ".inf",
+    ".NaN",
+    "1:20",
+    "2024-01-01",
+    "2024-01-01 10:00:00",
+    "=",
+    "<<",
+    "%percent",
+    "@at",
+    "`tick`",
+    "don't [stop] {me}",
+    "café ünïcode",
+    "emoji 🎉",
+    "value   ",
+    "tab\tinside",
+]
+
+_DOCUMENTS = [
+    "",
+    "\n\n",
+    "  \n",
+    "description: a\ndescription: b",
+    "description: a\n  continued",
+    "globs:\n  - a\n  - b",
+    "# comment\ndescription: a",
+    "description: a\n# comment",
+    "description:a",
+    "description : a",
+    "just text",
+    "- a\n- b",
+    "---",
+    "...",
+    "description: a\r\nglobs: b",
+    "description: \ufeffbom",
+    "description: line\u2028sep",
+    "description: nel\x85x",
+    "description: bell\x07",
+    "description: >\n  folded\n  text",
+    "key: [unclosed",
+]
+
+_COMMENTS = [
+    "<!--\nname: A\n-->",
+    "<!--\n\n-->",
+    "<!--\n\n\n-->",
+    "<!--  \n  \nname: A\n-->",
+    "<!-- inline -->\n<!--\nname: B\n-->",
+    "text <!--\nname: C\n-->",
+    "<!--\nname: D",
+    "<!--\n-->",
+    "<!--\n-->\n-->",
+    "intro\n<!--\ndescription: E\n-->\nbody\n<!--\nname: F\n-->",
+    "<!--\t\nname: G\n-->",
+    "<!--\r\nname: H\r\n-->",
+    "",
+    "no comment here",
+]
+
+
+# Alphabet for randomly generated headers, weighted towards YAML syntax
+_FUZZ_TOKENS = [
+    *"ab: -#'\"\n\t\\[]{},&*!|>%@`=<+.019~?",
+    "yes",
+    "null",
+    "on",
+    "key: ",
+    "\n  ",
+    "<!--",
+    "-->",
+    "\x85",
+    "\ufeff",
+    "é",
+]
+_FUZZ_SAMPLES = 20000
+# Share of fuzzed samples that follow a key rather than stand alone
+_FUZZ_KEYED = 0.5
+
+
+def _same(a: Any, b: Any) -> bool:
+    """Compare values strictly, so True != 1 and 1 != 1.0."""
+    if type(a) is not type(b):
+        return False
+    if isinstance(a, dict):
+        return list(a) == list(b) and all(_same(a[k], b[k]) for k in a)
+    if isinstance(a, list):
+        return len(a) == len(b) and all(_same(x, y) for x, y in zip(a, b))
+    if isinstance(a, float) and math.isnan(a):
+        return math.isnan(b)
+    return a == b
+
+
+def _outcome(load: Callable[[str], Any], text: str) -> Tuple[str, Any]:
+    try:
+        return "ok", load(text)
+    except (yaml.YAMLError, FrontmatterError):
+        return "error", None
+
+
+def _yaml_samples() -> Iterator[str]:
+    yield from _DOCUMENTS
+    for key, value in itertools.product(_KEYS, _SCALARS):
+        yield f"{key}: {value}"
+    for values in zip(_SCALARS, _SCALARS[1:], _SCALARS[2:]):
+        yield "\n".join(f"{key}: {value}" for key, value in zip(_KEYS, values))
+    yield from _fuzz_samples()
+
+
+def _fuzz_samples() -> Iterator[str]:
+    # Seeded so failures are reproducible
+    rng = random.Random(0)
+    for _ in range(_FUZZ_SAMPLES):
+        text = "".join(rng.choice(_FUZZ_TOKENS) for _ in range(rng.randint(0, 14)))
+        yield f"description: {text}" if rng.random() < _FUZZ_KEYED else text
+
+
+def _rule_files(paths: List[str]) -> Iterator[Tuple[str, str]]:
+    for path in paths:
+        files = [path]
+        if os.path.isdir(path):
+            files = [os.path.join(root, f) for root, _, names in os.walk(path) for f in names]
+        for file_path in sorted(files):
+            if file_path.endswith((".mdc", ".md")):
+                with open(file_path, encoding="utf-8", errors="replace") as f:
+                    yield file_path, f.read()
+
+
+def check(paths: List[str]) -> List[str]:
+    """Return a description of every sample where the engine disagrees with the reference."""
+    mismatches = []
+
+    yaml_samples = [("<builtin>", text) for text in _yaml_samples()]
+    comment_samples = [("<builtin>", text) for text in [*_COMMENTS, *_fuzz_samples()]]
+    for file_path, content in _rule_files(paths):
+        match = _MDC_FRONTMATTER.match(content)
+        if match:
+            yaml_samples.append((file_path, match.group(1)))
+        comment_samples.append((file_path, content))
+
+    for source, text in yaml_samples:
+        expected = _outcome(yaml.safe_load, text)
+        actual = _outcome(load_yaml, text)
+        if expected[0] != actual[0] or not _same(expected[1], actual[1]):
+            mismatches.append(f"{source}: load_yaml({text!r}) = {actual}, safe_load = {expected}")
+
+    for source, content in comment_samples:
+        match = _HTML_COMMENT.search(content)
+        expected = match.group(1) if match else None
+        actual = find_html_comment(content)
+        if expected != actual:
+            mismatches.append(f"{source}: find_html_comment = {actual!r}, regex = {expected!r}")
+
+    print(f"Checked {len(yaml_samples)} YAML headers and {len(comment_samples)} comment blocks")
+    return mismatches
+
+
+def main(argv: List[str]) -> int:
+    """Run the conformance check and report mismatches."""
+    mismatches = check(argv)
+    for mismatch in mismatches:
+        print(f"✗ {mismatch}")
+    if mismatches:
+        return 1
+    print("✓ Frontmatter engine matches yaml.safe_load and the comment regex")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
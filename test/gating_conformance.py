@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+Conformance check for gated syncs.
+
+A commit that stages changes to one pipeline's sources only runs that
+pipeline, so outputs shared with other pipelines (like AGENTS.md) are spliced
+without regenerating their other sections. This checks, on a copy of a
+project, that such gated runs write exactly what a full sync does:
+
+    PYTHONPATH=. python3 test/gating_conformance.py PROJECT_DIR
+
+Starting from the unsynced project, a change is staged in each pipeline's
+source directories in turn and the result compared with a full sync; then the
+same gated runs on top of a full sync must leave every file as it was. Exits
+nonzero and lists the files that differ.
+"""
+
+import argparse
+import io
+import os
+import shutil
+import sys
+import tempfile
+from contextlib import redirect_stdout
+from typing import Dict, List, Optional
+
+from sync_ai_rules.sync import SyncSession
+
+
+def _snapshot(directory: str) -> Dict[str, bytes]:
+    """Every file's content (a symlink's target) under directory, keyed by relative path."""
+    files = {}
+    for dirpath, dirnames, filenames in os.walk(directory):
+        for name in [
+            *filenames,
+            *(d for d in dirnames if os.path.islink(os.path.join(dirpath, d))),
+        ]:
+            path = os.path.join(dirpath, name)
+            rel_path = os.path.relpath(path, directory)
+            if os.path.islink(path):
+                files[rel_path] = os.readlink(path).encode()
+            else:
+                with open(path, "rb") as f:
+                    files[rel_path] = f.read()
+    return files
+
+
+def _sync(project_root: str, staged: Optional[List[str]]) -> None:
+    """Sync project_root as the hook would with these staged paths (None: everything)."""
+    args = argparse.Namespace(full=staged is None, jobs=1, check=False, staged=False)
+    cwd = os.getcwd()
+    os.chdir(project_root)
+    try:
+        with redirect_stdout(io.StringIO()):
+            SyncSession(args, project_root).sync(staged)
+    finally:
+        os.chdir(cwd)
+
+
+def _staged_paths(sources: List[str]) -> List[str]:
+    """Return a stand-in staged path inside each source directory."""
+    return [os.path.join(os.path.normpath(source), "staged") for source in sources]
+
+
+def _differences(expected: Dict[str, bytes], actual: Dict[str, bytes]) -> List[str]:
+    return sorted(
+        path for path in set(expected) | set(actual) if expected.get(path) != actual.get(path)
+    )
+
+
+def main(argv: List[str]) -> int:
+    """Run the check on the project given in argv; returns the exit code."""
+    if len(argv) != 1:
+        print("usage: python3 test/gating_conformance.py PROJECT_DIR")
+        return 2
+    # Caches would let the runs influence each other
+    os.environ["SYNC_AI_RULES_NO_CACHE"] = "1"
+
+    ok = True
+    with tempfile.TemporaryDirectory() as scratch:
+        full = os.path.join(scratch, "full")
+        shutil.copytree(argv[0], full, symlinks=True)
+        _sync(full, None)
+        expected = _snapshot(full)
+
+        with redirect_stdout(io.StringIO()):
+            session = SyncSession(
+                argparse.Namespace(full=False, jobs=1, check=False, staged=False), full
+            )
+        # Pipelines reading the same directories run together
+        sources: List[List[str]] = []
+        for pipeline in session.plugin_manager.pipelines:
+            if session.layout[pipeline.name].sources not in sources:
+                sources.append(session.layout[pipeline.name].sources)
+
+        gated = os.path.join(scratch, "gated")
+        shutil.copytree(argv[0], gated, symlinks=True)
+        # Skills symlinks are gated on their own paths
+        _sync(gated, [".agents/skills/staged"])
+        for pipeline_sources in sources:
+            _sync(gated, _staged_paths(pipeline_sources))
+        differences = _differences(expected, _snapshot(gated))
+        if differences:
+            ok = False
+            print(f"✗ Gated syncs differ from a full sync: {', '.join(differences)}")
+        else:
+            print("✓ Gated syncs of each source directory match a full sync")
+
+        for pipeline_sources in sources:
+            _sync(full, _staged_paths(pipeline_sources))
+            differences = _differences(expected, _snapshot(full))
+            directories = ", ".join(pipeline_sources) or "the project"
+            if differences:
+                ok = False
+                print(f"✗ A gated sync of {directories} changed: {', '.join(differences)}")
+                expected = _snapshot(full)
+            else:
+                print(f"✓ A gated sync of {directories} after a full sync changed nothing")
+
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))